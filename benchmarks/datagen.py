@@ -0,0 +1,150 @@
+"""Deterministic synthetic CSV files for the benchmarks.
+
+Every shape is generated from a seeded random generator, so the same shape,
+size and seed always produce byte-identical files across machines and runs.
+
+Shapes:
+    narrow: five short columns of ids, names, cities, amounts and dates.
+    wide: one hundred numeric and text columns.
+    quoted: quoted text fields holding delimiters, escaped quotes and newlines.
+    ragged: rows with missing trailing fields.
+
+Usage:
+    python benchmarks/datagen.py --shape quoted --size-mb 100 out.csv
+"""
+
+# standard library
+import argparse
+import os
+import random
+
+ROWS_PER_WRITE = 10_000
+WIDE_COLUMN_COUNT = 100
+WORDS = ['alpha', 'bravo', 'charlie', 'delta', 'echo', 'foxtrot', 'golf', 'hotel',
+         'india', 'juliet', 'kilo', 'lima', 'mike', 'november', 'oscar', 'papa']
+
+
+def _narrow_header():
+    """Return the header of a narrow file."""
+    return 'id,name,city,amount,created_at\n'
+
+
+def _narrow_row(rng, row_id):
+    """Return one row of a narrow file."""
+    return (f'{row_id},name_{rng.randint(0, 99_999)},'
+            f'city_{rng.randint(0, 999)},{rng.uniform(0, 10_000):.2f},'
+            f'2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}\n')
+
+
+def _wide_header():
+    """Return the header of a wide file."""
+    columns = ['id'] + [f'col_{i:03d}' for i in range(1, WIDE_COLUMN_COUNT)]
+    return ','.join(columns) + '\n'
+
+
+def _wide_row(rng, row_id):
+    """Return one row of a wide file."""
+    values = [str(row_id)]
+    for i in range(1, WIDE_COLUMN_COUNT):
+        if i % 3:
+            values.append(str(rng.randint(0, 1_000_000)))
+        else:
+            values.append(rng.choice(WORDS))
+    return ','.join(values) + '\n'
+
+
+def _quoted_header():
+    """Return the header of a quoted-heavy file."""
+    return 'id,title,comment,amount\n'
+
+
+def _quoted_row(rng, row_id):
+    """Return one row of a quoted-heavy file."""
+    words = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(3, 12)))
+    comment = words.replace(' ', rng.choice([', ', ' "quoted" ', '\n', ' ']), 2)
+    comment = comment.replace('"', '""')
+    return (f'{row_id},"{rng.choice(WORDS)}, {rng.choice(WORDS)}","{comment}",'
+            f'{rng.uniform(0, 10_000):.2f}\n')
+
+
+def _ragged_header():
+    """Return the header of a ragged file."""
+    return 'id,name,city,amount,created_at,notes\n'
+
+
+def _ragged_row(rng, row_id):
+    """Return one row of a ragged file, cut short at random."""
+    values = [str(row_id), f'name_{rng.randint(0, 99_999)}', f'city_{rng.randint(0, 999)}',
+              f'{rng.uniform(0, 10_000):.2f}', f'2024-{rng.randint(1, 12):02d}-01',
+              rng.choice(WORDS)]
+    return ','.join(values[:rng.randint(2, len(values))]) + '\n'
+
+
+SHAPES = {
+    'narrow': (_narrow_header, _narrow_row),
+    'wide': (_wide_header, _wide_row),
+    'quoted': (_quoted_header, _quoted_row),
+    'ragged': (_ragged_header, _ragged_row),
+}
+
+
+def generate_csv(filepath, size_mb, shape='narrow', seed=0):
+    """Write a deterministic CSV file of roughly the requested size.
+
+    Args:
+        filepath (str): Path of the CSV file to create.
+        size_mb (float): Target size of the file in megabytes.
+        shape (str): One of the keys of SHAPES.
+        seed (int): Seed for the random generator.
+    """
+    header, row = SHAPES[shape]
+    rng = random.Random(seed)
+    target_bytes = int(size_mb * 1024 * 1024)
+    with open(filepath, 'w', encoding='utf-8', newline='') as csv_file:
+        written = csv_file.write(header())
+        row_id = 0
+        while written < target_bytes:
+            rows = []
+            for _ in range(ROWS_PER_WRITE):
+                row_id += 1
+                rows.append(row(rng, row_id))
+            written += csv_file.write(''.join(rows))
+
+
+def cached_csv(data_dir, size_mb, shape='narrow', seed=0):
+    """Return the path of a generated CSV file, generating it on first use.
+
+    Large files take minutes to generate, so they are kept in data_dir and
+    reused by later runs with the same size, shape and seed.
+
+    Args:
+        data_dir (str): Directory holding the generated files.
+        size_mb (float): Target size of the file in megabytes.
+        shape (str): One of the keys of SHAPES.
+        seed (int): Seed for the random generator.
+
+    Returns:
+        str: Path of the CSV file.
+    """
+    os.makedirs(data_dir, exist_ok=True)
+    filepath = os.path.join(data_dir, f'{shape}_{size_mb:g}mb_seed{seed}.csv')
+    if not os.path.exists(filepath):
+        partial_filepath = f'{filepath}.partial'
+        generate_csv(partial_filepath, size_mb, shape, seed)
+        os.replace(partial_filepath, filepath)
+    return filepath
+
+
+def main(argv=None):
+    """Generate one synthetic CSV file."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('filepath')
+    parser.add_argument('--shape', choices=sorted(SHAPES), default='narrow')
+    parser.add_argument('--size-mb', type=float, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+    generate_csv(args.filepath, args.size_mb, args.shape, args.seed)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""Benchmark staged versus single-pass DuckDB CSV conversions.
+
+The staged mode mirrors the original writer behaviour: import the CSV into a
+DuckDB table with CREATE TABLE AS, then COPY the table out. The streaming mode
+COPYs straight from read_csv. Each run executes in a fresh process so peak RSS
+is measured per conversion rather than across the whole benchmark.
+
+Usage:
+    python benchmarks/duckdb_conversion.py --size-mb 1024 --format parquet
+"""
+
+# standard library
+import argparse
+import multiprocessing
+import os
+from pathlib import Path
+import resource
+import sys
+import tempfile
+import time
+
+# make the in-tree package importable when run from a checkout
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'src'))
+
+# local libraries
+from datagen import generate_csv
+from datagrunt.core.fileproperties import CSVProperties
+from datagrunt.core.queries import DuckDBQueries
+
+EXPORT_QUERIES = {
+    'csv': 'export_csv_query',
+    'json': 'export_json_query',
+    'jsonl': 'export_json_newline_delimited_query',
+    'parquet': 'export_parquet_query',
+}
+MODES = ['staged', 'streaming']
+
+
+def peak_rss_mb():
+    """Return the peak resident set size of the current process in megabytes."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in kilobytes on Linux and bytes on macOS
+    divisor = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return peak / divisor
+
+
+def _convert(filepath, out_filename, out_format, mode, results):
+    """Run one conversion and report wall time and peak RSS to the parent."""
+    delimiter = CSVProperties(filepath).delimiter
+    queries = DuckDBQueries(filepath)
+    export_query = getattr(queries, EXPORT_QUERIES[out_format])
+    connection = queries.database_connection
+    start = time.perf_counter()
+    if mode == 'staged':
+        connection.sql(queries.import_csv_query(delimiter))
+        connection.sql(export_query(out_filename))
+    else:
+        connection.sql(export_query(out_filename, queries.read_csv_query(delimiter)))
+    results.put({'seconds': time.perf_counter() - start, 'peak_rss_mb': peak_rss_mb()})
+
+
+def run_conversion(filepath, out_filename, out_format, mode):
+    """Run a single conversion in a fresh process.
+
+    Args:
+        filepath (str): Path of the CSV file to convert.
+        out_filename (str): Path of the output file.
+        out_format (str): One of the keys of EXPORT_QUERIES.
+        mode (str): Either 'staged' or 'streaming'.
+
+    Returns:
+        dict: Wall time in seconds and peak RSS in megabytes.
+    """
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    process = context.Process(target=_convert,
+                              args=(filepath, out_filename, out_format, mode, results))
+    process.start()
+    result = results.get()
+    process.join()
+    return result
+
+
+def main(argv=None):
+    """Generate a CSV file and compare both conversion modes on it."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size-mb', type=int, default=256)
+    parser.add_argument('--format', choices=sorted(EXPORT_QUERIES), default='parquet')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        filepath = os.path.join(workdir, 'benchmark.csv')
+        generate_csv(filepath, args.size_mb)
+        print(f'{args.size_mb} MB CSV -> {args.format}')
+        print(f'{"mode":<10} {"run":>3} {"seconds":>9} {"peak RSS MB":>12}')
+        for mode in MODES:
+            for run in range(1, args.repeat + 1):
+                out_filename = os.path.join(workdir, f'out_{mode}.{args.format}')
+                result = run_conversion(filepath, out_filename, args.format, mode)
+                print(f'{mode:<10} {run:>3} {result["seconds"]:>9.2f} '
+                      f'{result["peak_rss_mb"]:>12.1f}')
+
+
+if __name__ == '__main__':
+    main()
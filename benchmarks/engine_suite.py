@@ -0,0 +1,219 @@
+"""Benchmark every CSVReader and CSVWriter method on every engine.
+
+Each operation runs in a fresh process against deterministic synthetic files
+of every requested shape and size, and its wall time and peak RSS are saved
+to a JSON results file together with the library versions and machine. Pass
+an earlier results file to --compare to flag regressions between releases.
+
+Usage:
+    python benchmarks/engine_suite.py --sizes 1 10 100 --output results.json
+    python benchmarks/engine_suite.py --sizes 1000 10000 --shapes narrow wide \
+        --operations write_parquet iter_batches --compare baseline.json
+"""
+
+# standard library
+import argparse
+from datetime import datetime, timezone
+import json
+import multiprocessing
+import os
+from pathlib import Path
+import platform
+import sys
+import tempfile
+import time
+
+# make the in-tree package importable when run from a checkout
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'src'))
+
+# third party libraries
+import duckdb
+import polars as pl
+import pyarrow as pa
+
+# local libraries
+from datagen import SHAPES, cached_csv
+from duckdb_conversion import peak_rss_mb
+import datagrunt
+from datagrunt.csvfile import CSVReader, CSVWriter
+
+ENGINES = ['duckdb', 'polars', 'pyarrow']
+SIZES_MB = [1, 10, 100, 1000, 10_000]
+DEFAULT_SIZES_MB = [1, 10, 100]
+READER_OPERATIONS = ['to_dataframe', 'to_arrow_table', 'to_dicts', 'to_lazyframe',
+                     'to_relation', 'iter_batches', 'query_data']
+WRITER_OPERATIONS = {
+    'write_csv': '.csv',
+    'write_excel': '.xlsx',
+    'write_json': '.json',
+    'write_json_newline_delimited': '.jsonl',
+    'write_parquet': '.parquet',
+}
+OPERATIONS = READER_OPERATIONS + list(WRITER_OPERATIONS)
+# the reader always builds these with the same engine, whichever engine it was given
+ENGINE_SPECIFIC_OPERATIONS = {'to_lazyframe': 'polars', 'to_relation': 'duckdb'}
+# operations that hold the whole file in memory as Python objects or a workbook
+SLOW_OPERATIONS_MAX_MB = {'to_dicts': 1000, 'write_excel': 1000, 'write_json': 1000}
+REGRESSION_THRESHOLD = 1.10
+
+
+def _run_reader_operation(reader, operation):
+    """Run a reader operation to completion."""
+    if operation == 'to_lazyframe':
+        reader.to_lazyframe().collect()
+    elif operation == 'to_relation':
+        reader.to_relation().fetch_arrow_reader().read_all()
+    elif operation == 'iter_batches':
+        for _ in reader.iter_batches():
+            pass
+    elif operation == 'query_data':
+        reader.query_data(f'SELECT COUNT(*) FROM {reader.db_table}').fetchall()
+    else:
+        getattr(reader, operation)()
+
+
+def _measure(filepath, engine, operation, workdir, results):
+    """Run one operation and report wall time and peak RSS to the parent."""
+    try:
+        start = time.perf_counter()
+        if operation in WRITER_OPERATIONS:
+            writer = CSVWriter(filepath, engine=engine)
+            setup_seconds = time.perf_counter() - start
+            start = time.perf_counter()
+            out_filename = os.path.join(workdir, f'out{WRITER_OPERATIONS[operation]}')
+            getattr(writer, operation)(out_filename)
+        else:
+            reader = CSVReader(filepath, engine=engine)
+            setup_seconds = time.perf_counter() - start
+            start = time.perf_counter()
+            _run_reader_operation(reader, operation)
+        results.put({'setup_seconds': setup_seconds,
+                     'seconds': time.perf_counter() - start,
+                     'peak_rss_mb': peak_rss_mb(),
+                     })
+    except Exception as error:  # recorded so one failure does not stop the suite
+        results.put({'error': f'{type(error).__name__}: {error}'})
+
+
+def run_operation(filepath, engine, operation, workdir):
+    """Run a single operation in a fresh process.
+
+    Args:
+        filepath (str): Path of the CSV file.
+        engine (str): One of ENGINES.
+        operation (str): One of OPERATIONS.
+        workdir (str): Directory for output files.
+
+    Returns:
+        dict: Setup and operation wall time in seconds and peak RSS in megabytes,
+        or the error raised by the operation.
+    """
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    process = context.Process(target=_measure,
+                              args=(filepath, engine, operation, workdir, results))
+    process.start()
+    result = results.get()
+    process.join()
+    return result
+
+
+def environment():
+    """Return the library versions and machine the benchmark ran on."""
+    return {'timestamp': datetime.now(timezone.utc).isoformat(),
+            'datagrunt': datagrunt.__version__,
+            'duckdb': duckdb.__version__,
+            'polars': pl.__version__,
+            'pyarrow': pa.__version__,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            }
+
+
+def _result_key(result):
+    """Return the key identifying a measurement across results files."""
+    return (result['shape'], result['size_mb'], result['engine'], result['operation'])
+
+
+def compare(results, baseline, threshold=REGRESSION_THRESHOLD):
+    """Find measurements that got slower or used more memory than a baseline.
+
+    Args:
+        results (list): The measurements of this run.
+        baseline (list): The measurements of an earlier run.
+        threshold (float): Ratio above which a measurement counts as a regression.
+
+    Returns:
+        list: One (key, metric, baseline value, new value) tuple per regression.
+    """
+    baseline_by_key = {_result_key(result): result for result in baseline}
+    regressions = []
+    for result in results:
+        previous = baseline_by_key.get(_result_key(result))
+        if not previous or 'error' in result or 'error' in previous:
+            continue
+        for metric in ('seconds', 'peak_rss_mb'):
+            if result[metric] > previous[metric] * threshold:
+                regressions.append((_result_key(result), metric,
+                                    previous[metric], result[metric]))
+    return regressions
+
+
+def main(argv=None):
+    """Run the benchmark suite and save the results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=float, nargs='+', default=DEFAULT_SIZES_MB,
+                        help=f'File sizes in MB. The full suite is {SIZES_MB}.')
+    parser.add_argument('--shapes', nargs='+', choices=sorted(SHAPES), default=sorted(SHAPES))
+    parser.add_argument('--engines', nargs='+', choices=ENGINES, default=ENGINES)
+    parser.add_argument('--operations', nargs='+', choices=OPERATIONS, default=OPERATIONS)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--data-dir', default=os.path.join(tempfile.gettempdir(),
+                                                           'datagrunt-benchmarks'),
+                        help='Directory to keep the generated CSV files in between runs.')
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--compare', help='Results file of an earlier run to compare with.')
+    args = parser.parse_args(argv)
+
+    results = []
+    print(f'{"shape":<7} {"MB":>6} {"engine":<7} {"operation":<29} '
+          f'{"seconds":>9} {"peak RSS MB":>12}')
+    with tempfile.TemporaryDirectory() as workdir:
+        for shape in args.shapes:
+            for size_mb in args.sizes:
+                filepath = cached_csv(args.data_dir, size_mb, shape, args.seed)
+                for engine in args.engines:
+                    for operation in args.operations:
+                        if ENGINE_SPECIFIC_OPERATIONS.get(operation, engine) != engine:
+                            continue
+                        if size_mb > SLOW_OPERATIONS_MAX_MB.get(operation, float('inf')):
+                            continue
+                        result = {'shape': shape, 'size_mb': size_mb, 'engine': engine,
+                                  'operation': operation}
+                        result.update(run_operation(filepath, engine, operation, workdir))
+                        results.append(result)
+                        if 'error' in result:
+                            measured = result['error'].splitlines()[0]
+                        else:
+                            measured = f'{result["seconds"]:>9.2f} {result["peak_rss_mb"]:>12.1f}'
+                        print(f'{shape:<7} {size_mb:>6g} {engine:<7} {operation:<29} {measured}',
+                              flush=True)
+
+    with open(args.output, 'w', encoding='utf-8') as results_file:
+        json.dump({'environment': environment(), 'results': results}, results_file, indent=2)
+    print(f'Saved {len(results)} results to {args.output}')
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as baseline_file:
+            baseline = json.load(baseline_file)['results']
+        regressions = compare(results, baseline)
+        for key, metric, previous, current in regressions:
+            print(f'REGRESSION {" ".join(map(str, key))} {metric}: '
+                  f'{previous:.2f} -> {current:.2f}')
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
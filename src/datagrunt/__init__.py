@@ -29,9 +29,10 @@ __license__ = "MIT"
 
 # Import key classes, functions, or submodules that should be available at the package level
 from .csvfile import CSVReader, CSVWriter
+from .aio import AsyncCSVReader, AsyncCSVWriter
 
 # You can define __all__ to specify what gets imported with "from package import *"
-__all__ = ['CSVReader', 'CSVWriter']
+__all__ = ['CSVReader', 'CSVWriter', 'AsyncCSVReader', 'AsyncCSVWriter']
 
 # Optionally, you can include a logger for your package
 import logging
@@ -0,0 +1,319 @@
+"""Module for reading and converting CSV files from asyncio code without blocking the event loop."""
+
+# standard library
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import os
+import threading
+
+# local libraries
+from .core.databases import DuckDBSession
+from .csvfile import CSVReader, CSVWriter
+
+class _RunningCall:
+    """Worker thread of one call, which the event loop interrupts only while the call runs.
+
+    Starting, finishing and interrupting share a lock, so an interrupt that races
+    with the end of the call can never reach a later call that took over the
+    same pool thread.
+    """
+
+    def __init__(self):
+        """Initialize the _RunningCall class."""
+        self._lock = threading.Lock()
+        self._thread_id = None
+
+    def start(self):
+        """Record the current thread as running the call."""
+        with self._lock:
+            self._thread_id = threading.get_ident()
+
+    def finish(self):
+        """Record that the call stopped running on its thread."""
+        with self._lock:
+            self._thread_id = None
+
+    def interrupt(self):
+        """Interrupt the DuckDB query of the call if it is still running."""
+        with self._lock:
+            if self._thread_id is not None:
+                DuckDBSession.interrupt(self._thread_id)
+
+class AsyncCSVFile:
+    """Base class running the blocking work of a CSV reader or writer on a thread pool.
+
+    Every call runs in a worker thread of a pool shared by all async readers and
+    writers, and is awaited from the event loop, so many conversions run side by
+    side while the loop keeps serving requests. The pool bounds how many run at
+    once and later calls wait for a free worker. Cancelling a call interrupts
+    the DuckDB query it runs. Polars work cannot be interrupted, so a cancelled
+    Polars call finishes in the background and its result is dropped.
+    """
+
+    DEFAULT_MAX_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+    BATCH_QUEUE_SIZE = 2
+    CSV_FILE_CLASS = None
+
+    _executor = None
+    _max_workers = DEFAULT_MAX_WORKERS
+    _executor_lock = threading.Lock()
+    _END_OF_BATCHES = object()
+
+    def __init__(self, filepath, **options):
+        """
+        Initialize the AsyncCSVFile class.
+
+        Args:
+            filepath (str or list): Path to the file, or a glob pattern or list of paths.
+            **options: Options of the synchronous reader or writer, such as engine.
+        """
+        self.filepath = filepath
+        self.options = options
+        self._csv_file = None
+        self._csv_file_lock = asyncio.Lock()
+
+    @classmethod
+    def set_max_workers(cls, max_workers=None):
+        """Set how many calls of all async readers and writers run at once.
+
+        Calls already submitted finish on the previous pool.
+
+        Args:
+            max_workers (int, optional): Size of the thread pool. Defaults to
+                DEFAULT_MAX_WORKERS.
+        """
+        with AsyncCSVFile._executor_lock:
+            AsyncCSVFile._max_workers = max_workers or cls.DEFAULT_MAX_WORKERS
+            if AsyncCSVFile._executor is not None:
+                AsyncCSVFile._executor.shutdown(wait=False)
+                AsyncCSVFile._executor = None
+
+    @classmethod
+    def _get_executor(cls):
+        """Return the shared thread pool, starting it on first use."""
+        with AsyncCSVFile._executor_lock:
+            if AsyncCSVFile._executor is None:
+                AsyncCSVFile._executor = ThreadPoolExecutor(AsyncCSVFile._max_workers,
+                                                            thread_name_prefix='datagrunt')
+            return AsyncCSVFile._executor
+
+    @classmethod
+    async def run(cls, function, *args, **kwargs):
+        """Run a blocking function on the shared thread pool and await its result.
+
+        Args:
+            function (callable): The function to run.
+            *args: Positional arguments of the function.
+            **kwargs: Keyword arguments of the function.
+
+        Returns:
+            The result of the function.
+        """
+        worker = _RunningCall()
+
+        def call():
+            worker.start()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                worker.finish()
+
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(cls._get_executor(), call)
+        except asyncio.CancelledError:
+            worker.interrupt()
+            raise
+
+    async def get_csv_file(self):
+        """Return the synchronous reader or writer, creating it in the pool on first use.
+
+        Creating it reads the file to detect its dialect. Its cheap properties,
+        such as columns and delimiter, can then be read directly.
+        """
+        async with self._csv_file_lock:
+            if self._csv_file is None:
+                self._csv_file = await self.run(self.CSV_FILE_CLASS, self.filepath,
+                                                **self.options)
+        return self._csv_file
+
+    async def _call(self, method, *args, **kwargs):
+        """Run a method of the synchronous reader or writer on the shared thread pool."""
+        csv_file = await self.get_csv_file()
+        return await self.run(getattr(csv_file, method), *args, **kwargs)
+
+class AsyncCSVReader(AsyncCSVFile):
+    """Class to read CSV files from asyncio code, with the interface of CSVReader."""
+
+    CSV_FILE_CLASS = CSVReader
+
+    def __init__(self, filepath, engine='polars', typed=False, dtypes=None):
+        """
+        Initialize the AsyncCSVReader class.
+
+        Args:
+            filepath (str or list): Path to the file to read, or a glob pattern or
+                list of paths to read several files as one dataset.
+            engine (str, default 'polars'): 'duckdb', 'polars', 'pyarrow' or 'auto'.
+            typed (bool, default False): Infer native column types from a sample.
+            dtypes (dict, optional): Column names mapped to DuckDB type names that
+                override the inferred types. Implies typed.
+        """
+        super().__init__(filepath, engine=engine, typed=typed, dtypes=dtypes)
+
+    async def to_dataframe(self):
+        """Converts CSV to a Polars dataframe."""
+        return await self._call('to_dataframe')
+
+    async def to_arrow_table(self):
+        """Converts CSV to a PyArrow table."""
+        return await self._call('to_arrow_table')
+
+    async def to_dicts(self):
+        """Converts CSV to a list of Python dictionaries."""
+        return await self._call('to_dicts')
+
+    async def split(self, n_chunks=None, target_bytes=None):
+        """Split the rows of the CSV into byte ranges on record boundaries."""
+        return await self._call('split', n_chunks, target_bytes)
+
+    async def read_range(self, start, end):
+        """Reads the rows in one byte range returned by split."""
+        return await self._call('read_range', start, end)
+
+    async def query_data(self, sql_query, materialize=True):
+        """Queries the CSV file after importing it into DuckDB.
+
+        The result is fetched in the thread pool too, so unlike CSVReader.query_data
+        it is returned as a Polars dataframe instead of a lazy DuckDB relation.
+
+        Args:
+            sql_query (str): Query to run against DuckDB.
+            materialize (bool, default True): Import the file into a DuckDB table.
+
+        Returns:
+            A Polars dataframe with the query results.
+        """
+        csv_file = await self.get_csv_file()
+        return await self.run(lambda: csv_file.query_data(sql_query, materialize).pl())
+
+    async def read_new_rows(self, state_file):
+        """Read only the rows appended to the CSV since the last call with the state file."""
+        return await self._call('read_new_rows', state_file)
+
+    async def append_new_rows(self, state_file):
+        """Append the rows added to the CSV since the last call to its DuckDB table."""
+        return await self._call('append_new_rows', state_file)
+
+    async def iter_batches(self, batch_size=None):
+        """Stream the CSV as batches of bounded size with async iteration.
+
+        One worker thread reads the batches ahead of the consumer, at most
+        BATCH_QUEUE_SIZE batches ahead, so memory stays bounded when the consumer
+        is slower than the reader. Leaving the loop early or cancelling the
+        consuming task stops the worker after its current batch.
+
+        Args:
+            batch_size (int, optional): Maximum number of rows per batch.
+
+        Yields:
+            PyArrow record batches from DuckDB or Polars dataframes from Polars.
+        """
+        csv_file = await self.get_csv_file()
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+        free_slots = threading.Semaphore(self.BATCH_QUEUE_SIZE)
+        stopped = threading.Event()
+        worker = _RunningCall()
+
+        def put(item):
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, item)
+            except RuntimeError:  # the event loop closed while the worker was reading
+                stopped.set()
+
+        def produce():
+            worker.start()
+            batches = csv_file.iter_batches(batch_size)
+            try:
+                for batch in batches:
+                    free_slots.acquire()
+                    if stopped.is_set():
+                        break
+                    put(batch)
+            except Exception as error:  # re-raised in the consuming task
+                put(error)
+            finally:
+                batches.close()
+                worker.finish()
+                put(self._END_OF_BATCHES)
+
+        loop.run_in_executor(self._get_executor(), produce)
+        try:
+            while True:
+                item = await queue.get()
+                if item is self._END_OF_BATCHES:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                free_slots.release()
+                yield item
+        finally:
+            stopped.set()
+            free_slots.release()
+            worker.interrupt()
+
+class AsyncCSVWriter(AsyncCSVFile):
+    """Class to convert CSV files from asyncio code, with the interface of CSVWriter."""
+
+    CSV_FILE_CLASS = CSVWriter
+
+    def __init__(self, filepath, engine='duckdb', typed=False, dtypes=None):
+        """
+        Initialize the AsyncCSVWriter class.
+
+        Args:
+            filepath (str or list): Path to the file to convert, or a glob pattern or
+                list of paths to convert several files into one output.
+            engine (str, default 'duckdb'): 'duckdb', 'polars', 'pyarrow' or 'auto'.
+            typed (bool, default False): Infer native column types from a sample.
+            dtypes (dict, optional): Column names mapped to DuckDB type names that
+                override the inferred types. Implies typed.
+        """
+        super().__init__(filepath, engine=engine, typed=typed, dtypes=dtypes)
+
+    async def write_csv(self, out_filename=None):
+        """Export the CSV to a CSV file."""
+        return await self._call('write_csv', out_filename)
+
+    async def write_excel(self, out_filename=None):
+        """Export the CSV to an Excel file."""
+        return await self._call('write_excel', out_filename)
+
+    async def write_json(self, out_filename=None):
+        """Export the CSV to a JSON file."""
+        return await self._call('write_json', out_filename)
+
+    async def write_json_newline_delimited(self, out_filename=None):
+        """Export the CSV to a JSON newline delimited file."""
+        return await self._call('write_json_newline_delimited', out_filename)
+
+    async def write_parquet(self, out_filename=None, partition_by=None, row_group_size=None,
+                            compression=None, compression_level=None, max_file_size=None):
+        """Export the CSV to a Parquet file or a Hive-partitioned directory.
+
+        Args:
+            out_filename (str, optional): The name of the output file, or the output
+                directory when partitioning or capping the file size.
+            partition_by (str or list, optional): Columns to partition the output by.
+            row_group_size (int, optional): Number of rows per row group.
+            compression (str, optional): Compression codec, such as 'zstd' or 'snappy'.
+            compression_level (int, optional): Compression level of the codec.
+            max_file_size (int, optional): Target maximum size of each file in bytes.
+        """
+        return await self._call('write_parquet', out_filename, partition_by, row_group_size,
+                                compression, compression_level, max_file_size)
+
+    async def write_parquet_increment(self, out_dir, state_file=None):
+        """Write the rows appended to the CSV since the last call as a new Parquet part."""
+        return await self._call('write_parquet_increment', out_dir, state_file)
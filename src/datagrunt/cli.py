@@ -0,0 +1,338 @@
+"""Command line interface for converting batches of CSV files.
+
+Usage:
+    datagrunt convert data/ --to parquet --jobs 8
+    datagrunt convert "drops/*.csv" --to jsonl --engine polars --output-dir out/
+"""
+
+# standard library
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import glob
+import multiprocessing
+import os
+from pathlib import Path
+import re
+import sys
+import time
+
+# local libraries
+from .csvfile import CSVWriter
+from .core.compression import Compression
+from .core.databases import DuckDBSession
+from .core.fileproperties import CSVProperties
+from .core.filesets import CSVFileSet
+
+class BatchConverter:
+    """Class to convert many CSV files at once on a pool of worker processes.
+
+    Every file is converted by its own CSVWriter in a worker process, so the
+    conversions run side by side instead of one file at a time. The CPUs are
+    split between the workers so the engines do not oversubscribe the machine.
+    A file that fails to convert is reported without stopping the others.
+    """
+
+    OUTPUT_FORMATS = {
+        'csv': ('write_csv', '.csv'),
+        'excel': ('write_excel', '.xlsx'),
+        'json': ('write_json', '.json'),
+        'jsonl': ('write_json_newline_delimited', '.jsonl'),
+        'parquet': ('write_parquet', '.parquet'),
+    }
+    CSV_PATTERNS = ['*.csv'] + [f'*.csv{suffix}' for suffix in Compression.SUFFIXES]
+    BYTES_PER_MB = 1024 ** 2
+    SIZE_UNITS = {'b': 1, 'kb': 1000, 'mb': 1000 ** 2, 'gb': 1000 ** 3, 'tb': 1000 ** 4,
+                  'kib': 1024, 'mib': 1024 ** 2, 'gib': 1024 ** 3, 'tib': 1024 ** 4}
+    INVALID_SIZE_MESSAGE = "Memory limit '{size}' is not a size such as 8GB or 512MiB."
+    SAME_FILE_MESSAGE = "Output file '{out_filename}' would overwrite its input file."
+    DUPLICATE_OUTPUT_MESSAGE = ("Input files '{first}' and '{second}' would both be written "
+                                "to '{out_filename}'.")
+    UNKNOWN_FORMAT_MESSAGE = "Output format '{out_format}' is not one of {formats}."
+
+    def __init__(self, source, out_format='parquet', jobs=None, engine='duckdb',
+                 output_dir=None, memory_limit=None, temp_directory=None):
+        """
+        Initialize the BatchConverter class.
+
+        Args:
+            source (str): A directory of CSV files, a glob pattern or a single file.
+            out_format (str): The output format, one of OUTPUT_FORMATS.
+            jobs (int, optional): Number of worker processes. Defaults to the number of CPUs.
+            engine (str): The writer engine, 'duckdb' or 'polars'.
+            output_dir (str, optional): Directory to write the outputs to. Defaults to
+                the directory of each input file.
+            memory_limit (str, optional): Memory budget shared by all workers, such as
+                '8GB'. Runs every worker in out-of-core mode with an equal share.
+            temp_directory (str, optional): Directory the workers spill to.
+        """
+        if out_format not in self.OUTPUT_FORMATS:
+            raise ValueError(self.UNKNOWN_FORMAT_MESSAGE.format(
+                out_format=out_format, formats=sorted(self.OUTPUT_FORMATS)))
+        self.filepaths = self.expand_source(source)
+        self.out_format = out_format
+        self.jobs = max(1, min(jobs or os.cpu_count() or 1, len(self.filepaths)))
+        self.engine = engine
+        self.output_dir = output_dir
+        self.threads_per_job = max(1, (os.cpu_count() or 1) // self.jobs)
+        self.memory_limit_per_job = None
+        if memory_limit:
+            self.memory_limit_per_job = f'{self.parse_size(memory_limit) // self.jobs}B'
+        self.temp_directory = temp_directory
+
+    @classmethod
+    def parse_size(cls, size):
+        """Convert a size such as '8GB' or '512MiB' to bytes.
+
+        Args:
+            size (str or int): The size, in bytes when it has no unit.
+
+        Returns:
+            int: The size in bytes.
+        """
+        match = re.fullmatch(r'\s*([\d.]+)\s*([a-zA-Z]*)\s*', str(size))
+        unit = match.group(2).lower() if match else None
+        if unit == '':
+            unit = 'b'
+        if unit not in cls.SIZE_UNITS:
+            raise ValueError(cls.INVALID_SIZE_MESSAGE.format(size=size))
+        return int(float(match.group(1)) * cls.SIZE_UNITS[unit])
+
+    @classmethod
+    def expand_source(cls, source):
+        """Expand a directory, glob pattern or file into a list of CSV file paths.
+
+        A directory expands to its CSV files, compressed or not.
+
+        Args:
+            source (str): A directory of CSV files, a glob pattern or a single file.
+
+        Returns:
+            list: The CSV file paths.
+        """
+        if not os.path.isdir(source):
+            return CSVFileSet.expand_filepaths(source)
+        directory = glob.escape(source)
+        filepaths = sorted(filepath for pattern in cls.CSV_PATTERNS
+                           for filepath in glob.glob(os.path.join(directory, pattern)))
+        if not filepaths:
+            raise FileNotFoundError(CSVFileSet.NO_FILES_MESSAGE.format(filepath=source))
+        return filepaths
+
+    def out_filename(self, filepath):
+        """Return the output file path for an input file.
+
+        The compression and CSV suffixes are replaced, so 'x.csv.gz' becomes 'x.parquet'.
+
+        Args:
+            filepath (str): Path to the input file.
+
+        Returns:
+            str: Path to the output file.
+        """
+        _, suffix = self.OUTPUT_FORMATS[self.out_format]
+        out_dir = Path(self.output_dir) if self.output_dir else Path(filepath).parent
+        name = Path(filepath).name
+        while Path(name).suffix.lower() in Compression.SUFFIXES:
+            name = Path(name).stem
+        out_filename = out_dir / f'{Path(name).stem}{suffix}'
+        if out_filename.resolve() == Path(filepath).resolve():
+            raise ValueError(self.SAME_FILE_MESSAGE.format(out_filename=out_filename))
+        return str(out_filename)
+
+    def out_filenames(self):
+        """Return the output file path of every input file, in input order.
+
+        Raises a ValueError when two input files would be written to the same output
+        file, such as same-named files from different directories in one output directory.
+
+        Returns:
+            list: Paths to the output files.
+        """
+        out_filenames = []
+        inputs_by_output = {}
+        for filepath in self.filepaths:
+            out_filename = self.out_filename(filepath)
+            resolved = Path(out_filename).resolve()
+            if resolved in inputs_by_output:
+                raise ValueError(self.DUPLICATE_OUTPUT_MESSAGE.format(
+                    first=inputs_by_output[resolved], second=filepath, out_filename=out_filename))
+            inputs_by_output[resolved] = filepath
+            out_filenames.append(out_filename)
+        return out_filenames
+
+    def run(self, report=None):
+        """Convert every file on the worker pool.
+
+        Args:
+            report (callable, optional): Called with each file result as it completes.
+
+        Returns:
+            dict: The aggregate result, with the per-file results under 'files'.
+                A file that failed has its error under 'error'.
+        """
+        out_filenames = self.out_filenames()
+        if self.output_dir:
+            os.makedirs(self.output_dir, exist_ok=True)
+        start = time.perf_counter()
+        results = []
+        # spawn keeps DuckDB and Polars thread pools out of forked workers
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=self.jobs, mp_context=context,
+                                 initializer=_init_worker,
+                                 initargs=(self.threads_per_job, self.memory_limit_per_job,
+                                           self.temp_directory)) as executor:
+            futures = {executor.submit(convert_file, filepath, out_filename, self.out_format,
+                                       self.engine): (filepath, out_filename)
+                       for filepath, out_filename in zip(self.filepaths, out_filenames)}
+            for future in as_completed(futures):
+                try:
+                    result = future.result()
+                except Exception as error:  # one bad file must not abort the batch
+                    filepath, out_filename = futures[future]
+                    result = {'filepath': filepath,
+                              'out_filename': out_filename,
+                              'error': f'{type(error).__name__}: {error}',
+                              }
+                results.append(result)
+                if report:
+                    report(result)
+        elapsed = time.perf_counter() - start
+        results.sort(key=lambda result: self.filepaths.index(result['filepath']))
+        return self.summarize(results, elapsed)
+
+    @classmethod
+    def throughput(cls, rows, size_in_bytes, seconds):
+        """Return rows per second and megabytes per second for a conversion."""
+        seconds = max(seconds, 1e-9)
+        return rows / seconds, size_in_bytes / cls.BYTES_PER_MB / seconds
+
+    @classmethod
+    def summarize(cls, results, seconds):
+        """Aggregate per-file results into a total result.
+
+        Failed files count towards 'failed' but not towards the totals.
+
+        Args:
+            results (list): The per-file results.
+            seconds (float): Wall-clock time of the whole batch.
+
+        Returns:
+            dict: Total rows, bytes, seconds and throughput, with the per-file results.
+        """
+        converted = [result for result in results if not result.get('error')]
+        rows = sum(result['rows'] for result in converted)
+        size_in_bytes = sum(result['size_in_bytes'] for result in converted)
+        rows_per_second, mb_per_second = cls.throughput(rows, size_in_bytes, seconds)
+        return {'files': results,
+                'failed': len(results) - len(converted),
+                'rows': rows,
+                'size_in_bytes': size_in_bytes,
+                'seconds': seconds,
+                'rows_per_second': rows_per_second,
+                'mb_per_second': mb_per_second,
+                }
+
+def _init_worker(threads, memory_limit=None, temp_directory=None):
+    """Open the worker's DuckDB session with its share of the CPUs and memory."""
+    # Polars sizes its thread pool on first use, which comes after this initializer
+    os.environ.setdefault('POLARS_MAX_THREADS', str(threads))
+    if memory_limit:
+        CSVProperties.set_out_of_core(memory_limit, temp_directory)
+    DuckDBSession.connect(threads=threads)
+
+def convert_file(filepath, out_filename, out_format, engine='duckdb'):
+    """Convert one CSV file and time the conversion.
+
+    Args:
+        filepath (str): Path to the CSV file.
+        out_filename (str): Path to the output file.
+        out_format (str): The output format, one of BatchConverter.OUTPUT_FORMATS.
+        engine (str): The writer engine, 'duckdb' or 'polars'.
+
+    Returns:
+        dict: The file paths, rows, bytes, seconds and throughput of the conversion.
+    """
+    start = time.perf_counter()
+    writer = CSVWriter(filepath, engine=engine)
+    write_method, _ = BatchConverter.OUTPUT_FORMATS[out_format]
+    rows = getattr(writer, write_method)(out_filename)
+    seconds = time.perf_counter() - start
+    if rows is None:
+        # Polars' streaming sinks do not report their rows, so count them untimed
+        rows = writer.row_count_without_header
+    rows_per_second, mb_per_second = BatchConverter.throughput(rows, writer.size_in_bytes,
+                                                               seconds)
+    return {'filepath': filepath,
+            'out_filename': out_filename,
+            'rows': rows,
+            'size_in_bytes': writer.size_in_bytes,
+            'seconds': seconds,
+            'rows_per_second': rows_per_second,
+            'mb_per_second': mb_per_second,
+            'error': None,
+            }
+
+def _format_result(name, result):
+    """Format a result as one line of the throughput report."""
+    return (f"{name}: {result['rows']:,} rows, "
+            f"{result['size_in_bytes'] / BatchConverter.BYTES_PER_MB:,.1f} MB in "
+            f"{result['seconds']:.2f}s ({result['rows_per_second']:,.0f} rows/s, "
+            f"{result['mb_per_second']:,.1f} MB/s)")
+
+def _convert(args):
+    """Run the convert command."""
+    converter = BatchConverter(args.source, args.to, args.jobs, args.engine, args.output_dir,
+                               args.memory_limit, args.temp_dir)
+
+    def report(result):
+        if result['error']:
+            print(f"datagrunt: error: {result['filepath']}: {result['error']}", file=sys.stderr,
+                  flush=True)
+        elif not args.quiet:
+            print(_format_result(result['out_filename'], result), flush=True)
+
+    summary = converter.run(report=report)
+    print(_format_result(f"total ({len(summary['files'])} files, {converter.jobs} jobs)",
+                         summary))
+    if summary['failed']:
+        print(f"datagrunt: {summary['failed']} of {len(summary['files'])} files failed",
+              file=sys.stderr)
+        return 1
+    return 0
+
+def build_parser():
+    """Build the datagrunt argument parser."""
+    parser = argparse.ArgumentParser(prog='datagrunt',
+                                     description='Read CSV files and convert them to other file formats.')
+    commands = parser.add_subparsers(dest='command', required=True)
+    convert = commands.add_parser('convert', help='Convert CSV files in parallel.')
+    convert.add_argument('source', help='A directory of CSV files, a glob pattern or a file.')
+    convert.add_argument('--to', choices=sorted(BatchConverter.OUTPUT_FORMATS),
+                         default='parquet', help='The output format.')
+    convert.add_argument('--jobs', '-j', type=int, default=None,
+                         help='Number of worker processes. Defaults to the number of CPUs.')
+    convert.add_argument('--engine', choices=CSVWriter.WRITER_ENGINES, default='duckdb',
+                         help='The writer engine.')
+    convert.add_argument('--output-dir', '-o', default=None,
+                         help='Directory to write the outputs to. Defaults to beside each input.')
+    convert.add_argument('--memory-limit', default=None,
+                         help='Memory budget shared by all workers, such as 8GB. '
+                              'Workers then run out of core and spill beyond their share.')
+    convert.add_argument('--temp-dir', default=None,
+                         help='Directory the workers spill to with --memory-limit.')
+    convert.add_argument('--quiet', '-q', action='store_true',
+                         help='Only report the aggregate throughput.')
+    convert.set_defaults(handler=_convert)
+    return parser
+
+def main(argv=None):
+    """Entry point of the datagrunt console script."""
+    args = build_parser().parse_args(argv)
+    try:
+        return args.handler(args)
+    except (FileNotFoundError, ValueError) as error:
+        print(f'datagrunt: error: {error}', file=sys.stderr)
+        return 1
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,63 @@
+"""Module for persisting file metadata between runs."""
+
+# standard library
+import hashlib
+import json
+import os
+from pathlib import Path
+import tempfile
+
+class MetadataCache:
+    """Persistent cache of file metadata stored as JSON sidecar files.
+
+    Entries are keyed by a file fingerprint of resolved path, size in bytes and
+    modification time, so an entry goes stale as soon as the file changes.
+    """
+
+    SIDECAR_SUFFIX = '.json'
+
+    def __init__(self, cache_dir):
+        """
+        Initialize the MetadataCache class.
+
+        Args:
+            cache_dir (str): Directory to store the sidecar files in. Created if missing.
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def _sidecar_path(self, fingerprint):
+        """Return the sidecar file path for a file fingerprint."""
+        key = hashlib.sha1(json.dumps(list(fingerprint)).encode()).hexdigest()
+        return self.cache_dir / f'{key}{self.SIDECAR_SUFFIX}'
+
+    def get(self, fingerprint):
+        """Return the cached metadata for a fingerprint.
+
+        Args:
+            fingerprint (tuple): Resolved path, size in bytes and modification time.
+
+        Returns:
+            dict: The cached metadata, or None if there is no entry.
+        """
+        try:
+            with open(self._sidecar_path(fingerprint), 'r', encoding='utf-8') as sidecar:
+                return json.load(sidecar)
+        except (OSError, ValueError):
+            return None
+
+    def update(self, fingerprint, metadata):
+        """Merge metadata into the cached entry for a fingerprint.
+
+        Args:
+            fingerprint (tuple): Resolved path, size in bytes and modification time.
+            metadata (dict): JSON serializable metadata to store.
+        """
+        entry = self.get(fingerprint) or {}
+        entry.update(metadata)
+        sidecar_path = self._sidecar_path(fingerprint)
+        # write to a temporary file first so readers never see a partial entry
+        with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=self.cache_dir,
+                                         suffix='.tmp', delete=False) as sidecar:
+            json.dump(entry, sidecar)
+        os.replace(sidecar.name, sidecar_path)
@@ -0,0 +1,114 @@
+"""Module for detecting and streaming compressed files."""
+
+# standard library
+import bz2
+import gzip
+import io
+import lzma
+from pathlib import Path
+
+# third party libraries
+import pyarrow as pa
+
+class Compression:
+    """Class to detect the compression of a file from its magic bytes and stream it.
+
+    Detection reads the first bytes of the file, so it works whatever the file is
+    called. Files are decompressed as streams, never to disk. DuckDB and Polars
+    decompress gzip and zstd themselves. DuckDB cannot read bz2 or xz, and Polars
+    reads them from a decompressed stream.
+    """
+
+    MAGIC_BYTES = {
+        'gzip': b'\x1f\x8b',
+        'zstd': b'\x28\xb5\x2f\xfd',
+        'bz2': b'BZh',
+        'xz': b'\xfd7zXZ\x00',
+    }
+    SUFFIXES = {'.gz': 'gzip', '.gzip': 'gzip', '.zst': 'zstd', '.zstd': 'zstd',
+                '.bz2': 'bz2', '.xz': 'xz'}
+    MAGIC_BYTES_LENGTH = max(len(magic) for magic in MAGIC_BYTES.values())
+    NATIVE_COMPRESSIONS = ['gzip', 'zstd']
+    DUCKDB_UNSUPPORTED_MESSAGE = ("DuckDB cannot read {compression} compressed files. "
+                                  "Use the Polars engine, or recompress with gzip or zstd.")
+
+    @classmethod
+    def detect(cls, filepath):
+        """Detect the compression of a file from its magic bytes.
+
+        Args:
+            filepath (str): Path to the file.
+
+        Returns:
+            str: 'gzip', 'zstd', 'bz2' or 'xz', or None for an uncompressed file.
+        """
+        with open(filepath, 'rb') as file:
+            magic = file.read(cls.MAGIC_BYTES_LENGTH)
+        for compression, magic_bytes in cls.MAGIC_BYTES.items():
+            if magic.startswith(magic_bytes):
+                return compression
+        return None
+
+    @classmethod
+    def inner_suffix(cls, filepath):
+        """Return the suffix of a file name without its compression suffix.
+
+        Args:
+            filepath (str): Path to the file, such as 'data.csv.gz'.
+
+        Returns:
+            str: The suffix, such as '.csv'.
+        """
+        path = Path(filepath)
+        if path.suffix.lower() in cls.SUFFIXES:
+            path = Path(path.stem)
+        return path.suffix
+
+    @classmethod
+    def open(cls, filepath, compression=None):
+        """Open a file for reading its decompressed bytes as a stream.
+
+        Args:
+            filepath (str or file object): Path to the file, or a binary file object
+                to read it from.
+            compression (str, optional): The compression of the file. Opens the
+                file as is when omitted.
+
+        Returns:
+            A binary file object.
+        """
+        if hasattr(filepath, 'read'):
+            if compression == 'zstd':
+                return io.BufferedReader(pa.input_stream(filepath, compression='zstd'))
+            if compression is None:
+                return filepath
+        if compression == 'gzip':
+            return gzip.open(filepath, 'rb')
+        if compression == 'bz2':
+            return bz2.open(filepath, 'rb')
+        if compression == 'xz':
+            return lzma.open(filepath, 'rb')
+        if compression == 'zstd':
+            # buffered for readline, which PyArrow's compressed streams lack
+            return io.BufferedReader(pa.input_stream(str(filepath), compression='zstd'))
+        return open(filepath, 'rb')
+
+    @classmethod
+    def read(cls, filepath, compression=None):
+        """Return all the decompressed bytes of a file."""
+        with cls.open(filepath, compression) as file:
+            return file.read()
+
+    @classmethod
+    def duckdb_compression(cls, compression):
+        """Return the read_csv compression option for DuckDB.
+
+        Args:
+            compression (str): The compression of the file, or None.
+
+        Returns:
+            str: The option value, or None for an uncompressed file.
+        """
+        if compression and compression not in cls.NATIVE_COMPRESSIONS:
+            raise ValueError(cls.DUCKDB_UNSUPPORTED_MESSAGE.format(compression=compression))
+        return compression
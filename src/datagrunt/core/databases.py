@@ -1,53 +1,220 @@
 """Module for interfacing with databases."""
 
 # standard library
-import os
+import atexit
+from contextlib import contextmanager
 from pathlib import Path
 import re
+import threading
+import weakref
 
 # third party libraries
 import duckdb
 
+class DuckDBSession:
+    """Process-wide registry of shared DuckDB connections.
+
+    One connection is opened per database and shared by every reader, writer and
+    query helper in the process. Each thread gets its own cursor on that
+    connection, since DuckDB connections must not be used from several threads at
+    once, and the cursor is released once its thread is gone. Connections are
+    closed explicitly with close() or close_all(), or when the interpreter exits.
+    The session also keeps a catalog of the file versions loaded into each
+    database, so files are not re-imported for every query.
+    """
+    IN_MEMORY_DATABASE = ':memory:'
+    DEFAULT_THREAD_COUNT = 16
+
+    _default_database = IN_MEMORY_DATABASE
+    _settings = {}
+    _connections = {}
+    _cursors = {}
+    _catalog = {}
+    _lock = threading.RLock()
+
+    @classmethod
+    def _set_database(cls, database=None):
+        """Evaluate if a database is passed in and if not, return the default database."""
+        if database:
+            return str(database)
+        return cls._default_database
+
+    @classmethod
+    def set_default_database(cls, database=None):
+        """Set the database used when none is passed explicitly.
+
+        Args:
+            database (str, optional): Path to a DuckDB database file. Resets to an
+                in-memory database when omitted.
+        """
+        cls._default_database = str(database) if database else cls.IN_MEMORY_DATABASE
+
+    @classmethod
+    def configure(cls, **settings):
+        """Apply DuckDB settings to every shared connection, open or opened later.
+
+        Args:
+            **settings: DuckDB setting names mapped to values, such as
+                memory_limit='4GB'. A value of None resets the setting to the DuckDB
+                default.
+        """
+        with cls._lock:
+            for name, value in settings.items():
+                if value is None:
+                    cls._settings.pop(name, None)
+                else:
+                    cls._settings[name] = str(value)
+                for connection in cls._connections.values():
+                    if value is None:
+                        connection.execute(f'RESET {name}')
+                    else:
+                        connection.execute(f"SET {name} = '{value}'")
+
+    @classmethod
+    def connect(cls, database=None, threads=DEFAULT_THREAD_COUNT):
+        """Return the calling thread's connection to a shared database.
+
+        The database is opened on first use and reused afterwards.
+
+        Args:
+            database (str, optional): Path to a DuckDB database file. Defaults to the
+                session default, which is in-memory unless changed.
+            threads (int): Number of threads DuckDB uses when opening the database.
+
+        Returns:
+            A DuckDB DuckDBPyConnection.
+        """
+        database = cls._set_database(database)
+        thread = threading.current_thread()
+        with cls._lock:
+            if database not in cls._connections:
+                config = {'threads': threads, **cls._settings}
+                cls._connections[database] = duckdb.connect(database, config=config)
+                # keyed by thread object, so finished threads drop their cursors
+                # and a reused thread identifier never inherits a stale cursor
+                cls._cursors[database] = weakref.WeakKeyDictionary()
+            cursors = cls._cursors[database]
+            if thread not in cursors:
+                cursors[thread] = cls._connections[database].cursor()
+            return cursors[thread]
+
+    @classmethod
+    def catalog_entry(cls, name, database=None):
+        """Return the version recorded for a table or view of a database, or None.
+
+        Args:
+            name (str): Name of the table or view.
+            database (str, optional): Path to a DuckDB database file.
+        """
+        with cls._lock:
+            return cls._catalog.get(cls._set_database(database), {}).get(name)
+
+    @classmethod
+    def set_catalog_entry(cls, name, version, database=None):
+        """Record the version of the data a table or view of a database holds.
+
+        Args:
+            name (str): Name of the table or view.
+            version: Any value identifying the data, such as file fingerprints.
+                None forgets the entry.
+            database (str, optional): Path to a DuckDB database file.
+        """
+        with cls._lock:
+            catalog = cls._catalog.setdefault(cls._set_database(database), {})
+            if version is None:
+                catalog.pop(name, None)
+            else:
+                catalog[name] = version
+
+    @classmethod
+    def interrupt(cls, thread_id, database=None):
+        """Interrupt the query a thread is running on its cursor of a shared database.
+
+        Args:
+            thread_id (int): Identifier of the thread, from threading.get_ident().
+            database (str, optional): Path to a DuckDB database file.
+        """
+        with cls._lock:
+            cursors = list(cls._cursors.get(cls._set_database(database), {}).items())
+        for thread, cursor in cursors:
+            if thread.ident == thread_id and thread.is_alive():
+                cursor.interrupt()
+
+    @classmethod
+    def is_open(cls, database=None):
+        """Check if a shared connection is open for a database."""
+        return cls._set_database(database) in cls._connections
+
+    @classmethod
+    def close(cls, database=None):
+        """Close the shared connection and all cursors for a database.
+
+        Args:
+            database (str, optional): Path to a DuckDB database file. Defaults to the
+                session default.
+        """
+        database = cls._set_database(database)
+        with cls._lock:
+            cls._catalog.pop(database, None)
+            for cursor in list(cls._cursors.pop(database, {}).values()):
+                cursor.close()
+            connection = cls._connections.pop(database, None)
+            if connection is not None:
+                connection.close()
+
+    @classmethod
+    def close_all(cls):
+        """Close every shared connection opened in this process."""
+        with cls._lock:
+            for database in list(cls._connections):
+                cls.close(database)
+
+    @classmethod
+    @contextmanager
+    def scoped(cls, database=None):
+        """Context manager yielding a connection that is closed on exit.
+
+        Args:
+            database (str, optional): Path to a DuckDB database file.
+
+        Yields:
+            A DuckDB DuckDBPyConnection.
+        """
+        try:
+            yield cls.connect(database)
+        finally:
+            cls.close(database)
+
+atexit.register(DuckDBSession.close_all)
+
 class DuckDBDatabase:
     """Class to configure local database for file processing.
        Utilizes duckdb as the processing engine.
     """
     DEFAULT_ENCODING = 'utf-8'
-    DEFAULT_THREAD_COUNT = 16
 
-    def __init__(self, filepath):
+    def __init__(self, filepath, database=None):
         """
         Initialize the FileDatabase class.
 
         Args:
             filepath (str): Path to the file.
+            database (str, optional): Path to a DuckDB database file. Defaults to the
+                shared session database.
         """
         self.filepath = filepath
-        self.database_filename = self._set_database_filename()
+        self.database = database
         self.database_table_name = self._set_database_table_name()
-        self.database_connection = self._set_database_connection()
-
-    def __del__(self):
-        """Delete .db files after use."""
-        if os.path.exists(self.database_filename):
-            os.remove(self.database_filename)
 
     def _format_filename_string(self):
         """Remove all non alphanumeric characters from filename."""
         return re.sub(r'[^a-zA-Z0-9]', '', Path(self.filepath).stem)
 
-    def _set_database_filename(self):
-        """Return name of duckdb file created at runtime."""
-        return f'{self._format_filename_string()}.db'
-
     def _set_database_table_name(self):
         """Return name of duckdb import table created during file import."""
         return f'{self._format_filename_string()}'
 
-    def _set_database_connection(self, threads=DEFAULT_THREAD_COUNT):
-        """Establish a connection with duckdb.
-
-        Args:
-            threads (int): Number of threads to use for duckdb.
-        """
-        return duckdb.connect(self.database_filename, config = {'threads': threads})
+    @property
+    def database_connection(self):
+        """Return the shared session connection for the database."""
+        return DuckDBSession.connect(self.database)
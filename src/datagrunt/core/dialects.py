@@ -0,0 +1,130 @@
+"""Module for detecting the dialect of delimited text files."""
+
+# standard library
+import re
+
+# third party libraries
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# local libraries
+from .encoding import Encoding
+
+class DialectDetector:
+    """Class to detect the delimiter and quote character of a CSV sample.
+
+    Detection reads a bounded byte sample spanning many rows. Quoted fields are
+    removed for each candidate quote character, then every candidate delimiter is
+    counted per row with vectorized PyArrow kernels. The winning pair is the one
+    whose per-row count is most consistent across the sample, and that
+    consistency is reported as the detection confidence.
+    """
+
+    SAMPLE_BYTES = 64 * 1024
+    DELIMITER_CANDIDATES = [',', '\t', ';', '|', ' ', ':']
+    QUOTECHAR_CANDIDATES = ['"', "'"]
+    DEFAULT_QUOTECHAR = '"'
+    EXTRA_CANDIDATE_REGEX_PATTERN = r'[^0-9a-zA-Z_ "\'-]'
+
+    def __init__(self, sample):
+        """
+        Initialize the DialectDetector class.
+
+        Args:
+            sample (str): Text from the start of the file, ending on a full row.
+        """
+        self.sample = sample
+        self.first_row = sample.split('\n', 1)[0]
+
+    @classmethod
+    def from_file(cls, filepath, encoding='utf-8', sample_bytes=SAMPLE_BYTES, compression=None):
+        """Create a detector from a bounded sample of a file.
+
+        Args:
+            filepath (str): Path to the file.
+            encoding (str): Encoding of the file. The sample is taken from the
+                file transcoded to UTF-8.
+            sample_bytes (int): Maximum number of UTF-8 bytes to read.
+            compression (str, optional): Compression of the file. The sample is then
+                taken from the decompressed stream.
+
+        Returns:
+            DialectDetector: A detector for the sample.
+        """
+        with Encoding.open(filepath, encoding, compression) as csv_file:
+            raw_sample = csv_file.read(sample_bytes)
+            at_end_of_file = not csv_file.read(1)
+        if not at_end_of_file and b'\n' in raw_sample:
+            # drop the trailing partial row so it does not skew the counts
+            raw_sample = raw_sample[:raw_sample.rfind(b'\n') + 1]
+        # utf-8-sig drops a byte order mark that UTF-8 files may start with
+        return cls(raw_sample.decode('utf-8-sig', errors='replace'))
+
+    def _delimiter_candidates(self):
+        """Return the candidate delimiters in priority order."""
+        extra_candidates = re.findall(self.EXTRA_CANDIDATE_REGEX_PATTERN, self.first_row)
+        candidates = list(self.DELIMITER_CANDIDATES)
+        for candidate in extra_candidates:
+            if candidate not in candidates and candidate not in ('\r', '\n'):
+                candidates.append(candidate)
+        return candidates
+
+    def _rows_without_quoted_fields(self, quotechar):
+        """Split the sample into rows after removing quoted fields.
+
+        Args:
+            quotechar (str): The quote character to remove quoted fields for.
+
+        Returns:
+            pyarrow.StringArray: The non-empty rows of the sample.
+        """
+        quote = re.escape(quotechar)
+        unquoted = re.sub(f'{quote}(?:[^{quote}]|{quote}{quote})*{quote}', '', self.sample)
+        rows = [row for row in unquoted.splitlines() if row.strip()]
+        return pa.array(rows, pa.string())
+
+    def _score(self, rows, delimiter):
+        """Score a delimiter by how consistently it appears across rows.
+
+        Args:
+            rows (pyarrow.StringArray): The rows to count the delimiter in.
+            delimiter (str): The candidate delimiter.
+
+        Returns:
+            tuple: The modal count per row and the share of rows with that count.
+        """
+        counts = pc.count_substring(rows, delimiter)
+        mode = pc.mode(counts)[0]
+        return mode['mode'].as_py(), mode['count'].as_py() / len(rows)
+
+    def detect(self):
+        """Detect the delimiter and quote character of the sample.
+
+        Returns:
+            dict: The detected 'delimiter' (None if no candidate splits the rows),
+            'quotechar' and 'confidence' between 0 and 1.
+        """
+        best = {'delimiter': None, 'quotechar': self.DEFAULT_QUOTECHAR, 'confidence': 0.0}
+        best_rank = None
+        candidates = self._delimiter_candidates()
+        for quote_priority, quotechar in enumerate(self.QUOTECHAR_CANDIDATES):
+            if quotechar not in self.sample and quotechar != self.DEFAULT_QUOTECHAR:
+                continue
+            rows = self._rows_without_quoted_fields(quotechar)
+            if len(rows) == 0:
+                continue
+            for delimiter_priority, delimiter in enumerate(candidates):
+                modal_count, consistency = self._score(rows, delimiter)
+                if modal_count == 0:
+                    continue
+                rank = (consistency, -delimiter_priority, -quote_priority)
+                if best_rank is None or rank > best_rank:
+                    best_rank = rank
+                    best = {'delimiter': delimiter,
+                            'quotechar': quotechar,
+                            'confidence': consistency}
+        return best
+
+    def detect_newline(self):
+        """Return the newline sequence used in the sample."""
+        return '\r\n' if '\r\n' in self.sample else '\n'
@@ -0,0 +1,123 @@
+"""Module for detecting the character encoding of files and transcoding them to UTF-8."""
+
+# standard library
+import codecs
+import io
+
+# third party libraries
+import pyarrow as pa
+
+# local libraries
+from .compression import Compression
+
+class Encoding:
+    """Class to detect the character encoding of a file and stream it as UTF-8.
+
+    Detection looks at a bounded sample from the start of the file: a byte order
+    mark decides it outright, then NUL byte statistics point to UTF-16 without
+    a mark, and otherwise the sample either decodes as UTF-8 or is taken as
+    Windows-1252, or Latin-1 when it holds bytes Windows-1252 leaves undefined.
+    DuckDB and Polars only read UTF-8, so other encodings are transcoded as a
+    stream on the way in.
+    """
+
+    DEFAULT_ENCODING = 'utf-8'
+    SAMPLE_BYTES = 64 * 1024
+    # UTF-32 marks start with the UTF-16 marks, so they are checked first
+    BYTE_ORDER_MARKS = [
+        (codecs.BOM_UTF32_LE, 'utf-32'),
+        (codecs.BOM_UTF32_BE, 'utf-32'),
+        (codecs.BOM_UTF8, 'utf-8-sig'),
+        (codecs.BOM_UTF16_LE, 'utf-16'),
+        (codecs.BOM_UTF16_BE, 'utf-16'),
+    ]
+    NATIVE_ENCODINGS = ['utf-8', 'utf-8-sig']
+    # share of NUL bytes at odd or even positions that marks UTF-16 text
+    UTF16_NUL_RATIO = 0.3
+
+    @classmethod
+    def detect_bytes(cls, sample):
+        """Detect the encoding of a sample of bytes.
+
+        Args:
+            sample (bytes): Bytes from the start of a file.
+
+        Returns:
+            str: A Python codec name, such as 'utf-8', 'utf-16' or 'cp1252'.
+        """
+        for byte_order_mark, encoding in cls.BYTE_ORDER_MARKS:
+            if sample.startswith(byte_order_mark):
+                return encoding
+        if b'\x00' in sample:
+            half = max(len(sample) // 2, 1)
+            if sample[1::2].count(0) / half >= cls.UTF16_NUL_RATIO:
+                return 'utf-16-le'
+            if sample[0::2].count(0) / half >= cls.UTF16_NUL_RATIO:
+                return 'utf-16-be'
+        try:
+            # the sample may end in the middle of a multi-byte character
+            codecs.getincrementaldecoder('utf-8')().decode(sample, final=False)
+            return cls.DEFAULT_ENCODING
+        except UnicodeDecodeError:
+            pass
+        try:
+            sample.decode('cp1252')
+            return 'cp1252'
+        except UnicodeDecodeError:
+            return 'latin-1'
+
+    @classmethod
+    def detect(cls, filepath, compression=None, sample_bytes=SAMPLE_BYTES):
+        """Detect the encoding of a file from a bounded sample of its bytes.
+
+        Args:
+            filepath (str): Path to the file.
+            compression (str, optional): The compression of the file.
+            sample_bytes (int): Maximum number of bytes to sample.
+
+        Returns:
+            str: A Python codec name. Empty files are taken as UTF-8.
+        """
+        with Compression.open(filepath, compression) as file:
+            sample = file.read(sample_bytes)
+        if not sample:
+            return cls.DEFAULT_ENCODING
+        return cls.detect_bytes(sample)
+
+    @classmethod
+    def is_native(cls, encoding):
+        """Check if DuckDB and Polars read the encoding without transcoding."""
+        return encoding is None or codecs.lookup(encoding).name in cls.NATIVE_ENCODINGS
+
+    @classmethod
+    def is_ascii_compatible(cls, encoding):
+        """Check if newlines and CSV punctuation are single ASCII bytes in the encoding,
+        so byte offsets found by scanning for them land on record boundaries."""
+        return cls.is_native(encoding) or '\n,;|\t"\''.encode(encoding) == b'\n,;|\t"\''
+
+    @classmethod
+    def open(cls, filepath, encoding=None, compression=None):
+        """Open a file as a stream of UTF-8 bytes, transcoding it on the fly if needed.
+
+        Args:
+            filepath (str): Path to the file.
+            encoding (str, optional): The encoding of the file. Read as is when
+                omitted or already UTF-8.
+            compression (str, optional): The compression of the file.
+
+        Returns:
+            A binary file object.
+        """
+        stream = Compression.open(filepath, compression)
+        if cls.is_native(encoding):
+            return stream
+        transcoded = pa.transcoding_input_stream(pa.PythonFile(stream, mode='r'),
+                                                 encoding, cls.DEFAULT_ENCODING)
+        # buffered for readline, which PyArrow's transcoding streams lack
+        return io.BufferedReader(transcoded)
+
+    @classmethod
+    def read(cls, filepath, encoding=None, compression=None):
+        """Return all the bytes of a file, decompressed and transcoded to UTF-8."""
+        with cls.open(filepath, encoding, compression) as file:
+            return file.read()
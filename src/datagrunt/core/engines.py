@@ -1,45 +1,84 @@
 """Module engines to enable data processing."""
 
 # standard library
+import itertools
 
 # third party libraries
-import duckdb
 import polars as pl
+import pyarrow as pa
+import pyarrow.csv as pa_csv
 
 # local libraries
+from .compression import Compression
+from .encoding import Encoding
+from .excel import ExcelWriter
 from .fileproperties import CSVProperties
+from .parquet import ParquetDatasetWriter
 from .queries import DuckDBQueries
+from .records import RecordScanner
+from .schemas import SchemaInference
 from .logger import show_large_file_warning, show_dataframe_sample
 
 class CSVReaderDuckDBEngine(CSVProperties):
     """Class to read CSV files and convert CSV files powered by DuckDB."""
 
-    def __init__(self, filepath):
+    ENGINE_NAME = 'duckdb'
+
+    def __init__(self, filepath, schema=None):
         """
         Initialize the CSVReader class.
 
         Args:
             filepath (str): Path to the file to read.
+            schema (dict, optional): Column names mapped to DuckDB type names.
+                Every column is read as VARCHAR when omitted.
         """
         super().__init__(filepath)
-        self.db_table = DuckDBQueries(self.filepath).database_table_name
+        self.schema = schema
+        self.queries = DuckDBQueries(self.filepath)
+        self.db_table = self.queries.database_table_name
 
     def _read_csv(self):
         """Reads a CSV using DuckDB.
 
+        DuckDB only reads UTF-8, so files in other encodings are read from a
+        transcoded stream, which a relation can only scan once.
+
         Returns:
             A DuckDB DuckDBPyRelation.
         """
-        return duckdb.read_csv(self.filepath,
-                               delimiter=self.delimiter,
-                               null_padding=True,
-                               all_varchar=True
-                            )
+        if not Encoding.is_native(self.encoding):
+            self.queries.register_source(self.delimiter, self.quotechar)
+            source_query = self.queries.read_csv_query(self.delimiter, self.schema)
+            return self.queries.database_connection.sql(source_query)
+        if self.schema:
+            type_options = {'dtype': self.schema}
+        else:
+            type_options = {'all_varchar': True}
+        compression = Compression.duckdb_compression(self.compression)
+        if compression:
+            type_options['compression'] = compression
+        return self.queries.database_connection.read_csv(self.filepath,
+                                                         delimiter=self.delimiter,
+                                                         null_padding=True,
+                                                         **type_options
+                                                         )
 
     def get_sample(self):
         """Return a sample of the CSV file."""
         self._read_csv().show()
 
+    def to_relation(self):
+        """Returns the CSV as an unmaterialized DuckDB relation.
+
+        Projections and filters applied to the relation are pushed down into the
+        CSV scan, so only the selected columns and matching rows are processed.
+
+        Returns:
+            A DuckDB DuckDBPyRelation.
+        """
+        return self._read_csv()
+
     def to_dataframe(self):
         """Converts CSV to a Polars dataframe.
 
@@ -68,30 +107,145 @@ class CSVReaderDuckDBEngine(CSVProperties):
         dicts = self.to_dataframe().to_dicts()
         return dicts
 
+    def iter_batches(self, batch_size=None):
+        """Streams the CSV as PyArrow record batches of bounded size.
+
+        Args:
+            batch_size (int, optional): Maximum number of rows per batch.
+
+        Yields:
+            PyArrow record batches.
+        """
+        yield from self.to_record_batch_reader(batch_size)
+
+    def to_record_batch_reader(self, batch_size=None):
+        """Streams the CSV as a PyArrow RecordBatchReader of bounded batches.
+
+        Batches are pulled from the DuckDB scan as the reader is consumed.
+
+        Args:
+            batch_size (int, optional): Maximum number of rows per batch.
+
+        Returns:
+            A PyArrow RecordBatchReader.
+        """
+        batch_size = batch_size or self.DEFAULT_BATCH_SIZE
+        return self._read_csv().fetch_arrow_reader(batch_size)
+
+    def read_range(self, start, end):
+        """Reads the records in a byte range of the CSV into a Polars dataframe.
+
+        DuckDB only reads files, so the header and the range are copied to a
+        temporary file first.
+
+        Args:
+            start (int): Byte offset of a record boundary, as returned by split.
+            end (int): Byte offset of a later record boundary.
+
+        Returns:
+            A Polars dataframe.
+        """
+        scanner = RecordScanner(self.filepath, self.quotechar, encoding=self.encoding)
+        with scanner.range_file(start, end) as range_path:
+            range_queries = DuckDBQueries(range_path, self.encoding)
+            range_queries.register_source(self.delimiter, self.quotechar)
+            source_query = range_queries.read_csv_query(self.delimiter, self.schema)
+            return self.queries.database_connection.sql(source_query).pl()
+
 class CSVReaderPolarsEngine(CSVProperties):
     """Class to read CSV files and convert CSV files powered by Polars."""
 
+    ENGINE_NAME = 'polars'
+
+    def __init__(self, filepath, schema=None):
+        """
+        Initialize the CSVReader class.
+
+        Args:
+            filepath (str): Path to the file to read.
+            schema (dict, optional): Column names mapped to DuckDB type names.
+                Polars infers the types itself when omitted.
+        """
+        super().__init__(filepath)
+        self.schema = schema
+        self.schema_overrides = SchemaInference.to_polars_schema(schema) if schema else None
+        # Polars only parses ISO 8601 itself, so dates in other formats are read as text
+        self.temporal_columns = self.formatted_columns(schema) if schema else {}
+        for column in self.temporal_columns:
+            self.schema_overrides[column] = pl.Utf8
+
+    def _parse_temporal_columns(self, frame):
+        """Parse the date and timestamp columns read as text with their sniffed formats."""
+        if not self.temporal_columns:
+            return frame
+        return frame.with_columns(SchemaInference.to_polars_expressions(self.temporal_columns))
+
+    def _is_streamed(self):
+        """Check if Polars cannot read the file itself, because it is compressed in a
+        format Polars cannot decompress or is not encoded in UTF-8."""
+        return ((self.compression and self.compression not in Compression.NATIVE_COMPRESSIONS)
+                or not Encoding.is_native(self.encoding))
+
+    def _source(self):
+        """Return the path Polars reads, or the UTF-8 bytes of a file Polars cannot
+        read itself."""
+        if self._is_streamed():
+            return Encoding.read(self.filepath, self.encoding, self.compression)
+        return self.filepath
+
     def get_sample(self):
         """Return a sample of the CSV file."""
-        df = pl.read_csv(self.filepath,
+        df = pl.read_csv(self._source(),
                          separator=self.delimiter,
                          truncate_ragged_lines=True,
+                         schema_overrides=self.schema_overrides,
                          n_rows=self.DATAFRAME_SAMPLE_ROWS
                         )
-        show_dataframe_sample(df)
+        show_dataframe_sample(self._parse_temporal_columns(df))
+
+    def to_lazyframe(self):
+        """Converts CSV to a Polars lazyframe.
+
+        Selects and filters applied to the lazyframe are pushed down into the
+        CSV scan when it is collected.
+
+        Returns:
+            A Polars lazyframe.
+        """
+        source = self._source()
+        if isinstance(source, bytes):
+            # Polars cannot stream scans of in-memory buffers into sink_* writers
+            lazyframe = pl.read_csv(source,
+                                    separator=self.delimiter,
+                                    truncate_ragged_lines=True,
+                                    schema_overrides=self.schema_overrides
+                                    ).lazy()
+        else:
+            lazyframe = pl.scan_csv(source,
+                                    separator=self.delimiter,
+                                    truncate_ragged_lines=True,
+                                    schema_overrides=self.schema_overrides
+                                    )
+        return self._parse_temporal_columns(lazyframe)
 
     def to_dataframe(self):
         """Converts CSV to a Polars dataframe.
 
+        Uses the Polars streaming engine in out-of-core mode.
+
         Returns:
             A Polars dataframe.
         """
         if self.is_large:
             show_large_file_warning()
-        return pl.read_csv(self.filepath,
-                           separator=self.delimiter,
-                           truncate_ragged_lines=True
-                           )
+        if self.out_of_core:
+            return self.to_lazyframe().collect(streaming=True)
+        df = pl.read_csv(self._source(),
+                         separator=self.delimiter,
+                         truncate_ragged_lines=True,
+                         schema_overrides=self.schema_overrides
+                         )
+        return self._parse_temporal_columns(df)
 
     def to_arrow_table(self):
         """Converts CSV to a PyArrow table.
@@ -111,17 +265,303 @@ class CSVReaderPolarsEngine(CSVProperties):
         dicts = self.to_dataframe().to_dicts()
         return dicts
 
+    def iter_batches(self, batch_size=None):
+        """Streams the CSV as Polars dataframes of bounded size.
+
+        Args:
+            batch_size (int, optional): Maximum number of rows per batch.
+
+        Yields:
+            Polars dataframes.
+        """
+        batch_size = batch_size or self.DEFAULT_BATCH_SIZE
+        if self.compression or not Encoding.is_native(self.encoding):
+            yield from self._iter_record_block_batches(batch_size)
+            return
+        reader = pl.read_csv_batched(self.filepath,
+                                     separator=self.delimiter,
+                                     truncate_ragged_lines=True,
+                                     schema_overrides=self.schema_overrides,
+                                     batch_size=batch_size
+                                     )
+        batches = reader.next_batches(1)
+        while batches:
+            for batch in batches:
+                yield from self._parse_temporal_columns(batch).iter_slices(batch_size)
+            batches = reader.next_batches(1)
+
+    @classmethod
+    def to_record_batch_stream(cls, first_dataframe, dataframes):
+        """Wrap a stream of Polars dataframes as a PyArrow RecordBatchReader.
+
+        Dataframes are converted to Arrow without copying as the reader pulls them.
+
+        Args:
+            first_dataframe: The first Polars dataframe, which sets the schema.
+            dataframes (iterable): The remaining Polars dataframes.
+
+        Returns:
+            A PyArrow RecordBatchReader.
+        """
+        schema = first_dataframe.to_arrow().schema
+
+        def record_batches():
+            for dataframe in itertools.chain([first_dataframe], dataframes):
+                arrow_table = dataframe.to_arrow()
+                if arrow_table.schema != schema:
+                    arrow_table = arrow_table.cast(schema)
+                yield from arrow_table.to_batches()
+
+        return pa.RecordBatchReader.from_batches(schema, record_batches())
+
+    def to_record_batch_reader(self, batch_size=None):
+        """Streams the CSV as a PyArrow RecordBatchReader of bounded batches.
+
+        Args:
+            batch_size (int, optional): Maximum number of rows per batch.
+
+        Returns:
+            A PyArrow RecordBatchReader.
+        """
+        dataframes = self.iter_batches(batch_size)
+        first_dataframe = next(dataframes, None)
+        if first_dataframe is None:
+            # without rows, reading the whole file only reads the header
+            first_dataframe = self.to_dataframe()
+        return self.to_record_batch_stream(first_dataframe, dataframes)
+
+    def _iter_record_block_batches(self, batch_size):
+        """Stream a compressed or transcoded CSV as Polars dataframes, parsing blocks of
+        whole records.
+
+        Every block is parsed with the column types of the first block.
+        """
+        scanner = RecordScanner(self.filepath, self.quotechar, encoding=self.encoding)
+        type_options = {'schema_overrides': self.schema_overrides}
+        for block in scanner.iter_record_blocks():
+            batch = pl.read_csv(block,
+                                separator=self.delimiter,
+                                truncate_ragged_lines=True,
+                                **type_options
+                                )
+            type_options = {'schema': batch.schema}
+            yield from self._parse_temporal_columns(batch).iter_slices(batch_size)
+
+    def read_range(self, start, end):
+        """Reads the records in a byte range of the CSV into a Polars dataframe.
+
+        Columns are read as text unless a schema is given, so every range of a
+        file has the same column types.
+
+        Args:
+            start (int): Byte offset of a record boundary, as returned by split.
+            end (int): Byte offset of a later record boundary.
+
+        Returns:
+            A Polars dataframe.
+        """
+        scanner = RecordScanner(self.filepath, self.quotechar, encoding=self.encoding)
+        data = scanner.read_range(start, end)
+        if not Encoding.is_native(self.encoding):
+            data = data.decode(self.encoding).encode(Encoding.DEFAULT_ENCODING)
+        df = pl.read_csv(data,
+                         separator=self.delimiter,
+                         truncate_ragged_lines=True,
+                         infer_schema=self.schema is not None,
+                         schema_overrides=self.schema_overrides
+                         )
+        return self._parse_temporal_columns(df)
+
+class CSVReaderPyArrowEngine(CSVProperties):
+    """Class to read CSV files and convert CSV files powered by PyArrow.
+
+    Uncompressed UTF-8 files are memory-mapped and parsed block by block on
+    PyArrow's thread pool, so wide files of mostly text parse on every core
+    without copying the input. Columns are read as text unless a schema is
+    given, and the delimiter, quote and escape characters come from the
+    detected dialect. Unlike the other engines, rows with more or fewer
+    fields than the header raise an error.
+    """
+
+    ENGINE_NAME = 'pyarrow'
+    # every block must hold at least one whole record, so leave room for wide rows
+    BLOCK_SIZE = 4 * 1024 * 1024
+
+    def __init__(self, filepath, schema=None):
+        """
+        Initialize the CSVReader class.
+
+        Args:
+            filepath (str): Path to the file to read.
+            schema (dict, optional): Column names mapped to DuckDB type names.
+                Every column is read as text when omitted.
+        """
+        super().__init__(filepath)
+        self.schema = schema
+        # PyArrow only parses ISO 8601 itself, so dates in other formats are read as text
+        self.temporal_columns = self.formatted_columns(schema) if schema else {}
+
+    def _source(self):
+        """Open the file for PyArrow, memory-mapped unless it must be decompressed
+        or transcoded to UTF-8 as a stream."""
+        if self.compression or not Encoding.is_native(self.encoding):
+            return Encoding.open(self.filepath, self.encoding, self.compression)
+        return pa.memory_map(str(self.filepath))
+
+    def _read_options(self):
+        """Return the PyArrow read options."""
+        return pa_csv.ReadOptions(use_threads=True, block_size=self.BLOCK_SIZE)
+
+    def _parse_options(self):
+        """Return the PyArrow parse options for the detected dialect."""
+        return pa_csv.ParseOptions(delimiter=self.delimiter,
+                                   quote_char=self.quotechar or False,
+                                   double_quote=self.metadata['doublequote'],
+                                   escape_char=self.escapechar or False,
+                                   newlines_in_values=True
+                                   )
+
+    def _convert_options(self):
+        """Return the PyArrow convert options, with only empty fields read as nulls."""
+        if self.schema:
+            column_types = SchemaInference.to_arrow_schema(self.schema)
+            for column in self.temporal_columns:
+                column_types[column] = pa.string()
+        else:
+            column_types = {column: pa.string() for column in self.columns}
+        return pa_csv.ConvertOptions(column_types=column_types,
+                                     null_values=[''],
+                                     strings_can_be_null=True
+                                     )
+
+    def _parse_temporal_columns(self, data):
+        """Parse the date and timestamp columns read as text with their sniffed formats."""
+        return SchemaInference.parse_arrow_columns(data, self.temporal_columns)
+
+    def _read_csv(self, source):
+        """Parse a whole CSV source into a PyArrow table on PyArrow's thread pool."""
+        table = pa_csv.read_csv(source,
+                                read_options=self._read_options(),
+                                parse_options=self._parse_options(),
+                                convert_options=self._convert_options()
+                                )
+        return self._parse_temporal_columns(table)
+
+    def get_sample(self):
+        """Return a sample of the CSV file."""
+        reader = self.to_record_batch_reader(self.DATAFRAME_SAMPLE_ROWS)
+        batch = next(iter(reader), None)
+        sample = batch if batch is not None else reader.schema.empty_table()
+        show_dataframe_sample(pl.from_arrow(sample))
+
+    def to_dataframe(self):
+        """Converts CSV to a Polars dataframe.
+
+        Returns:
+            A Polars dataframe.
+        """
+        if self.is_large:
+            show_large_file_warning()
+        return pl.from_arrow(self.to_arrow_table())
+
+    def to_arrow_table(self):
+        """Converts CSV to a PyArrow table.
+
+        Returns:
+            A PyArrow table.
+        """
+        with self._source() as source:
+            return self._read_csv(source)
+
+    def to_dicts(self):
+        """Converts CSV to a list of Python dictionaries.
+
+        Returns:
+            A list of dictionaries.
+        """
+        dicts = self.to_arrow_table().to_pylist()
+        return dicts
+
+    def iter_batches(self, batch_size=None):
+        """Streams the CSV as PyArrow record batches of bounded size.
+
+        Args:
+            batch_size (int, optional): Maximum number of rows per batch.
+
+        Yields:
+            PyArrow record batches.
+        """
+        yield from self.to_record_batch_reader(batch_size)
+
+    def to_record_batch_reader(self, batch_size=None):
+        """Streams the CSV as a PyArrow RecordBatchReader of bounded batches.
+
+        Blocks are parsed as the reader is consumed and sliced into batches
+        without copying. The file is closed once the reader is exhausted or closed.
+
+        Args:
+            batch_size (int, optional): Maximum number of rows per batch.
+
+        Returns:
+            A PyArrow RecordBatchReader.
+        """
+        batch_size = batch_size or self.DEFAULT_BATCH_SIZE
+        source = self._source()
+        try:
+            reader = pa_csv.open_csv(source,
+                                     read_options=self._read_options(),
+                                     parse_options=self._parse_options(),
+                                     convert_options=self._convert_options()
+                                     )
+        except Exception:
+            source.close()
+            raise
+
+        def record_batches():
+            try:
+                for batch in reader:
+                    batch = self._parse_temporal_columns(batch)
+                    for offset in range(0, batch.num_rows, batch_size):
+                        yield batch.slice(offset, batch_size)
+            finally:
+                source.close()
+
+        schema = self._parse_temporal_columns(reader.schema.empty_table()).schema
+        return pa.RecordBatchReader.from_batches(schema, record_batches())
+
+    def read_range(self, start, end):
+        """Reads the records in a byte range of the CSV into a Polars dataframe.
+
+        Args:
+            start (int): Byte offset of a record boundary, as returned by split.
+            end (int): Byte offset of a later record boundary.
+
+        Returns:
+            A Polars dataframe.
+        """
+        scanner = RecordScanner(self.filepath, self.quotechar, encoding=self.encoding)
+        data = scanner.read_range(start, end)
+        if not Encoding.is_native(self.encoding):
+            data = data.decode(self.encoding).encode(Encoding.DEFAULT_ENCODING)
+        return pl.from_arrow(self._read_csv(pa.BufferReader(data)))
+
 class CSVWriterDuckDBEngine(CSVProperties):
     """Class to convert CSV files to various other supported file types powered by DuckDB."""
 
-    def __init__(self, filepath):
+    ENGINE_NAME = 'duckdb'
+    DUCKDB_ROW_GROUP_SIZE = 122_880
+
+    def __init__(self, filepath, schema=None):
         """
         Initialize the CSVWriter class.
 
         Args:
             filepath (str): Path to the file to write.
+            schema (dict, optional): Column names mapped to DuckDB type names.
+                Every column is written as VARCHAR when omitted.
         """
         super().__init__(filepath)
+        self.schema = schema
         self.queries = DuckDBQueries(self.filepath)
     
     def _set_out_filename(self, default_filename, out_filename=None):
@@ -132,59 +572,128 @@ class CSVWriterDuckDBEngine(CSVProperties):
             filename = default_filename
         return filename
 
+    def _source_query(self):
+        """Query that streams the CSV straight into COPY without staging a table.
+
+        Registers the transcoding stream the query reads from, so run it once per
+        query.
+        """
+        self.queries.register_source(self.delimiter, self.quotechar)
+        return self.queries.read_csv_query(self.delimiter, self.schema)
+
+    def _copy(self, query):
+        """Run a COPY query and return the number of rows it wrote."""
+        return self.queries.database_connection.execute(query).fetchone()[0]
+
     def write_csv(self, out_filename=None):
         """Query to export a DuckDB table to a CSV file.
 
-            Args:
-                out_filename str: The name of the output file.
-            """
+        Args:
+            out_filename str: The name of the output file.
+
+        Returns:
+            int: The number of rows written.
+        """
         filename = self._set_out_filename(self.CSV_OUT_FILENAME, out_filename)
-        duckdb.sql(self.queries.import_csv_query(self.delimiter))
-        duckdb.sql(self.queries.export_csv_query(filename))
+        query = self.queries.export_csv_query(filename, self._source_query())
+        return self._copy(query)
 
     def write_excel(self, out_filename=None):
-        """Query to export a DuckDB table to an Excel file.
+        """Stream a DuckDB relation to an Excel file in constant memory.
+
+        A new sheet is started every EXCEL_ROW_LIMIT rows.
 
         Args:
             out_filename (optional, str): The name of the output file.
+
+        Returns:
+            int: The number of rows written.
         """
         filename = self._set_out_filename(self.EXCEL_OUT_FILENAME, out_filename)
-        duckdb.sql(self.queries.import_csv_query(self.delimiter))
-        duckdb.sql(self.queries.export_excel_query(filename))
+        relation = self.queries.database_connection.sql(self._source_query())
+        return ExcelWriter(filename).write(relation.fetch_arrow_reader(self.DEFAULT_BATCH_SIZE))
 
     def write_json(self, out_filename=None):
         """Query to export a DuckDB table to a JSON file.
 
         Args:
             out_filename (optional, str): The name of the output file.
+
+        Returns:
+            int: The number of rows written.
         """
         filename = self._set_out_filename(self.JSON_OUT_FILENAME, out_filename)
-        duckdb.sql(self.queries.import_csv_query(self.delimiter))
-        duckdb.sql(self.queries.export_json_query(filename))
+        query = self.queries.export_json_query(filename, self._source_query())
+        return self._copy(query)
 
     def write_json_newline_delimited(self, out_filename=None):
         """Query to export a DuckDB table to a JSON newline delimited file.
 
         Args:
             out_filename (optional, str): The name of the output file.
+
+        Returns:
+            int: The number of rows written.
         """
         filename = self._set_out_filename(self.JSON_NEWLINE_OUT_FILENAME, out_filename)
-        duckdb.sql(self.queries.import_csv_query(self.delimiter))
-        duckdb.sql(self.queries.export_json_newline_delimited_query(filename))
+        query = self.queries.export_json_newline_delimited_query(filename, self._source_query())
+        return self._copy(query)
 
-    def write_parquet(self, out_filename=None):
-        """Query to export a DuckDB table to a Parquet file.
+    def write_parquet(self, out_filename=None, partition_by=None, row_group_size=None,
+                      compression=None, compression_level=None, max_file_size=None):
+        """Query to export a DuckDB table to a Parquet file or a Hive-partitioned directory.
 
         Args:
-            out_filename (optional, str): The name of the output file.
+            out_filename (optional, str): The name of the output file, or the output
+                directory when partitioning or capping the file size.
+            partition_by (str or list, optional): Columns to partition the output by.
+            row_group_size (int, optional): Number of rows per row group.
+            compression (str, optional): Compression codec, such as 'zstd' or 'snappy'.
+            compression_level (int, optional): Compression level of the codec.
+            max_file_size (int, optional): Target maximum size of each file in bytes.
+
+        Returns:
+            int: The number of rows written.
         """
         filename = self._set_out_filename(self.PARQUET_OUT_FILENAME, out_filename)
-        duckdb.execute(self.queries.import_csv_query(self.delimiter))
-        duckdb.execute(self.queries.export_parquet_query(filename))
+        if partition_by and max_file_size:
+            # DuckDB cannot cap the file size of a partitioned COPY, so stream it out
+            max_rows_per_file = ParquetDatasetWriter.rows_per_file(max_file_size,
+                                                                   self.size_in_bytes,
+                                                                   self.estimated_row_count)
+            writer = ParquetDatasetWriter(filename, partition_by, row_group_size, compression,
+                                          compression_level, max_rows_per_file)
+            relation = self.queries.database_connection.sql(self._source_query())
+            return writer.write(relation.fetch_arrow_reader(self.DEFAULT_BATCH_SIZE))
+        if max_file_size and not row_group_size:
+            # DuckDB only rolls over to a new file between row groups
+            row_group_size = min(self.DUCKDB_ROW_GROUP_SIZE,
+                                 ParquetDatasetWriter.rows_per_file(max_file_size,
+                                                                    self.size_in_bytes,
+                                                                    self.estimated_row_count))
+        query = self.queries.export_parquet_query(filename, self._source_query(), partition_by,
+                                                  row_group_size, compression,
+                                                  compression_level, max_file_size)
+        return self._copy(query)
 
 class CSVWriterPolarsEngine(CSVProperties):
     """Class to write CSVs to other file formats powered by Polars."""
 
+    ENGINE_NAME = 'polars'
+    DEFAULT_PARQUET_COMPRESSION = 'zstd'
+
+    def __init__(self, filepath, schema=None):
+        """
+        Initialize the CSVWriter class.
+
+        Args:
+            filepath (str): Path to the file to write.
+            schema (dict, optional): Column names mapped to DuckDB type names.
+                Polars infers the types itself when omitted.
+        """
+        super().__init__(filepath)
+        self.schema = schema
+
     def _set_out_filename(self, default_filename, out_filename=None):
         """Evaluate if a filename is passed in and if not, return default filename."""
         if out_filename:
@@ -194,51 +703,258 @@ class CSVWriterPolarsEngine(CSVProperties):
         return filename
 
     def write_csv(self, out_filename=None):
-        """Export a Polars dataframe to a CSV file.
+        """Stream a Polars lazyframe to a CSV file in bounded memory.
 
         Args:
             out_filename (optional, str): The name of the output file.
+
+        Returns:
+            int: The number of rows written, or None when streamed by a Polars sink,
+            which does not report it.
         """
         filename = self._set_out_filename(self.CSV_OUT_FILENAME, out_filename)
-        df = CSVReaderPolarsEngine(self.filepath).to_dataframe()
-        df.write_csv(filename)
+        lazyframe = CSVReaderPolarsEngine(self.filepath, self.schema).to_lazyframe()
+        lazyframe.sink_csv(filename)
+        return None
 
     def write_excel(self, out_filename=None):
-        """Export a Polars dataframe to an Excel file.
+        """Stream Polars dataframe batches to an Excel file in constant memory.
+
+        A new sheet is started every EXCEL_ROW_LIMIT rows.
 
         Args:
             out_filename (optional, str): The name of the output file.
+
+        Returns:
+            int: The number of rows written.
         """
         filename = self._set_out_filename(self.EXCEL_OUT_FILENAME, out_filename)
-        df = CSVReaderPolarsEngine(self.filepath).to_dataframe()
-        df.write_excel(filename)
+        reader = CSVReaderPolarsEngine(self.filepath, self.schema)
+        return ExcelWriter(filename).write_dataframes(reader.iter_batches(), self.columns)
+
+    @classmethod
+    def write_json_batches(cls, filename, dataframes):
+        """Write a stream of Polars dataframes to one JSON array file, batch by batch.
+
+        Args:
+            filename (str): The name of the output file.
+            dataframes (iterable): Polars dataframes sharing the same columns.
+
+        Returns:
+            int: The number of rows written.
+        """
+        rows = 0
+        with open(filename, 'w', encoding='utf-8') as json_file:
+            json_file.write('[')
+            separator = ''
+            for dataframe in dataframes:
+                rows += dataframe.height
+                # each batch serializes as a JSON array, so drop its brackets
+                records = dataframe.write_json()[1:-1]
+                if records:
+                    json_file.write(separator + records)
+                    separator = ','
+            json_file.write(']')
+        return rows
 
     def write_json(self, out_filename=None):
         """Export a Polars dataframe to a JSON file.
 
+        Streams the file batch by batch in out-of-core mode.
+
         Args:
             out_filename (optional, str): The name of the output file.
+
+        Returns:
+            int: The number of rows written.
         """
         filename = self._set_out_filename(self.JSON_OUT_FILENAME, out_filename)
-        df = CSVReaderPolarsEngine(self.filepath).to_dataframe()
-        df.write_json(filename)
+        reader = CSVReaderPolarsEngine(self.filepath, self.schema)
+        if self.out_of_core:
+            return self.write_json_batches(filename, reader.iter_batches())
+        dataframe = reader.to_dataframe()
+        dataframe.write_json(filename)
+        return dataframe.height
 
     def write_json_newline_delimited(self, out_filename=None):
-        """Export a Polars dataframe to a JSON newline delimited file.
+        """Stream a Polars lazyframe to a JSON newline delimited file in bounded memory.
 
         Args:
             out_filename (optional, str): The name of the output file.
+
+        Returns:
+            int: The number of rows written, or None when streamed by a Polars sink,
+            which does not report it.
         """
         filename = self._set_out_filename(self.JSON_NEWLINE_OUT_FILENAME, out_filename)
-        df = CSVReaderPolarsEngine(self.filepath).to_dataframe()
-        df.write_ndjson(filename)
+        lazyframe = CSVReaderPolarsEngine(self.filepath, self.schema).to_lazyframe()
+        lazyframe.sink_ndjson(filename)
+        return None
+
+    def write_parquet(self, out_filename=None, partition_by=None, row_group_size=None,
+                      compression=None, compression_level=None, max_file_size=None):
+        """Stream a Polars lazyframe to a Parquet file or a Hive-partitioned directory
+        in bounded memory.
+
+        Args:
+            out_filename (optional, str): The name of the output file, or the output
+                directory when partitioning or capping the file size.
+            partition_by (str or list, optional): Columns to partition the output by.
+            row_group_size (int, optional): Number of rows per row group.
+            compression (str, optional): Compression codec, such as 'zstd' or 'snappy'.
+                Defaults to 'zstd'.
+            compression_level (int, optional): Compression level of the codec.
+            max_file_size (int, optional): Target maximum size of each file in bytes.
 
-    def write_parquet(self, out_filename=None):
-        """Export a Polars dataframe to a Parquet file.
+        Returns:
+            int: The number of rows written, or None when streamed by a Polars sink,
+            which does not report it.
+        """
+        filename = self._set_out_filename(self.PARQUET_OUT_FILENAME, out_filename)
+        reader = CSVReaderPolarsEngine(self.filepath, self.schema)
+        # the streaming sink neither partitions nor honors small row group sizes
+        if partition_by or max_file_size or row_group_size:
+            max_rows_per_file = None
+            if max_file_size:
+                max_rows_per_file = ParquetDatasetWriter.rows_per_file(max_file_size,
+                                                                       self.size_in_bytes,
+                                                                       self.estimated_row_count)
+            writer = ParquetDatasetWriter(filename, partition_by, row_group_size,
+                                          compression or self.DEFAULT_PARQUET_COMPRESSION,
+                                          compression_level, max_rows_per_file)
+            return writer.write_dataframes(reader.iter_batches())
+        reader.to_lazyframe().sink_parquet(filename,
+                                           compression=compression or self.DEFAULT_PARQUET_COMPRESSION,
+                                           compression_level=compression_level,
+                                           row_group_size=row_group_size
+                                           )
+        return None
+
+class CSVWriterPyArrowEngine(CSVProperties):
+    """Class to write CSVs to other file formats powered by PyArrow.
+
+    Every output streams the record batches of the PyArrow reader engine, so
+    memory stays bounded by the batch size.
+    """
+
+    ENGINE_NAME = 'pyarrow'
+
+    def __init__(self, filepath, schema=None):
+        """
+        Initialize the CSVWriter class.
+
+        Args:
+            filepath (str): Path to the file to write.
+            schema (dict, optional): Column names mapped to DuckDB type names.
+                Every column is written as text when omitted.
+        """
+        super().__init__(filepath)
+        self.schema = schema
+
+    def _set_out_filename(self, default_filename, out_filename=None):
+        """Evaluate if a filename is passed in and if not, return default filename."""
+        if out_filename:
+            filename = out_filename
+        else:
+            filename = default_filename
+        return filename
+
+    def _record_batch_reader(self):
+        """Return a PyArrow RecordBatchReader streaming the CSV."""
+        return CSVReaderPyArrowEngine(self.filepath, self.schema).to_record_batch_reader()
+
+    def _iter_dataframes(self):
+        """Stream the CSV as Polars dataframes, converted from Arrow without copying."""
+        for batch in self._record_batch_reader():
+            yield pl.from_arrow(batch)
+
+    def write_csv(self, out_filename=None):
+        """Stream PyArrow record batches to a CSV file in bounded memory.
+
+        Args:
+            out_filename (optional, str): The name of the output file.
+
+        Returns:
+            int: The number of rows written.
+        """
+        filename = self._set_out_filename(self.CSV_OUT_FILENAME, out_filename)
+        batches = self._record_batch_reader()
+        rows = 0
+        # PyArrow's CSV writer quotes every string and the header, so let Polars quote
+        # only the fields that need it, like the DuckDB and Polars engines
+        with open(filename, 'wb') as csv_file:
+            pl.from_arrow(batches.schema.empty_table()).write_csv(csv_file)
+            for batch in batches:
+                pl.from_arrow(batch).write_csv(csv_file, include_header=False)
+                rows += batch.num_rows
+        return rows
+
+    def write_excel(self, out_filename=None):
+        """Stream PyArrow record batches to an Excel file in constant memory.
+
+        A new sheet is started every EXCEL_ROW_LIMIT rows.
 
         Args:
             out_filename (optional, str): The name of the output file.
+
+        Returns:
+            int: The number of rows written.
+        """
+        filename = self._set_out_filename(self.EXCEL_OUT_FILENAME, out_filename)
+        return ExcelWriter(filename).write(self._record_batch_reader())
+
+    def write_json(self, out_filename=None):
+        """Stream PyArrow record batches to a JSON file in bounded memory.
+
+        Args:
+            out_filename (optional, str): The name of the output file.
+
+        Returns:
+            int: The number of rows written.
+        """
+        filename = self._set_out_filename(self.JSON_OUT_FILENAME, out_filename)
+        return CSVWriterPolarsEngine.write_json_batches(filename, self._iter_dataframes())
+
+    def write_json_newline_delimited(self, out_filename=None):
+        """Stream PyArrow record batches to a JSON newline delimited file in bounded memory.
+
+        Args:
+            out_filename (optional, str): The name of the output file.
+
+        Returns:
+            int: The number of rows written.
+        """
+        filename = self._set_out_filename(self.JSON_NEWLINE_OUT_FILENAME, out_filename)
+        rows = 0
+        with open(filename, 'wb') as json_file:
+            for dataframe in self._iter_dataframes():
+                dataframe.write_ndjson(json_file)
+                rows += dataframe.height
+        return rows
+
+    def write_parquet(self, out_filename=None, partition_by=None, row_group_size=None,
+                      compression=None, compression_level=None, max_file_size=None):
+        """Stream PyArrow record batches to a Parquet file or a Hive-partitioned directory
+        in bounded memory.
+
+        Args:
+            out_filename (optional, str): The name of the output file, or the output
+                directory when partitioning or capping the file size.
+            partition_by (str or list, optional): Columns to partition the output by.
+            row_group_size (int, optional): Number of rows per row group.
+            compression (str, optional): Compression codec, such as 'zstd' or 'snappy'.
+            compression_level (int, optional): Compression level of the codec.
+            max_file_size (int, optional): Target maximum size of each file in bytes.
+
+        Returns:
+            int: The number of rows written.
         """
         filename = self._set_out_filename(self.PARQUET_OUT_FILENAME, out_filename)
-        df = CSVReaderPolarsEngine(self.filepath).to_dataframe()
-        df.write_parquet(filename)
+        max_rows_per_file = None
+        if max_file_size:
+            max_rows_per_file = ParquetDatasetWriter.rows_per_file(max_file_size,
+                                                                   self.size_in_bytes,
+                                                                   self.estimated_row_count)
+        writer = ParquetDatasetWriter(filename, partition_by, row_group_size, compression,
+                                      compression_level, max_rows_per_file)
+        return writer.write(self._record_batch_reader())
@@ -0,0 +1,110 @@
+"""Module for streaming tabular data into Excel workbooks."""
+
+# standard library
+
+# third party libraries
+import xlsxwriter
+
+# local libraries
+from .fileproperties import FileProperties
+
+class ExcelWriter:
+    """Class to stream batches of rows into an Excel workbook in constant memory.
+
+    The workbook is written with XlsxWriter in constant_memory mode, which
+    flushes every row to disk once the next row starts, so memory stays bounded
+    by one batch. Each sheet repeats the header row, and a new sheet is started
+    whenever a sheet reaches the Excel row limit.
+    """
+
+    SHEET_NAME_TEMPLATE = 'Sheet{number}'
+    WORKBOOK_OPTIONS = {
+        'constant_memory': True,
+        # write text verbatim instead of guessing formulas, URLs or numbers
+        'strings_to_formulas': False,
+        'strings_to_urls': False,
+        'strings_to_numbers': False,
+        'default_date_format': 'yyyy-mm-dd hh:mm:ss',
+    }
+
+    def __init__(self, out_filename, row_limit=FileProperties.EXCEL_ROW_LIMIT):
+        """
+        Initialize the ExcelWriter class.
+
+        Args:
+            out_filename (str): The name of the output file.
+            row_limit (int): Maximum number of rows per sheet, including the header.
+        """
+        self.out_filename = str(out_filename)
+        self.row_limit = row_limit
+        self.sheet_count = 0
+        self.row_count = 0
+
+    def _write_rows(self, columns, batches_of_rows):
+        """Write the header and every row, starting a new sheet at the row limit.
+
+        Args:
+            columns (list): The column names.
+            batches_of_rows (iterable): Iterables of row tuples.
+        """
+        workbook = xlsxwriter.Workbook(self.out_filename, self.WORKBOOK_OPTIONS)
+        try:
+            worksheet = None
+            row_number = self.row_limit
+            for rows in batches_of_rows:
+                for row in rows:
+                    if row_number >= self.row_limit:
+                        self.sheet_count += 1
+                        worksheet = workbook.add_worksheet(
+                            self.SHEET_NAME_TEMPLATE.format(number=self.sheet_count))
+                        worksheet.write_row(0, 0, columns)
+                        row_number = 1
+                    worksheet.write_row(row_number, 0, row)
+                    row_number += 1
+                    self.row_count += 1
+            if worksheet is None:
+                self.sheet_count += 1
+                worksheet = workbook.add_worksheet(
+                    self.SHEET_NAME_TEMPLATE.format(number=self.sheet_count))
+                worksheet.write_row(0, 0, columns)
+        finally:
+            workbook.close()
+
+    def write(self, batches):
+        """Write PyArrow record batches to the workbook.
+
+        Args:
+            batches (pyarrow.RecordBatchReader): The batches to write.
+
+        Returns:
+            int: The number of rows written.
+        """
+        self._write_rows(batches.schema.names,
+                         (zip(*(column.to_pylist() for column in batch.columns))
+                          for batch in batches))
+        return self.row_count
+
+    def write_dataframes(self, dataframes, columns=None):
+        """Write a stream of Polars dataframes to the workbook.
+
+        Args:
+            dataframes (iterable): Polars dataframes sharing the same columns.
+            columns (list, optional): The column names, used for the header when
+                there are no dataframes. Defaults to the columns of the first one.
+        
+        Returns:
+            int: The number of rows written.
+        """
+        dataframes = iter(dataframes)
+        first = next(dataframes, None)
+        if first is not None:
+            columns = first.columns
+
+        def batches_of_rows():
+            if first is not None:
+                yield first.iter_rows()
+            for dataframe in dataframes:
+                yield dataframe.iter_rows()
+
+        self._write_rows(columns or [], batches_of_rows())
+        return self.row_count
@@ -3,16 +3,26 @@
 # standard library
 from collections import Counter
 import csv
-from functools import lru_cache
 import os
 from pathlib import Path
 import re
+import tempfile
+
+# local libraries
+from .cache import MetadataCache
+from .compression import Compression
+from .databases import DuckDBSession
+from .dialects import DialectDetector
+from .encoding import Encoding
+from .instrumentation import Instrumentation
+from .records import RecordScanner
+from .schemas import SchemaInference
 
 class FileProperties:
     """Base class for file objects."""
 
     FILE_SIZE_DIVISOR = 1024
-    DEFAULT_ENCODING = 'utf-8'
+    DEFAULT_ENCODING = Encoding.DEFAULT_ENCODING
     EXCEL_FILE_EXTENSIONS = [
         'xlsx',
         'xlsm',
@@ -76,14 +86,32 @@ class FileProperties:
         """
         self.filepath = filepath
         self.filename = Path(filepath).name
+        self.compression = Compression.detect(filepath)
         self.extension = Path(filepath).suffix
+        if self.compression:
+            self.extension = Compression.inner_suffix(filepath)
         self.extension_string = self.extension.replace('.', '')
-        self.size_in_bytes = os.path.getsize(filepath)
+        self._encoding = None
+        file_stats = os.stat(filepath)
+        self.size_in_bytes = file_stats.st_size
+        self.modified_time_ns = file_stats.st_mtime_ns
         self.size_in_kb = round((self.size_in_bytes / self.FILE_SIZE_DIVISOR), 5)
         self.size_in_mb = round((self.size_in_kb / self.FILE_SIZE_DIVISOR), 5)
         self.size_in_gb = round((self.size_in_mb / self.FILE_SIZE_DIVISOR), 5)
         self.size_in_tb = round((self.size_in_gb / self.FILE_SIZE_DIVISOR), 5)
 
+    @property
+    def fingerprint(self):
+        """Return a key identifying this version of the file: path, size and mtime."""
+        return (str(Path(self.filepath).resolve()), self.size_in_bytes, self.modified_time_ns)
+
+    @property
+    def encoding(self):
+        """Return the character encoding detected from a bounded sample of the file."""
+        if self._encoding is None:
+            self._encoding = Encoding.detect(self.filepath, self.compression)
+        return self._encoding
+
     @property
     def is_structured(self):
         """Check if the file is structured."""
@@ -146,8 +174,9 @@ class CSVProperties(FileProperties):
     DELIMITER_REGEX_PATTERN = r'[^0-9a-zA-Z_ "-]'
     DEFAULT_DELIMITER = ','
     DEFAULT_SAMPLE_ROWS = 1
-    CSV_SNIFF_SAMPLE_ROWS = 5
+    CSV_SNIFF_SAMPLE_BYTES = DialectDetector.SAMPLE_BYTES
     DATAFRAME_SAMPLE_ROWS = 20
+    DEFAULT_BATCH_SIZE = 100_000
 
     QUOTING_MAP = {
         0: 'no quoting',
@@ -156,6 +185,10 @@ class CSVProperties(FileProperties):
         3: 'quote non-numeric'
     }
 
+    metadata_cache = None
+    out_of_core = False
+    DEFAULT_SPILL_DIRECTORY = os.path.join(tempfile.gettempdir(), 'datagrunt_spill')
+
     def __init__(self, filepath):
         """
         Initialize the CSVParser class.
@@ -164,13 +197,63 @@ class CSVProperties(FileProperties):
             filepath (str): Path to the file to read.
         """
         super().__init__(filepath)
-        self.first_row = self._get_first_row_from_file()
-        self.delimiter = self._infer_csv_file_delimiter()
+        self._cached_entry = self._read_metadata_cache() or {}
+        self._metadata = self._cached_entry if 'columns_list' in self._cached_entry else None
+        self._detector = None
+        self._detected_dialect = None
+        if self._metadata:
+            self.first_row = self._metadata['columns_original_format']
+            self.delimiter = self._metadata['delimiter']
+            self.delimiter_confidence = self._metadata['delimiter_confidence']
+        else:
+            self.first_row = self._get_first_row_from_file()
+            self.delimiter = self._infer_csv_file_delimiter()
+            self.delimiter_confidence = self._detect_dialect()['confidence']
         if not self.is_csv:
             raise ValueError(
                 f"File extension '{self.extension_string}' is not a valid CSV file extension."
                              )
 
+    @classmethod
+    def set_metadata_cache(cls, cache_dir=None):
+        """Enable or disable the persistent metadata cache for all CSV files.
+
+        Args:
+            cache_dir (str, optional): Directory for the sidecar cache files.
+                Disables the cache when omitted.
+        """
+        CSVProperties.metadata_cache = MetadataCache(cache_dir) if cache_dir else None
+
+    @classmethod
+    def set_out_of_core(cls, memory_limit=None, temp_directory=None):
+        """Enable or disable larger-than-memory processing for all CSV files.
+
+        DuckDB is held to the memory limit and spills to the temporary directory
+        beyond it, which bounds conversions and query_data. Polars switches to its
+        streaming engine, which processes files in batches instead of all at once.
+
+        Args:
+            memory_limit (str, optional): DuckDB memory limit, such as '4GB'.
+                Disables the mode when omitted.
+            temp_directory (str, optional): Directory DuckDB spills to. Defaults to
+                DEFAULT_SPILL_DIRECTORY.
+        """
+        CSVProperties.out_of_core = memory_limit is not None
+        if memory_limit is not None:
+            temp_directory = temp_directory or cls.DEFAULT_SPILL_DIRECTORY
+        DuckDBSession.configure(memory_limit=memory_limit, temp_directory=temp_directory)
+
+    def _read_metadata_cache(self):
+        """Return metadata for this file from the persistent cache, if enabled."""
+        if self.metadata_cache is None:
+            return None
+        return self.metadata_cache.get(self.fingerprint)
+
+    def _write_metadata_cache(self, metadata):
+        """Store metadata for this file in the persistent cache, if enabled."""
+        if self.metadata_cache is not None:
+            self.metadata_cache.update(self.fingerprint, metadata)
+
     def _get_first_row_from_file(self):
         """Reads and returns the first line of a file.
 
@@ -181,8 +264,8 @@ class CSVProperties(FileProperties):
             The first line of the file, stripped of leading/trailing whitespace,
             or None if the file is empty.
         """
-        with open(self.filepath, 'r', encoding=self.DEFAULT_ENCODING) as csv_file:
-            first_line = csv_file.readline().strip()
+        with Encoding.open(self.filepath, self.encoding, self.compression) as csv_file:
+            first_line = csv_file.readline().decode('utf-8-sig').strip()
         return first_line
 
     def _get_most_common_non_alpha_numeric_character_from_string(self):
@@ -200,95 +283,203 @@ class CSVProperties(FileProperties):
         most_common = counts.most_common()
         return most_common
 
+    def _get_dialect_detector(self):
+        """Return a dialect detector over a bounded byte sample of the file."""
+        if self._detector is None:
+            self._detector = DialectDetector.from_file(self.filepath,
+                                                       encoding=self.encoding,
+                                                       sample_bytes=self.CSV_SNIFF_SAMPLE_BYTES,
+                                                       compression=self.compression)
+        return self._detector
+
+    def _detect_dialect(self):
+        """Detect the delimiter, quote character and confidence from a multi-row sample."""
+        if self._detected_dialect is None:
+            if self.is_empty:
+                self._detected_dialect = {'delimiter': None,
+                                          'quotechar': DialectDetector.DEFAULT_QUOTECHAR,
+                                          'confidence': 0.0}
+            else:
+                with Instrumentation.stage('detect_dialect', filepath=self.filepath) as event:
+                    detector = self._get_dialect_detector()
+                    self._detected_dialect = detector.detect()
+                    event['bytes_read'] = len(detector.sample.encode(self.DEFAULT_ENCODING))
+        return self._detected_dialect
+
     def _infer_csv_file_delimiter(self):
         """Infer the delimiter of a CSV file.
 
-        Args:
-            csv_file (str): The path to the CSV file.
+        Scores candidate delimiters by how consistently they split a multi-row sample
+        and falls back to the most common punctuation in the first row.
 
         Returns:
             str: The delimiter of the CSV file.
         """
+        if self.is_empty:
+            return self.DEFAULT_DELIMITER
+        detected_delimiter = self._detect_dialect()['delimiter']
         delimiter_candidates = self._get_most_common_non_alpha_numeric_character_from_string()
 
-        if self.is_empty:
-            delimiter = self.DEFAULT_DELIMITER
+        if detected_delimiter:
+            delimiter = detected_delimiter
         elif len(delimiter_candidates) == 0:
             delimiter = ' '
         else:
             delimiter = delimiter_candidates[0][0]
         return delimiter
 
+    def _sniff_dialect(self, sample):
+        """Sniff escaping and quoting rules, falling back to the excel dialect."""
+        try:
+            return csv.Sniffer().sniff(sample, delimiters=self.delimiter)
+        except csv.Error:
+            return csv.excel
+
     def _get_attributes(self):
         """Generate a dictionary of CSV attributes."""
-        columns_list = self.first_row.split(self.delimiter)
+        detected = self._detect_dialect()
+        quotechar = detected['quotechar']
+        columns_list = next(csv.reader([self.first_row],
+                                       delimiter=self.delimiter,
+                                       quotechar=quotechar), [''])
         columns = {c: 'VARCHAR' for c in columns_list}
-        with open(self.filepath, 'r', encoding=self.DEFAULT_ENCODING) as csvfile:
-            # Sniff the file to detect parameters
-            dialect = csv.Sniffer().sniff(csvfile.read(self.CSV_SNIFF_SAMPLE_ROWS))
-            csvfile.seek(0)  # Reset file pointer to the beginning
-
-            attributes = {
-                'delimiter': self.delimiter,
-                'quotechar': dialect.quotechar,
-                'escapechar': dialect.escapechar,
-                'doublequote': dialect.doublequote,
-                'newline_delimiter': dialect.lineterminator,
-                'skipinitialspace': dialect.skipinitialspace,
-                'quoting': self.QUOTING_MAP.get(dialect.quoting),
-                'columns_schema': columns,
-                'columns_original_format': self.first_row,
-                'columns_list': columns_list,
-                'columns_string': ", ".join(columns_list),
-                'columns_byte_string': ", ".join(columns_list).encode(),
-                'column_count': len(columns_list)
-            }
+        detector = DialectDetector('') if self.is_empty else self._get_dialect_detector()
+        dialect = self._sniff_dialect(detector.sample)
+
+        attributes = {
+            'delimiter': self.delimiter,
+            'delimiter_confidence': detected['confidence'],
+            'quotechar': quotechar,
+            'escapechar': dialect.escapechar,
+            'doublequote': dialect.doublequote,
+            'newline_delimiter': detector.detect_newline(),
+            'skipinitialspace': dialect.skipinitialspace,
+            'quoting': self.QUOTING_MAP.get(dialect.quoting),
+            'columns_schema': columns,
+            'columns_original_format': self.first_row,
+            'columns_list': columns_list,
+            'columns_string': ", ".join(columns_list),
+            'column_count': len(columns_list)
+        }
 
         return attributes
 
     @property
-    @lru_cache()
+    def metadata(self):
+        """Return the dialect and schema metadata, computed once per instance."""
+        if self._metadata is None:
+            self._metadata = self._get_attributes()
+            self._write_metadata_cache(self._metadata)
+        return self._metadata
+
+    @property
+    def inferred_schema(self):
+        """Return column types sniffed from a sample of the file, computed once.
+
+        Returns:
+            dict: Column names mapped to DuckDB type names.
+        """
+        schema = self._cached_entry.get('inferred_schema')
+        if schema is None:
+            schema = SchemaInference(self.filepath, self.delimiter,
+                                     compression=self.compression,
+                                     encoding=self.encoding).infer()
+            self._cached_entry['inferred_schema'] = schema
+            self._write_metadata_cache({'inferred_schema': schema})
+        return schema
+
+    @property
+    def temporal_formats(self):
+        """Return the date and timestamp formats sniffed from a sample of the file,
+        computed once.
+
+        Returns:
+            dict: 'DATE' and 'TIMESTAMP' mapped to strptime formats, or None.
+        """
+        formats = self._cached_entry.get('temporal_formats')
+        if formats is None:
+            formats = SchemaInference(self.filepath, self.delimiter,
+                                      compression=self.compression,
+                                      encoding=self.encoding).infer_formats()
+            self._cached_entry['temporal_formats'] = formats
+            self._write_metadata_cache({'temporal_formats': formats})
+        return formats
+
+    def formatted_columns(self, schema):
+        """Return the DATE and TIMESTAMP columns of a schema that engines other than
+        DuckDB parse with the format sniffed from the file.
+
+        Args:
+            schema (dict): Column names mapped to DuckDB type names.
+
+        Returns:
+            dict: Column names mapped to a (DuckDB type name, strptime format) tuple.
+        """
+        if not SchemaInference.has_temporal_columns(schema):
+            return {}
+        return SchemaInference.formatted_columns(schema, self.temporal_formats)
+
+    @property
     def row_count_with_header(self):
-        """Return the number of lines in the CSV file including the header."""
-        with open(self.filepath, 'rb') as csv_file:
-            return sum(1 for _ in csv_file)
+        """Return the number of records in the CSV file including the header.
+
+        Newlines inside quoted fields do not start a new record. Counts are cached
+        per file fingerprint.
+        """
+        row_count = self._cached_entry.get('row_count_with_header')
+        if row_count is None:
+            scanner = RecordScanner(self.filepath, self.quotechar, encoding=self.encoding)
+            row_count = scanner.count_records(self.fingerprint)
+            self._cached_entry['row_count_with_header'] = row_count
+            self._write_metadata_cache({'row_count_with_header': row_count})
+        return row_count
 
     @property
     def row_count_without_header(self):
-        """Return the number of lines in the CSV file excluding the header."""
+        """Return the number of records in the CSV file excluding the header."""
         return self.row_count_with_header - 1
 
+    @property
+    def estimated_row_count(self):
+        """Return a cheap estimate of the records in the CSV file including the header.
+
+        The estimate extrapolates the bytes per record of a sample from the start of
+        the file, so it costs the same for any file size.
+        """
+        return RecordScanner(self.filepath, self.quotechar,
+                             encoding=self.encoding).estimate_records()
+
     @property
     def columns(self):
         """Return the schema of the columns in the CSV file."""
-        return self._get_attributes()['columns_list']
+        return self.metadata['columns_list']
 
     @property
     def columns_string(self):
         """Return the first row of a CSV file as a string."""
-        return self._get_attributes()['columns_string']
+        return self.metadata['columns_string']
 
     @property
     def columns_byte_string(self):
         """Return the first row of the CSV file as bytes."""
-        return self._get_attributes()['columns_byte_string']
+        return self.metadata['columns_string'].encode()
 
     @property
     def column_count(self):
         """Return the number of columns in the CSV file."""
-        return self._get_attributes()['column_count']
+        return self.metadata['column_count']
 
     @property
     def quotechar(self):
         """Return the quote character used in the CSV file."""
-        return self._get_attributes()['quotechar']
+        return self.metadata['quotechar']
 
     @property
     def escapechar(self):
         """Return the escape character used in the CSV file."""
-        return self._get_attributes()['escapechar']
+        return self.metadata['escapechar']
 
     @property
     def newline_delimiter(self):
         """Return the newline delimiter used in the CSV file."""
-        return self._get_attributes()['newline_delimiter']
+        return self.metadata['newline_delimiter']
@@ -0,0 +1,556 @@
+"""Module for reading and converting several CSV files as one dataset."""
+
+# standard library
+from concurrent.futures import ThreadPoolExecutor
+import glob
+import os
+
+# third party libraries
+import polars as pl
+
+# local libraries
+from .encoding import Encoding
+from .fileproperties import CSVProperties, FileProperties
+from .engines import CSVReaderPolarsEngine, CSVWriterDuckDBEngine, CSVWriterPolarsEngine
+from .excel import ExcelWriter
+from .parquet import ParquetDatasetWriter
+from .queries import DuckDBQueries
+from .logger import show_large_file_warning, show_dataframe_sample
+
+class CSVFileSet:
+    """Base class for a set of CSV files, such as daily shard drops, read as one dataset.
+
+    The dialect is detected per file, so shards with different delimiters can be
+    combined. Every row carries a filename column recording its source file.
+    """
+
+    GLOB_CHARACTERS = '*?['
+    PROVENANCE_COLUMN = 'filename'
+    LARGE_FILE_SET_SIZE_IN_GB = 1.0
+    NO_FILES_MESSAGE = "No CSV files match '{filepath}'."
+
+    def __init__(self, filepaths, schema=None, threads=None):
+        """
+        Initialize the CSVFileSet class.
+
+        Args:
+            filepaths (str or list): A glob pattern or a list of paths and patterns.
+            schema (dict, optional): Column names mapped to DuckDB type names.
+            threads (int, optional): Number of files to process in parallel.
+                Defaults to the number of CPUs.
+        """
+        self.filepaths = self.expand_filepaths(filepaths)
+        self.schema = schema
+        self.threads = threads or os.cpu_count() or 1
+        self.files = self._map(CSVProperties, self.filepaths)
+        self.queries = DuckDBQueries(self.filepaths[0])
+        self.db_table = self.queries.database_table_name
+
+    @classmethod
+    def _is_glob(cls, filepath):
+        """Check if a path contains glob characters and does not name an existing file,
+        such as 'data[1].csv'."""
+        if os.path.exists(filepath):
+            return False
+        return any(character in str(filepath) for character in cls.GLOB_CHARACTERS)
+
+    @classmethod
+    def is_file_set(cls, filepath):
+        """Check if a filepath argument names several files: a list of paths or a glob.
+
+        Args:
+            filepath (str or list): The filepath argument to check.
+        """
+        return isinstance(filepath, (list, tuple)) or cls._is_glob(filepath)
+
+    @classmethod
+    def expand_filepaths(cls, filepaths):
+        """Expand glob patterns into a list of file paths.
+
+        Args:
+            filepaths (str or list): A glob pattern or a list of paths and patterns.
+
+        Returns:
+            list: The matching file paths, sorted within each pattern.
+        """
+        patterns = filepaths if isinstance(filepaths, (list, tuple)) else [filepaths]
+        expanded = []
+        for pattern in patterns:
+            if cls._is_glob(pattern):
+                expanded.extend(sorted(glob.glob(str(pattern))))
+            else:
+                expanded.append(str(pattern))
+        if not expanded:
+            raise FileNotFoundError(cls.NO_FILES_MESSAGE.format(filepath=filepaths))
+        return expanded
+
+    def _map(self, function, items):
+        """Apply a function to every item on a thread pool, preserving order."""
+        with ThreadPoolExecutor(max_workers=self.threads) as executor:
+            return list(executor.map(function, items))
+
+    def _set_out_filename(self, default_filename, out_filename=None):
+        """Evaluate if a filename is passed in and if not, return default filename."""
+        if out_filename:
+            filename = out_filename
+        else:
+            filename = default_filename
+        return filename
+
+    @property
+    def size_in_bytes(self):
+        """Return the combined size of all files in bytes."""
+        return sum(csv_file.size_in_bytes for csv_file in self.files)
+
+    @property
+    def is_large(self):
+        """Check if the combined size of all files is greater than or equal to 1 GB."""
+        size_in_gb = self.size_in_bytes / FileProperties.FILE_SIZE_DIVISOR ** 3
+        return size_in_gb >= self.LARGE_FILE_SET_SIZE_IN_GB
+
+    @property
+    def estimated_row_count(self):
+        """Return a cheap estimate of the records in all files including the headers."""
+        return sum(csv_file.estimated_row_count for csv_file in self.files)
+
+    def _rows_per_file(self, max_file_size):
+        """Translate a target Parquet file size into a row limit."""
+        return ParquetDatasetWriter.rows_per_file(max_file_size, self.size_in_bytes,
+                                                  self.estimated_row_count)
+
+    def files_by_delimiter(self):
+        """Group the file paths by their detected delimiter.
+
+        Returns:
+            dict: Delimiters mapped to the list of paths using them.
+        """
+        groups = {}
+        for csv_file in self.files:
+            groups.setdefault(csv_file.delimiter, []).append(csv_file.filepath)
+        return groups
+
+class CSVFileSetReaderDuckDBEngine(CSVFileSet):
+    """Class to read a set of CSV files as one dataset powered by DuckDB.
+
+    UTF-8 files sharing a delimiter are read by a single multi-file read_csv,
+    which DuckDB parallelizes across files. Files in other encodings are read one
+    by one from a transcoding stream. The groups are unioned by column name.
+    """
+
+    ENGINE_NAME = 'duckdb'
+
+    def _transcoded_files(self):
+        """Return the files DuckDB cannot read itself, because they are not UTF-8,
+        with their queries."""
+        return [(csv_file, DuckDBQueries(csv_file.filepath, csv_file.encoding))
+                for csv_file in self.files if not Encoding.is_native(csv_file.encoding)]
+
+    def _transcoded_file_query(self, csv_file, queries):
+        """Query selecting every row of a transcoded file, with a filename column."""
+        schema = None
+        if self.schema:
+            schema = {column: dtype for column, dtype in self.schema.items()
+                      if column in csv_file.columns}
+        source_query = queries.read_csv_query(csv_file.delimiter, schema)
+        return (f"SELECT *, '{csv_file.filepath}' AS {self.PROVENANCE_COLUMN} "
+                f"FROM ({source_query})")
+
+    def source_query(self):
+        """Query selecting every row of every file, with a filename column.
+
+        Files not encoded in UTF-8 are selected from the streams registered by
+        register_sources, which must run before the query.
+        """
+        groups = {}
+        for csv_file in self.files:
+            if Encoding.is_native(csv_file.encoding):
+                groups.setdefault(csv_file.delimiter, []).append(csv_file.filepath)
+        source_queries = [self.queries.read_csv_files_query(filepaths, delimiter, self.schema)
+                          for delimiter, filepaths in groups.items()]
+        source_queries.extend(self._transcoded_file_query(csv_file, queries)
+                              for csv_file, queries in self._transcoded_files())
+        return ' UNION ALL BY NAME '.join(source_queries)
+
+    @property
+    def is_transcoded(self):
+        """Check if any file is read from a transcoding stream."""
+        return any(not Encoding.is_native(csv_file.encoding) for csv_file in self.files)
+
+    def register_sources(self):
+        """Register the transcoding streams source_query selects from.
+
+        Each stream can only be scanned once, so register them right before each
+        run of the query.
+        """
+        for csv_file, queries in self._transcoded_files():
+            queries.register_source(csv_file.delimiter, csv_file.quotechar)
+
+    def _source_query(self):
+        """Register the transcoding streams and return the source query, once per query."""
+        self.register_sources()
+        return self.source_query()
+
+    def _read_csv(self):
+        """Reads the CSV files using DuckDB.
+
+        Returns:
+            A DuckDB DuckDBPyRelation.
+        """
+        return self.queries.database_connection.sql(self._source_query())
+
+    def get_sample(self):
+        """Return a sample of the CSV files."""
+        self._read_csv().show()
+
+    def to_relation(self):
+        """Returns the CSV files as one unmaterialized DuckDB relation.
+
+        Returns:
+            A DuckDB DuckDBPyRelation.
+        """
+        return self._read_csv()
+
+    def to_dataframe(self):
+        """Converts the CSV files to one Polars dataframe.
+
+        Returns:
+            A Polars dataframe.
+        """
+        if self.is_large:
+            show_large_file_warning()
+        return self._read_csv().pl()
+
+    def to_arrow_table(self):
+        """Converts the CSV files to one PyArrow table.
+
+        Returns:
+            A PyArrow table.
+        """
+        return self._read_csv().arrow()
+
+    def to_dicts(self):
+        """Converts the CSV files to a list of Python dictionaries.
+
+        Returns:
+            A list of dictionaries.
+        """
+        return self.to_dataframe().to_dicts()
+
+    def iter_batches(self, batch_size=None):
+        """Streams the CSV files as PyArrow record batches of bounded size.
+
+        Args:
+            batch_size (int, optional): Maximum number of rows per batch.
+
+        Yields:
+            PyArrow record batches.
+        """
+        yield from self.to_record_batch_reader(batch_size)
+
+    def to_record_batch_reader(self, batch_size=None):
+        """Streams the CSV files as a PyArrow RecordBatchReader of bounded batches.
+
+        Args:
+            batch_size (int, optional): Maximum number of rows per batch.
+
+        Returns:
+            A PyArrow RecordBatchReader.
+        """
+        batch_size = batch_size or CSVProperties.DEFAULT_BATCH_SIZE
+        return self._read_csv().fetch_arrow_reader(batch_size)
+
+class CSVFileSetReaderPolarsEngine(CSVFileSet):
+    """Class to read a set of CSV files as one dataset powered by Polars.
+
+    Files are parsed in parallel on a thread pool and concatenated by column name.
+    """
+
+    ENGINE_NAME = 'polars'
+
+    def _file_reader(self, csv_file):
+        """Return a Polars reader engine for one file of the set."""
+        schema = None
+        if self.schema:
+            schema = {column: dtype for column, dtype in self.schema.items()
+                      if column in csv_file.columns}
+        return CSVReaderPolarsEngine(csv_file.filepath, schema)
+
+    def _with_provenance(self, frame, filepath):
+        """Add the filename column to a dataframe or lazyframe."""
+        return frame.with_columns(pl.lit(filepath).alias(self.PROVENANCE_COLUMN))
+
+    def _read_file(self, csv_file):
+        """Read one file of the set into a dataframe."""
+        return self._with_provenance(self._file_reader(csv_file).to_dataframe(),
+                                     csv_file.filepath)
+
+    def _padded_batches(self, batch_size=None):
+        """Stream the batches of every file padded to the combined columns of all files."""
+        empty = pl.DataFrame(schema=self.to_lazyframe().collect_schema())
+        for batch in self.iter_batches(batch_size):
+            yield pl.concat([empty, batch], how='diagonal_relaxed')
+
+    def get_sample(self):
+        """Return a sample of the CSV files."""
+        df = self.to_lazyframe().head(CSVProperties.DATAFRAME_SAMPLE_ROWS).collect()
+        show_dataframe_sample(df)
+
+    def to_lazyframe(self):
+        """Converts the CSV files to one Polars lazyframe.
+
+        Returns:
+            A Polars lazyframe.
+        """
+        lazyframes = [self._with_provenance(self._file_reader(csv_file).to_lazyframe(),
+                                            csv_file.filepath)
+                      for csv_file in self.files]
+        return pl.concat(lazyframes, how='diagonal_relaxed')
+
+    def to_dataframe(self):
+        """Converts the CSV files to one Polars dataframe, reading files in parallel.
+
+        Returns:
+            A Polars dataframe.
+        """
+        if self.is_large:
+            show_large_file_warning()
+        return pl.concat(self._map(self._read_file, self.files), how='diagonal_relaxed')
+
+    def to_arrow_table(self):
+        """Converts the CSV files to one PyArrow table.
+
+        Returns:
+            A PyArrow table.
+        """
+        return self.to_dataframe().to_arrow()
+
+    def to_dicts(self):
+        """Converts the CSV files to a list of Python dictionaries.
+
+        Returns:
+            A list of dictionaries.
+        """
+        return self.to_dataframe().to_dicts()
+
+    def iter_batches(self, batch_size=None):
+        """Streams the CSV files, one after another, as Polars dataframes of bounded size.
+
+        Args:
+            batch_size (int, optional): Maximum number of rows per batch.
+
+        Yields:
+            Polars dataframes.
+        """
+        for csv_file in self.files:
+            for batch in self._file_reader(csv_file).iter_batches(batch_size):
+                yield self._with_provenance(batch, csv_file.filepath)
+
+    def to_record_batch_reader(self, batch_size=None):
+        """Streams the CSV files as a PyArrow RecordBatchReader of bounded batches.
+
+        Batches are padded to the combined columns of all files, so they share
+        one schema.
+
+        Args:
+            batch_size (int, optional): Maximum number of rows per batch.
+
+        Returns:
+            A PyArrow RecordBatchReader.
+        """
+        dataframes = self._padded_batches(batch_size)
+        first_dataframe = next(dataframes, None)
+        if first_dataframe is None:
+            first_dataframe = self.to_dataframe()
+        return CSVReaderPolarsEngine.to_record_batch_stream(first_dataframe, dataframes)
+
+class CSVFileSetWriterDuckDBEngine(CSVFileSetReaderDuckDBEngine):
+    """Class to convert a set of CSV files into one output file powered by DuckDB."""
+
+    def _copy(self, query):
+        """Run a COPY query and return the number of rows it wrote."""
+        return self.queries.database_connection.execute(query).fetchone()[0]
+
+    def write_csv(self, out_filename=None):
+        """Query to export the CSV files to one CSV file.
+
+        Args:
+            out_filename (optional, str): The name of the output file.
+
+        Returns:
+            int: The number of rows written.
+        """
+        filename = self._set_out_filename(FileProperties.CSV_OUT_FILENAME, out_filename)
+        query = self.queries.export_csv_query(filename, self._source_query())
+        return self._copy(query)
+
+    def write_excel(self, out_filename=None):
+        """Stream the CSV files to one Excel file in constant memory.
+
+        A new sheet is started every EXCEL_ROW_LIMIT rows.
+
+        Args:
+            out_filename (optional, str): The name of the output file.
+
+        Returns:
+            int: The number of rows written.
+        """
+        filename = self._set_out_filename(FileProperties.EXCEL_OUT_FILENAME, out_filename)
+        batches = self._read_csv().fetch_arrow_reader(CSVProperties.DEFAULT_BATCH_SIZE)
+        return ExcelWriter(filename).write(batches)
+
+    def write_json(self, out_filename=None):
+        """Query to export the CSV files to one JSON file.
+
+        Args:
+            out_filename (optional, str): The name of the output file.
+
+        Returns:
+            int: The number of rows written.
+        """
+        filename = self._set_out_filename(FileProperties.JSON_OUT_FILENAME, out_filename)
+        query = self.queries.export_json_query(filename, self._source_query())
+        return self._copy(query)
+
+    def write_json_newline_delimited(self, out_filename=None):
+        """Query to export the CSV files to one JSON newline delimited file.
+
+        Args:
+            out_filename (optional, str): The name of the output file.
+
+        Returns:
+            int: The number of rows written.
+        """
+        filename = self._set_out_filename(FileProperties.JSON_NEWLINE_OUT_FILENAME,
+                                          out_filename)
+        query = self.queries.export_json_newline_delimited_query(filename, self._source_query())
+        return self._copy(query)
+
+    def write_parquet(self, out_filename=None, partition_by=None, row_group_size=None,
+                      compression=None, compression_level=None, max_file_size=None):
+        """Query to export the CSV files to one Parquet file or a Hive-partitioned directory.
+
+        Args:
+            out_filename (optional, str): The name of the output file, or the output
+                directory when partitioning or capping the file size.
+            partition_by (str or list, optional): Columns to partition the output by.
+            row_group_size (int, optional): Number of rows per row group.
+            compression (str, optional): Compression codec, such as 'zstd' or 'snappy'.
+            compression_level (int, optional): Compression level of the codec.
+            max_file_size (int, optional): Target maximum size of each file in bytes.
+
+        Returns:
+            int: The number of rows written.
+        """
+        filename = self._set_out_filename(FileProperties.PARQUET_OUT_FILENAME, out_filename)
+        if partition_by and max_file_size:
+            # DuckDB cannot cap the file size of a partitioned COPY, so stream it out
+            writer = ParquetDatasetWriter(filename, partition_by, row_group_size, compression,
+                                          compression_level, self._rows_per_file(max_file_size))
+            batches = self._read_csv().fetch_arrow_reader(CSVProperties.DEFAULT_BATCH_SIZE)
+            return writer.write(batches)
+        if max_file_size and not row_group_size:
+            # DuckDB only rolls over to a new file between row groups
+            row_group_size = min(CSVWriterDuckDBEngine.DUCKDB_ROW_GROUP_SIZE,
+                                 self._rows_per_file(max_file_size))
+        query = self.queries.export_parquet_query(filename, self._source_query(), partition_by,
+                                                  row_group_size, compression,
+                                                  compression_level, max_file_size)
+        return self._copy(query)
+
+class CSVFileSetWriterPolarsEngine(CSVFileSetReaderPolarsEngine):
+    """Class to convert a set of CSV files into one output file powered by Polars."""
+
+    def write_csv(self, out_filename=None):
+        """Stream the CSV files to one CSV file in bounded memory.
+
+        Args:
+            out_filename (optional, str): The name of the output file.
+
+        Returns:
+            int: The number of rows written, or None when streamed by a Polars sink,
+            which does not report it.
+        """
+        filename = self._set_out_filename(FileProperties.CSV_OUT_FILENAME, out_filename)
+        self.to_lazyframe().sink_csv(filename)
+        return None
+
+    def write_excel(self, out_filename=None):
+        """Stream the CSV files to one Excel file in constant memory.
+
+        A new sheet is started every EXCEL_ROW_LIMIT rows.
+
+        Args:
+            out_filename (optional, str): The name of the output file.
+
+        Returns:
+            int: The number of rows written.
+        """
+        filename = self._set_out_filename(FileProperties.EXCEL_OUT_FILENAME, out_filename)
+        return ExcelWriter(filename).write_dataframes(self._padded_batches())
+
+    def write_json(self, out_filename=None):
+        """Export the CSV files to one JSON file.
+
+        Streams the files batch by batch in out-of-core mode.
+
+        Args:
+            out_filename (optional, str): The name of the output file.
+
+        Returns:
+            int: The number of rows written.
+        """
+        filename = self._set_out_filename(FileProperties.JSON_OUT_FILENAME, out_filename)
+        if CSVProperties.out_of_core:
+            return CSVWriterPolarsEngine.write_json_batches(filename, self._padded_batches())
+        dataframe = self.to_dataframe()
+        dataframe.write_json(filename)
+        return dataframe.height
+
+    def write_json_newline_delimited(self, out_filename=None):
+        """Stream the CSV files to one JSON newline delimited file in bounded memory.
+
+        Args:
+            out_filename (optional, str): The name of the output file.
+
+        Returns:
+            int: The number of rows written, or None when streamed by a Polars sink,
+            which does not report it.
+        """
+        filename = self._set_out_filename(FileProperties.JSON_NEWLINE_OUT_FILENAME,
+                                          out_filename)
+        self.to_lazyframe().sink_ndjson(filename)
+        return None
+
+    def write_parquet(self, out_filename=None, partition_by=None, row_group_size=None,
+                      compression=None, compression_level=None, max_file_size=None):
+        """Stream the CSV files to one Parquet file or a Hive-partitioned directory
+        in bounded memory.
+
+        Args:
+            out_filename (optional, str): The name of the output file, or the output
+                directory when partitioning or capping the file size.
+            partition_by (str or list, optional): Columns to partition the output by.
+            row_group_size (int, optional): Number of rows per row group.
+            compression (str, optional): Compression codec, such as 'zstd' or 'snappy'.
+                Defaults to 'zstd'.
+            compression_level (int, optional): Compression level of the codec.
+            max_file_size (int, optional): Target maximum size of each file in bytes.
+
+        Returns:
+            int: The number of rows written, or None when streamed by a Polars sink,
+            which does not report it.
+        """
+        filename = self._set_out_filename(FileProperties.PARQUET_OUT_FILENAME, out_filename)
+        compression = compression or CSVWriterPolarsEngine.DEFAULT_PARQUET_COMPRESSION
+        # the streaming sink neither partitions nor honors small row group sizes
+        if partition_by or max_file_size or row_group_size:
+            max_rows_per_file = self._rows_per_file(max_file_size) if max_file_size else None
+            writer = ParquetDatasetWriter(filename, partition_by, row_group_size, compression,
+                                          compression_level, max_rows_per_file)
+            return writer.write_dataframes(self._padded_batches())
+        self.to_lazyframe().sink_parquet(filename,
+                                         compression=compression,
+                                         compression_level=compression_level,
+                                         row_group_size=row_group_size
+                                         )
+        return None
@@ -0,0 +1,140 @@
+"""Module for tracking incremental reads of append-only CSV files."""
+
+# standard library
+from contextlib import contextmanager
+import hashlib
+import json
+import os
+from pathlib import Path
+import tempfile
+
+# local libraries
+from .records import RecordScanner
+
+class IncrementalState:
+    """Persistent progress of incremental reads of an append-only CSV file.
+
+    The state file records the byte offset just past the last processed record,
+    the rows processed so far, and digests of the header and of the bytes just
+    before the offset. When either digest no longer matches, or the file is now
+    shorter than the offset, the file was replaced rather than appended to, and
+    processing starts over from the beginning of the file.
+    """
+
+    TAIL_CHECK_BYTES = 4096
+
+    def __init__(self, filepath, state_file, quotechar=None, encoding=None):
+        """
+        Initialize the IncrementalState class.
+
+        Args:
+            filepath (str): Path to the CSV file.
+            state_file (str): Path to the JSON state file. Created on the first save.
+            quotechar (str, optional): Quote character of the CSV file.
+            encoding (str, optional): Character encoding of the CSV file.
+        """
+        self.filepath = filepath
+        self.state_file = Path(state_file)
+        self.quotechar = quotechar
+        self.encoding = encoding
+        self.header = self._read_header()
+        self.state = self._load()
+
+    def _read_header(self):
+        """Return the raw bytes of the header line."""
+        with open(self.filepath, 'rb') as csv_file:
+            return csv_file.readline()
+
+    @classmethod
+    def _digest(cls, data):
+        """Return the hex digest of some bytes."""
+        return hashlib.sha1(data).hexdigest()
+
+    def _tail_digest(self, offset):
+        """Return the digest of the bytes just before an offset."""
+        with open(self.filepath, 'rb') as csv_file:
+            start = max(0, offset - self.TAIL_CHECK_BYTES)
+            csv_file.seek(start)
+            return self._digest(csv_file.read(offset - start))
+
+    def _load(self):
+        """Return the saved state, or an empty state if there is none."""
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as state_file:
+                return json.load(state_file)
+        except (OSError, ValueError):
+            return {}
+
+    @property
+    def offset(self):
+        """Return the byte offset to continue from, or 0 if the file must be read whole."""
+        offset = self.state.get('offset', 0)
+        if (offset == 0
+                or offset > os.path.getsize(self.filepath)
+                or self.state.get('header_digest') != self._digest(self.header)
+                or self.state.get('tail_digest') != self._tail_digest(offset)):
+            return 0
+        return offset
+
+    @property
+    def rows(self):
+        """Return the number of rows processed so far."""
+        return self.state.get('rows', 0) if self.offset else 0
+
+    def reset(self):
+        """Forget the progress so the next read starts from the beginning of the file."""
+        self.state = {}
+
+    def pending(self):
+        """Find the complete records appended since the last saved offset.
+
+        Returns:
+            tuple: The start and end byte offsets of the new records and their
+            number of rows. Starting at 0 means the whole file, header included.
+        """
+        start = self.offset
+        scanner = RecordScanner(self.filepath, self.quotechar, encoding=self.encoding)
+        end, records = scanner.complete_records_end(start)
+        rows = max(records - 1, 0) if start == 0 else records
+        return start, end, rows
+
+    @contextmanager
+    def new_rows_file(self, start, end):
+        """Context manager copying the header and the new records to a temporary CSV file.
+
+        Args:
+            start (int): Byte offset of the first new record.
+            end (int): Byte offset just past the last new record.
+
+        Yields:
+            str: Path of the temporary CSV file, removed on exit, or of the CSV file
+            itself when every record is new.
+        """
+        scanner = RecordScanner(self.filepath, self.quotechar, encoding=self.encoding)
+        with scanner.range_file(start, end, self.header) as new_rows_path:
+            yield new_rows_path
+
+    def advance(self, start, end, rows, **fields):
+        """Save the progress after the records from start to end were processed.
+
+        Args:
+            start (int): Byte offset the records were read from, as returned by pending().
+            end (int): Byte offset just past the last processed record.
+            rows (int): Number of rows processed.
+            **fields: Further JSON serializable fields to keep in the state.
+        """
+        previous_rows = self.state.get('rows', 0) if start else 0
+        self.state = {**self.state,
+                      **fields,
+                      'offset': end,
+                      'rows': previous_rows + rows,
+                      'header_digest': self._digest(self.header),
+                      'tail_digest': self._tail_digest(end),
+                      }
+        self.state_file.parent.mkdir(parents=True, exist_ok=True)
+        # write to a temporary file first so a crash never leaves a partial state
+        with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=self.state_file.parent,
+                                         suffix='.tmp', delete=False) as state_file:
+            json.dump(self.state, state_file)
+        os.replace(state_file.name, self.state_file)
+
@@ -0,0 +1,198 @@
+"""Module for instrumenting the hot paths of reading and converting files."""
+
+# standard library
+from contextlib import contextmanager
+import json
+import os
+import tempfile
+import threading
+import time
+
+# local libraries
+from .databases import DuckDBSession
+from .logger import show_warning
+
+class Instrumentation:
+    """Process-wide registry of hooks called after every instrumented stage.
+
+    Stages wrap dialect detection, file reads, engine execution and writes. Each
+    hook receives one event dict per stage with its 'stage', 'filepath',
+    'engine', 'operation', 'seconds', 'bytes_read', 'bytes_written', 'rows',
+    'error' and, when DuckDB profiling is enabled, DuckDB's JSON 'profile'.
+    Fields a stage cannot measure are None. With no hooks registered a stage
+    only costs a dictionary, and callers skip measurements that need extra work.
+    Measurements taken inside untimed() are left out of the stage's seconds.
+    """
+
+    STAGES = ['detect_dialect', 'read', 'execute', 'write']
+    EVENT_FIELDS = ['filepath', 'engine', 'operation', 'seconds', 'bytes_read',
+                    'bytes_written', 'rows', 'error', 'profile']
+    HOOK_ERROR_MESSAGE = 'Instrumentation hook {hook} failed: {error}'
+    UNTIMED_FIELD = '_untimed_seconds'
+
+    _hooks = []
+    _lock = threading.Lock()
+    profile_duckdb = False
+
+    @classmethod
+    def add_hook(cls, hook):
+        """Register a callable that receives the event of every stage.
+
+        Args:
+            hook (callable): Called with one event dict per stage.
+        """
+        with cls._lock:
+            cls._hooks = cls._hooks + [hook]
+
+    @classmethod
+    def remove_hook(cls, hook):
+        """Unregister a hook added with add_hook."""
+        with cls._lock:
+            cls._hooks = [registered for registered in cls._hooks if registered is not hook]
+
+    @classmethod
+    def clear_hooks(cls):
+        """Unregister every hook."""
+        with cls._lock:
+            cls._hooks = []
+
+    @classmethod
+    def is_enabled(cls):
+        """Check if any hook is registered."""
+        return bool(cls._hooks)
+
+    @classmethod
+    @contextmanager
+    def hook(cls, hook):
+        """Context manager registering a hook for the duration of a block.
+
+        Args:
+            hook (callable): Called with one event dict per stage.
+
+        Yields:
+            The hook.
+        """
+        cls.add_hook(hook)
+        try:
+            yield hook
+        finally:
+            cls.remove_hook(hook)
+
+    @classmethod
+    @contextmanager
+    def collect(cls):
+        """Context manager collecting the events of a block into a list.
+
+        Yields:
+            list: The events, appended as stages complete.
+        """
+        events = []
+        with cls.hook(events.append):
+            yield events
+
+    @classmethod
+    def path_size_in_bytes(cls, path):
+        """Return the size of a file, or of every file under a directory, in bytes.
+
+        Args:
+            path (str): Path to a file or directory.
+
+        Returns:
+            int: The size in bytes, or None if the path does not exist.
+        """
+        if os.path.isdir(path):
+            return sum(os.path.getsize(os.path.join(root, filename))
+                       for root, _, filenames in os.walk(path) for filename in filenames)
+        if os.path.exists(path):
+            return os.path.getsize(path)
+        return None
+
+    @classmethod
+    def set_duckdb_profiling(cls, enabled=True):
+        """Enable or disable capturing DuckDB's profiling output on DuckDB stages.
+
+        Args:
+            enabled (bool): Whether to capture the profile.
+        """
+        cls.profile_duckdb = enabled
+
+    @classmethod
+    @contextmanager
+    def _duckdb_profile(cls, event):
+        """Capture the JSON profile of the last DuckDB query run in the block."""
+        connection = DuckDBSession.connect()
+        descriptor, profile_path = tempfile.mkstemp(suffix='.json')
+        os.close(descriptor)
+        connection.execute("SET enable_profiling = 'json'")
+        connection.execute(f"SET profiling_output = '{profile_path}'")
+        try:
+            yield
+        finally:
+            connection.execute('RESET enable_profiling')
+            try:
+                with open(profile_path, 'r', encoding='utf-8') as profile_file:
+                    event['profile'] = json.load(profile_file)
+            except (OSError, ValueError):
+                event['profile'] = None
+            os.remove(profile_path)
+
+    @classmethod
+    def _emit(cls, event):
+        """Pass an event to every hook, warning instead of failing on hook errors."""
+        for hook in cls._hooks:
+            try:
+                hook(event)
+            except Exception as error:  # a metrics exporter must not break a conversion
+                show_warning(cls.HOOK_ERROR_MESSAGE.format(hook=hook, error=error))
+
+    @classmethod
+    @contextmanager
+    def untimed(cls, event):
+        """Context manager leaving a block out of the seconds of the enclosing stage.
+
+        Use it for measurements the stage reports but does not perform, such as
+        counting rows the engine did not return.
+
+        Args:
+            event (dict): The event yielded by stage.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            event[cls.UNTIMED_FIELD] = event.get(cls.UNTIMED_FIELD, 0) + elapsed
+
+    @classmethod
+    @contextmanager
+    def stage(cls, name, **fields):
+        """Context manager timing a stage and reporting it to the hooks.
+
+        The block can fill in fields it measures, such as rows, on the yielded event.
+
+        Args:
+            name (str): The stage, one of STAGES.
+            **fields: Initial event fields, such as filepath, engine and operation.
+
+        Yields:
+            dict: The event of the stage.
+        """
+        event = dict.fromkeys(cls.EVENT_FIELDS)
+        event.update(fields, stage=name)
+        if not cls._hooks:
+            yield event
+            return
+        start = time.perf_counter()
+        try:
+            if cls.profile_duckdb and event['engine'] == 'duckdb':
+                with cls._duckdb_profile(event):
+                    yield event
+            else:
+                yield event
+        except Exception as error:
+            event['error'] = f'{type(error).__name__}: {error}'
+            raise
+        finally:
+            event['seconds'] = (time.perf_counter() - start
+                                - event.pop(cls.UNTIMED_FIELD, 0))
+            cls._emit(event)
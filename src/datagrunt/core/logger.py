@@ -2,7 +2,9 @@
 
 import logging
 
-LARGE_FILE_WARNING = "File is large and may load into memory slowly or exceed memory capacity."
+LARGE_FILE_WARNING = """File is large and may load into memory slowly or exceed memory capacity. \
+    Use iter_batches() to stream it in bounded memory."""
+ENGINE_CHOICE_MESSAGE = """Engine 'auto' chose '{engine}' for {operation}: {reason}."""
 DUCKDB_ENGINE_ERROR = """DuckDB engine failed due to the following error: {error}. \
     Switching to Polars."""
 
@@ -32,6 +34,15 @@ def show_large_file_warning():
     show_warning(LARGE_FILE_WARNING)
 
 
+def show_engine_choice(choice):
+    """Show which engine was chosen for an operation and why.
+
+    Args:
+        choice (dict): The 'operation', chosen 'engine' and 'reason'.
+    """
+    return show_info_message(ENGINE_CHOICE_MESSAGE.format(**choice))
+
+
 def duckdb_query_error(error_message):
     """Show error message if duckdb query fails."""
     message = DUCKDB_ENGINE_ERROR.format(error=error_message)
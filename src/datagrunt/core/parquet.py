@@ -0,0 +1,185 @@
+"""Module for writing partitioned and tuned Parquet datasets."""
+
+# standard library
+
+# third party libraries
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+class ParquetDatasetWriter:
+    """Class to stream record batches into a Hive-partitioned Parquet dataset.
+
+    Used for the layouts the engines cannot write natively: Polars has no
+    partitioned or size-capped sink and its sink ignores small row group sizes,
+    and DuckDB cannot cap the file size of a partitioned COPY. Batches are
+    written as they arrive, so memory stays bounded by the batch size and the
+    open row groups. Without partitioning or a file size cap a single Parquet
+    file is written instead of a directory.
+    """
+
+    PARTITIONING_FLAVOR = 'hive'
+    BASENAME_TEMPLATE = 'data_{i}.parquet'
+    EXISTING_DATA_BEHAVIOR = 'delete_matching'
+    DEFAULT_MAX_ROWS_PER_GROUP = 1024 * 1024
+
+    def __init__(self, out_path, partition_by=None, row_group_size=None, compression=None,
+                 compression_level=None, max_rows_per_file=None):
+        """
+        Initialize the ParquetDatasetWriter class.
+
+        Args:
+            out_path (str): Directory to write the dataset to, or the file to write
+                when neither partitioning nor capping the file size.
+            partition_by (str or list, optional): Columns to partition the dataset by.
+            row_group_size (int, optional): Number of rows per row group.
+            compression (str, optional): Compression codec, such as 'zstd' or 'snappy'.
+            compression_level (int, optional): Compression level of the codec.
+            max_rows_per_file (int, optional): Maximum number of rows per file.
+        """
+        self.out_path = str(out_path)
+        self.partition_by = self.to_column_list(partition_by)
+        self.row_group_size = row_group_size
+        self.compression = compression
+        self.compression_level = compression_level
+        self.max_rows_per_file = max_rows_per_file
+
+    @classmethod
+    def to_column_list(cls, columns=None):
+        """Return a column name or list of column names as a list."""
+        if not columns:
+            return []
+        if isinstance(columns, str):
+            return [columns]
+        return list(columns)
+
+    @classmethod
+    def rows_per_file(cls, max_file_size, size_in_bytes, row_count):
+        """Translate a target file size into a row limit.
+
+        The limit uses the bytes per row of the CSV source. Parquet is smaller than
+        the CSV it was written from, so files stay under the target size.
+
+        Args:
+            max_file_size (int): Target maximum size of each file in bytes.
+            size_in_bytes (int): Size of the CSV source in bytes.
+            row_count (int): Number of rows in the CSV source.
+
+        Returns:
+            int: Maximum number of rows per file.
+        """
+        bytes_per_row = size_in_bytes / max(row_count, 1)
+        return max(1, int(max_file_size / bytes_per_row))
+
+    def _file_options(self):
+        """Return the Parquet write options for the compression settings."""
+        options = {}
+        if self.compression:
+            options['compression'] = self.compression
+        if self.compression_level is not None:
+            options['compression_level'] = self.compression_level
+        return ds.ParquetFileFormat().make_write_options(**options)
+
+    def _row_group_options(self):
+        """Return the row group and file limits for write_dataset."""
+        options = {}
+        if self.max_rows_per_file:
+            options['max_rows_per_file'] = self.max_rows_per_file
+        if self.row_group_size:
+            row_group_size = self.row_group_size
+            if self.max_rows_per_file:
+                row_group_size = min(row_group_size, self.max_rows_per_file)
+            options['min_rows_per_group'] = row_group_size
+            options['max_rows_per_group'] = row_group_size
+        elif self.max_rows_per_file:
+            # row groups may not be larger than the files holding them
+            options['max_rows_per_group'] = min(self.max_rows_per_file,
+                                                 self.DEFAULT_MAX_ROWS_PER_GROUP)
+        return options
+
+    def _write_file(self, batches):
+        """Write record batches to a single Parquet file and return the rows written.
+
+        With a row group size, batches are buffered until they fill a row group, so
+        every row group but the last holds exactly row_group_size rows whatever the
+        size of the incoming batches.
+        """
+        options = {'compression': self.compression or 'snappy'}
+        if self.compression_level is not None:
+            options['compression_level'] = self.compression_level
+        rows = 0
+        pending = []
+        pending_rows = 0
+        with pq.ParquetWriter(self.out_path, batches.schema, **options) as writer:
+            for batch in batches:
+                rows += batch.num_rows
+                if not self.row_group_size:
+                    writer.write_batch(batch)
+                    continue
+                pending.append(batch)
+                pending_rows += batch.num_rows
+                if pending_rows < self.row_group_size:
+                    continue
+                table = pa.Table.from_batches(pending, schema=batches.schema)
+                full_rows = pending_rows - pending_rows % self.row_group_size
+                writer.write_table(table.slice(0, full_rows), row_group_size=self.row_group_size)
+                pending = table.slice(full_rows).to_batches()
+                pending_rows -= full_rows
+            if pending_rows:
+                writer.write_table(pa.Table.from_batches(pending, schema=batches.schema),
+                                   row_group_size=self.row_group_size)
+        return rows
+
+    def write(self, batches):
+        """Write record batches to the dataset directory or file.
+
+        Args:
+            batches (pyarrow.RecordBatchReader): The batches to write.
+
+        Returns:
+            int: The number of rows written.
+        """
+        if not self.partition_by and not self.max_rows_per_file:
+            return self._write_file(batches)
+        counted = {'rows': 0}
+
+        def counted_batches():
+            for batch in batches:
+                counted['rows'] += batch.num_rows
+                yield batch
+
+        ds.write_dataset(pa.RecordBatchReader.from_batches(batches.schema, counted_batches()),
+                         self.out_path,
+                         format='parquet',
+                         basename_template=self.BASENAME_TEMPLATE,
+                         partitioning=self.partition_by or None,
+                         partitioning_flavor=self.PARTITIONING_FLAVOR if self.partition_by else None,
+                         file_options=self._file_options(),
+                         existing_data_behavior=self.EXISTING_DATA_BEHAVIOR,
+                         **self._row_group_options()
+                         )
+        return counted['rows']
+
+    def write_dataframes(self, dataframes):
+        """Write a stream of Polars dataframes to the dataset directory or file.
+
+        Every dataframe is cast to the schema of the first one.
+
+        Args:
+            dataframes (iterable): Polars dataframes sharing the same columns.
+
+        Returns:
+            int: The number of rows written.
+        """
+        dataframes = iter(dataframes)
+        first = next(dataframes, None)
+        if first is None:
+            return 0
+        schema = first.to_arrow().schema
+
+        def batches():
+            yield from first.to_arrow().to_batches()
+            for dataframe in dataframes:
+                yield from dataframe.to_arrow().cast(schema).to_batches()
+
+        return self.write(pa.RecordBatchReader.from_batches(schema, batches()))
@@ -0,0 +1,101 @@
+"""Module for choosing the processing engine of an operation."""
+
+# standard library
+import os
+
+# local libraries
+from .compression import Compression
+
+class EnginePlanner:
+    """Class to choose the cheaper engine for an operation on a CSV file.
+
+    The thresholds are calibrated from benchmarks/engine_suite.py. Polars was
+    faster than DuckDB for every operation on files up to 200 MB, by 2-5x on
+    wide files, and used less memory, so it is the default. DuckDB wins where
+    its parallel scan can spread a large file over many cores, and where Polars
+    would have to materialize an output that DuckDB can stream with COPY.
+    """
+
+    DUCKDB = 'duckdb'
+    POLARS = 'polars'
+    # Polars builds the whole dataframe for these outputs, while DuckDB streams them
+    EAGER_POLARS_OPERATIONS = ['write_json']
+    STREAMING_OPERATIONS = ['iter_batches', 'write_csv', 'write_json_newline_delimited',
+                            'write_parquet']
+    # peak RSS of to_dataframe was about 3x the CSV size in the benchmarks
+    IN_MEMORY_EXPANSION = 3
+    PARALLEL_SCAN_MIN_BYTES = 1024 ** 3
+    PARALLEL_SCAN_MIN_CPUS = 8
+    WIDE_COLUMN_COUNT = 50
+    DEFAULT_REASON = 'Polars is faster for this operation at this size'
+    MEMORY_REASON = ('the output would not fit in the {available_gb:.1f} GB of available '
+                     'memory, and DuckDB streams it')
+    PARALLEL_REASON = ('the file is large and narrow enough for DuckDB to scan it in '
+                       'parallel on {cpu_count} CPUs')
+    COMPRESSION_REASON = 'DuckDB cannot decompress {compression} files'
+
+    def __init__(self, size_in_bytes, column_count, cpu_count=None, available_memory=None,
+                 compression=None):
+        """
+        Initialize the EnginePlanner class.
+
+        Args:
+            size_in_bytes (int): Size of the CSV input in bytes.
+            column_count (int): Number of columns in the CSV input.
+            cpu_count (int, optional): Number of CPUs. Defaults to the machine's.
+            available_memory (int, optional): Available memory in bytes. Defaults to
+                the machine's, or unlimited where it cannot be read.
+            compression (str, optional): Compression of the CSV input.
+        """
+        self.size_in_bytes = size_in_bytes
+        self.compression = compression
+        self.column_count = column_count
+        self.cpu_count = cpu_count or os.cpu_count() or 1
+        if available_memory is None:
+            available_memory = self.available_memory_in_bytes()
+        self.available_memory = available_memory
+
+    @classmethod
+    def available_memory_in_bytes(cls):
+        """Return the available physical memory in bytes, or None if unknown."""
+        try:
+            return os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+        except (AttributeError, ValueError, OSError):
+            return None
+
+    @property
+    def fits_in_memory(self):
+        """Check if the file fits in available memory once loaded."""
+        if self.available_memory is None:
+            return True
+        return self.size_in_bytes * self.IN_MEMORY_EXPANSION <= self.available_memory
+
+    @property
+    def scans_in_parallel(self):
+        """Check if DuckDB's parallel scan outweighs its overhead for the file."""
+        return (self.size_in_bytes >= self.PARALLEL_SCAN_MIN_BYTES
+                and self.cpu_count >= self.PARALLEL_SCAN_MIN_CPUS
+                and self.column_count < self.WIDE_COLUMN_COUNT)
+
+    def choose(self, operation):
+        """Choose the engine for an operation.
+
+        Args:
+            operation (str): Name of the reader or writer method, such as 'to_dicts'
+                or 'write_parquet'.
+
+        Returns:
+            dict: The 'operation', the chosen 'engine' and the 'reason' for it.
+        """
+        engine, reason = self.POLARS, self.DEFAULT_REASON
+        if operation in self.EAGER_POLARS_OPERATIONS and not self.fits_in_memory:
+            engine = self.DUCKDB
+            reason = self.MEMORY_REASON.format(available_gb=self.available_memory / 1024 ** 3)
+        elif operation in self.STREAMING_OPERATIONS and self.scans_in_parallel:
+            engine = self.DUCKDB
+            reason = self.PARALLEL_REASON.format(cpu_count=self.cpu_count)
+        if (engine == self.DUCKDB and self.compression
+                and self.compression not in Compression.NATIVE_COMPRESSIONS):
+            engine = self.POLARS
+            reason = self.COMPRESSION_REASON.format(compression=self.compression)
+        return {'operation': operation, 'engine': engine, 'reason': reason}
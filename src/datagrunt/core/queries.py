@@ -1,25 +1,37 @@
 """Module to store database queries and query strings."""
 
 # standard library
+import csv
 
 # third party libraries
+import polars as pl
+import pyarrow as pa
 
 # local libraries
+from .compression import Compression
 from .databases import DuckDBDatabase
+from .encoding import Encoding
 from .fileproperties import FileProperties
+from .parquet import ParquetDatasetWriter
+from .records import RecordScanner
 
 class DuckDBQueries(DuckDBDatabase):
     """Class to store DuckDB database queries and query strings."""
 
-    def __init__(self, filepath):
+    TRANSCODED_VIEW_SUFFIX = '_utf8_stream'
+
+    def __init__(self, filepath, encoding=None):
         """
         Initialize the DuckDBQueries class.
 
         Args:
             filepath (str): Path to the file.
+            encoding (str, optional): Character encoding of the file. Detected from
+                the file when omitted.
         """
         super().__init__(filepath)
         self.export_properties = FileProperties(self.filepath)
+        self.encoding = encoding
 
     def _set_out_filename(self, default_filename, out_filename=None):
         """Evaluate if a filename is passed in and if not, return default filename."""
@@ -29,75 +41,276 @@ class DuckDBQueries(DuckDBDatabase):
             filename = default_filename
         return filename
 
-    def import_csv_query(self, delimiter):
-        """Query to import a CSV file into a DuckDB table.
+    def _types_option(self, schema=None):
+        """Return the read_csv option that sets column types.
+
+        Args:
+            schema (dict, optional): Column names mapped to DuckDB type names.
+                Every column is read as VARCHAR when omitted.
+        """
+        if not schema:
+            return 'all_varchar=True'
+        types = ", ".join(f"""'{column.replace("'", "''")}': '{dtype}'"""
+                          for column, dtype in schema.items())
+        return f'types={{{types}}}'
+
+    def _compression_option(self):
+        """Return the read_csv option that decompresses a compressed file, or nothing."""
+        compression = Compression.duckdb_compression(self.export_properties.compression)
+        return f"compression='{compression}'," if compression else ''
+
+    @property
+    def transcoded_view_name(self):
+        """Return the name of the view streaming the file transcoded to UTF-8."""
+        return f'{self.database_table_name}{self.TRANSCODED_VIEW_SUFFIX}'
+
+    @property
+    def is_transcoded(self):
+        """Check if DuckDB reads the file from a transcoding stream, because it is
+        not encoded in UTF-8."""
+        return not Encoding.is_native(self.encoding or self.export_properties.encoding)
+
+    def _transcoded_batches(self, delimiter, quotechar=None):
+        """Stream the file transcoded to UTF-8 as Arrow tables of text columns.
+
+        Blocks of whole records are parsed by Polars, so like read_csv with
+        null_padding only empty fields are nulls and short rows are padded with
+        nulls.
+        """
+        encoding = self.encoding or self.export_properties.encoding
+        scanner = RecordScanner(self.filepath, quotechar, encoding=encoding)
+        for block in scanner.iter_record_blocks():
+            yield pl.read_csv(block,
+                              separator=delimiter,
+                              quote_char=scanner.quotechar,
+                              infer_schema=False,
+                              truncate_ragged_lines=True
+                              ).to_arrow()
+
+    def register_source(self, delimiter, quotechar=None):
+        """Register the stream read_csv_query selects from when DuckDB cannot read the file.
+
+        DuckDB only reads UTF-8 files, so files in other encodings are transcoded
+        as a stream and DuckDB scans the record batches as they come. The stream
+        can only be scanned once, so register it right before each run of a query
+        reading the file. Does nothing for UTF-8 files.
+
+        Args:
+            delimiter (str): The delimiter of the file.
+            quotechar (str, optional): The quote character of the file.
+        """
+        if not self.is_transcoded:
+            return
+        encoding = self.encoding or self.export_properties.encoding
+        with Encoding.open(self.filepath, encoding, self.export_properties.compression) as stream:
+            header = stream.readline().decode(Encoding.DEFAULT_ENCODING)
+        columns = next(csv.reader([header], delimiter=delimiter,
+                                  quotechar=quotechar or RecordScanner.DEFAULT_QUOTECHAR), [])
+        schema = pa.schema([(column, pa.large_string()) for column in columns])
+
+        def record_batches():
+            for table in self._transcoded_batches(delimiter, quotechar):
+                yield from table.rename_columns(schema.names).cast(schema).to_batches()
+
+        reader = pa.RecordBatchReader.from_batches(schema, record_batches())
+        self.database_connection.register(self.transcoded_view_name, reader)
+
+    def read_csv_query(self, delimiter, schema=None):
+        """Query to select from a CSV file without staging it in a DuckDB table.
+
+        Files not encoded in UTF-8 are selected from the stream registered by
+        register_source, which must run before the query.
 
         Args:
-            filepath str: Path to the file.
             delimiter str: The delimiter to use.
+            schema (dict, optional): Column names mapped to DuckDB type names.
         """
+        if self.is_transcoded:
+            if not schema:
+                return f"SELECT * FROM {self.transcoded_view_name}"
+            casts = ", ".join(f'CAST("{column}" AS {dtype}) AS "{column}"'
+                              for column, dtype in schema.items())
+            return f"SELECT * REPLACE ({casts}) FROM {self.transcoded_view_name}"
         return f"""
-            CREATE OR REPLACE TABLE {self.database_table_name} AS
             SELECT *
             FROM read_csv('{self.filepath}',
                             auto_detect=true,
                             delim='{delimiter}',
                             header=true,
                             null_padding=true,
-                            all_varchar=True);
+                            {self._compression_option()}
+                            {self._types_option(schema)})
             """
 
-    def select_from_duckdb_table(self):
-        """Query to select from a DuckDB table."""
-        return f"SELECT * FROM {self.database_table_name}"
+    def read_csv_files_query(self, filepaths, delimiter, schema=None):
+        """Query to select from several CSV files sharing a delimiter as one dataset.
 
-    def export_csv_query(self, out_filename=None):
-        """Query to export a DuckDB table to a CSV file.
+        Columns are matched by name and a filename column records each row's source.
 
         Args:
-            out_filename (str, optional): The name of the output file.
+            filepaths (list): Paths to the files.
+            delimiter str: The delimiter to use.
+            schema (dict, optional): Column names mapped to DuckDB type names.
         """
-        filename = self._set_out_filename(self.export_properties.CSV_OUT_FILENAME, out_filename)
-        return f"COPY {self.database_table_name} TO '{filename}' (HEADER, DELIMITER ',');"
+        files = ", ".join(f"""'{filepath}'""" for filepath in filepaths)
+        return f"""
+            SELECT *
+            FROM read_csv([{files}],
+                            auto_detect=true,
+                            delim='{delimiter}',
+                            header=true,
+                            null_padding=true,
+                            filename=true,
+                            union_by_name=true,
+                            {self._types_option(schema)})
+            """
 
-    def export_excel_query(self, out_filename=None):
-        """Query to export a DuckDB table to an Excel file.
+    def create_table_query(self, source_query):
+        """Query to materialize a source query into the DuckDB table.
 
         Args:
-            out_filename (str, optional): The name of the output file.
+            source_query (str): Query whose results fill the table.
         """
-        filename = self._set_out_filename(self.export_properties.EXCEL_OUT_FILENAME, out_filename)
         return f"""
-            INSTALL spatial;
-            LOAD spatial;
-            COPY (SELECT * FROM {self.database_table_name})
-            TO '{filename}'(FORMAT GDAL, DRIVER 'xlsx')
+            CREATE OR REPLACE TABLE {self.database_table_name} AS
+            {source_query};
+            """
+
+    def append_table_query(self, source_query):
+        """Query to append the results of a source query to the DuckDB table by column name.
+
+        Args:
+            source_query (str): Query whose results are appended.
+        """
+        return f"""
+            INSERT INTO {self.database_table_name} BY NAME
+            {source_query};
+            """
+
+    def create_view_query(self, source_query):
+        """Query to register a source query as a DuckDB view that is evaluated on use.
+
+        Args:
+            source_query (str): Query the view selects from.
+        """
+        return f"""
+            CREATE OR REPLACE VIEW {self.database_table_name} AS
+            {source_query};
+            """
+
+    def relation_type_query(self):
+        """Query returning whether the table name holds a 'BASE TABLE' or a 'VIEW'."""
+        return f"""
+            SELECT table_type
+            FROM information_schema.tables
+            WHERE lower(table_name) = lower('{self.database_table_name}')
+            """
+
+    def drop_relation_query(self, relation_type):
+        """Query to drop the table or view holding the table name.
+
+        Args:
+            relation_type (str): Either 'BASE TABLE' or 'VIEW'.
         """
+        kind = 'VIEW' if relation_type == 'VIEW' else 'TABLE'
+        return f"DROP {kind} IF EXISTS {self.database_table_name}"
+
+    def import_csv_query(self, delimiter, schema=None):
+        """Query to import a CSV file into a DuckDB table.
 
-    def export_json_query(self, out_filename=None):
+        Args:
+            delimiter str: The delimiter to use.
+            schema (dict, optional): Column names mapped to DuckDB type names.
+        """
+        return self.create_table_query(self.read_csv_query(delimiter, schema))
+
+    def select_from_duckdb_table(self):
+        """Query to select from a DuckDB table."""
+        return f"SELECT * FROM {self.database_table_name}"
+
+    def _set_source_query(self, source_query=None):
+        """Evaluate if a source query is passed in and if not, select from the DuckDB table."""
+        if source_query:
+            query = source_query
+        else:
+            query = self.select_from_duckdb_table()
+        return query
+
+    def export_csv_query(self, out_filename=None, source_query=None):
+        """Query to export a DuckDB table to a CSV file.
+
+        Args:
+            out_filename (str, optional): The name of the output file.
+            source_query (str, optional): Query to copy from instead of the DuckDB table.
+        """
+        filename = self._set_out_filename(self.export_properties.CSV_OUT_FILENAME, out_filename)
+        source = self._set_source_query(source_query)
+        return f"COPY ({source}) TO '{filename}' (HEADER, DELIMITER ',');"
+
+    def export_json_query(self, out_filename=None, source_query=None):
         """Query to export a DuckDB table to a JSON file.
 
         Args:
             out_filename (str, optional): The name of the output file.
+            source_query (str, optional): Query to copy from instead of the DuckDB table.
         """
         filename = self._set_out_filename(self.export_properties.JSON_OUT_FILENAME, out_filename)
-        return f"COPY (SELECT * FROM {self.database_table_name}) TO '{filename}' (ARRAY true) "
+        source = self._set_source_query(source_query)
+        return f"COPY ({source}) TO '{filename}' (ARRAY true) "
 
-    def export_json_newline_delimited_query(self, out_filename=None):
+    def export_json_newline_delimited_query(self, out_filename=None, source_query=None):
         """Query to export a DuckDB table to a JSON file with newline delimited.
 
         Args:
             out_filename (str, optional): The name of the output file.
+            source_query (str, optional): Query to copy from instead of the DuckDB table.
         """
         filename = self._set_out_filename(self.export_properties.JSON_NEWLINE_OUT_FILENAME,
                                           out_filename)
-        return f"COPY (SELECT * FROM {self.database_table_name}) TO '{filename}'"
+        source = self._set_source_query(source_query)
+        return f"COPY ({source}) TO '{filename}'"
 
-    def export_parquet_query(self, out_filename=None):
+    def _parquet_options(self, partition_by=None, row_group_size=None, compression=None,
+                         compression_level=None, max_file_size=None):
+        """Return the COPY options for a Parquet export.
+
+        Partitioned or size-capped exports write a directory, which is overwritten
+        like a single output file would be.
+        """
+        options = ['FORMAT PARQUET']
+        columns = ParquetDatasetWriter.to_column_list(partition_by)
+        if columns:
+            quoted_columns = ', '.join(f'"{column}"' for column in columns)
+            options.append(f'PARTITION_BY ({quoted_columns})')
+        if row_group_size:
+            options.append(f'ROW_GROUP_SIZE {int(row_group_size)}')
+        if compression:
+            options.append(f'COMPRESSION {compression}')
+        if compression_level is not None:
+            options.append(f'COMPRESSION_LEVEL {int(compression_level)}')
+        if max_file_size:
+            options.append(f'FILE_SIZE_BYTES {int(max_file_size)}')
+        if columns or max_file_size:
+            options.append('OVERWRITE true')
+        return ', '.join(options)
+
+    def export_parquet_query(self, out_filename=None, source_query=None, partition_by=None,
+                             row_group_size=None, compression=None, compression_level=None,
+                             max_file_size=None):
         """Query to export a DuckDB table to a Parquet file.
 
         Args:
-            out_filename (str, optional): The name of the output file.
+            out_filename (str, optional): The name of the output file, or the output
+                directory when partitioning or capping the file size.
+            source_query (str, optional): Query to copy from instead of the DuckDB table.
+            partition_by (str or list, optional): Columns to Hive-partition the output by.
+            row_group_size (int, optional): Number of rows per row group.
+            compression (str, optional): Compression codec, such as 'zstd' or 'snappy'.
+            compression_level (int, optional): Compression level of the codec.
+            max_file_size (int, optional): Target maximum size of each file in bytes.
         """
         filename = self._set_out_filename(self.export_properties.PARQUET_OUT_FILENAME, out_filename)
-        return f"COPY (SELECT * FROM {self.database_table_name}) TO '{filename}'(FORMAT PARQUET)"
+        source = self._set_source_query(source_query)
+        options = self._parquet_options(partition_by, row_group_size, compression,
+                                        compression_level, max_file_size)
+        return f"COPY ({source}) TO '{filename}'({options})"
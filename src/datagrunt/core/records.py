@@ -0,0 +1,510 @@
+"""Module for locating CSV record boundaries at the byte level."""
+
+# standard library
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import io
+import math
+import os
+from pathlib import Path
+import tempfile
+import threading
+
+# third party libraries
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# local libraries
+from .compression import Compression
+from .encoding import Encoding
+
+class RecordScanner:
+    """Class to count CSV records by scanning memory-mapped chunks in parallel.
+
+    A newline only ends a record when it sits outside a quoted field. Each chunk
+    is scanned with vectorized PyArrow kernels, which release the GIL, and
+    reports its quote count plus its record count for both possible quote states
+    at the start of the chunk. Stitching the chunks together in order resolves
+    the real quote state at every chunk boundary.
+    """
+
+    CHUNK_SIZE = 8 * 1024 * 1024
+    COPY_BUFFER_BYTES = 1024 * 1024
+    BOUNDARY_SEARCH_BYTES = 64 * 1024
+    ESTIMATE_SAMPLE_BYTES = 1024 * 1024
+    ESTIMATE_PREFIX_GROWTH = 4
+    # small reads lose little decoded data when a prefix ends mid-stream
+    DECODE_READ_BYTES = 16 * 1024
+    DEFAULT_QUOTECHAR = '"'
+    SPLIT_SIZE_MESSAGE = 'Pass a positive n_chunks or target_bytes to split the file by.'
+    COMPRESSED_OFFSETS_MESSAGE = ("Byte offsets of compressed file '{filepath}' do not map to "
+                                  "records. Decompress it to use byte ranges.")
+    ENCODED_OFFSETS_MESSAGE = ("Byte offsets of '{filepath}' do not map to records in its "
+                               "{encoding} encoding. Transcode it to UTF-8 to use byte ranges.")
+    # uint8 scalars keep comparisons on the raw bytes instead of upcasting the chunk
+    NEWLINE = pa.scalar(ord('\n'), pa.uint8())
+
+    # record counts of the most recently counted file versions
+    CACHE_MAX_ENTRIES = 1024
+
+    _cache = OrderedDict()
+    _cache_lock = threading.Lock()
+
+    def __init__(self, filepath, quotechar=None, threads=None, encoding=None):
+        """
+        Initialize the RecordScanner class.
+
+        Args:
+            filepath (str): Path to the file to scan.
+            quotechar (str, optional): Quote character of the CSV file.
+            threads (int, optional): Number of threads to scan with.
+                Defaults to the number of CPUs.
+            encoding (str, optional): Character encoding of the file. UTF-8 when omitted.
+        """
+        self.filepath = filepath
+        self.quotechar = quotechar or self.DEFAULT_QUOTECHAR
+        self._quote_byte = pa.scalar(ord(self.quotechar), pa.uint8())
+        self.threads = threads or os.cpu_count() or 1
+        self.size_in_bytes = os.path.getsize(filepath)
+        self.encoding = encoding
+        self._compression = None
+        self._compression_detected = False
+
+    @property
+    def compression(self):
+        """Return the compression of the file, detected on first use."""
+        if not self._compression_detected:
+            self._compression = Compression.detect(self.filepath) if self.size_in_bytes else None
+            self._compression_detected = True
+        return self._compression
+
+    def _to_byte_array(self, buffer):
+        """Return a zero-copy uint8 array view of a buffer."""
+        return pa.Array.from_buffers(pa.uint8(), buffer.size, [None, buffer])
+
+    @property
+    def is_streamed(self):
+        """Check if records are only found in the decompressed UTF-8 stream of the file,
+        because it is compressed or newlines are not single bytes in its encoding."""
+        return bool(self.compression) or not Encoding.is_ascii_compatible(self.encoding)
+
+    def _check_byte_offsets(self):
+        """Raise an error if the byte offsets of the file do not map to records."""
+        if self.compression:
+            raise ValueError(self.COMPRESSED_OFFSETS_MESSAGE.format(filepath=self.filepath))
+        if self.is_streamed:
+            raise ValueError(self.ENCODED_OFFSETS_MESSAGE.format(filepath=self.filepath,
+                                                                 encoding=self.encoding))
+
+    def _scan_chunk(self, buffer):
+        """Count quotes and record-ending newlines in a chunk.
+
+        Args:
+            buffer (pyarrow.Buffer): The bytes of the chunk.
+
+        Returns:
+            tuple: The quote count, then the number of newlines outside quotes if
+            the chunk starts outside a quoted field and if it starts inside one.
+        """
+        byte_array = self._to_byte_array(buffer)
+        newlines = pc.equal(byte_array, self.NEWLINE)
+        quotes = pc.equal(byte_array, self._quote_byte)
+        quote_count = pc.sum(quotes).as_py() or 0
+        newline_count = pc.sum(newlines).as_py() or 0
+        if quote_count == 0:
+            return 0, newline_count, 0
+        # odd parity means an odd number of quotes precede the byte in this chunk
+        parity = pc.bit_wise_and(pc.cumulative_sum(pc.cast(quotes, pa.int32())), 1)
+        outside_if_even = pc.sum(pc.and_(newlines, pc.equal(parity, 0))).as_py() or 0
+        return quote_count, outside_if_even, newline_count - outside_if_even
+
+    def _chunk_offsets(self):
+        """Return the (start, length) of every chunk in the file."""
+        return [(start, min(self.CHUNK_SIZE, self.size_in_bytes - start))
+                for start in range(0, self.size_in_bytes, self.CHUNK_SIZE)]
+
+    def scan_chunks(self):
+        """Scan every chunk of the file in parallel.
+
+        Returns:
+            list: One (start, length, quote_count, if_outside, if_inside) tuple per
+            chunk, in file order.
+        """
+        with pa.memory_map(str(self.filepath), 'r') as source:
+            data = source.read_buffer()
+            offsets = self._chunk_offsets()
+
+            def scan(offset):
+                start, length = offset
+                return (start, length) + self._scan_chunk(data.slice(start, length))
+
+            if len(offsets) <= 1 or self.threads == 1:
+                return [scan(offset) for offset in offsets]
+            with ThreadPoolExecutor(max_workers=self.threads) as executor:
+                return list(executor.map(scan, offsets))
+
+    def _ends_with_newline(self):
+        """Check if the last byte of the file is a newline."""
+        with open(self.filepath, 'rb') as csv_file:
+            csv_file.seek(-1, os.SEEK_END)
+            return csv_file.read(1) == b'\n'
+
+    def _chunk_quote_states(self):
+        """Return whether each chunk of the file starts inside a quoted field."""
+        states = []
+        inside_quotes = False
+        for _, _, quote_count, _, _ in self.scan_chunks():
+            states.append(inside_quotes)
+            if quote_count % 2:
+                inside_quotes = not inside_quotes
+        return states
+
+    def _next_record_start(self, data, offset, inside_quotes=False):
+        """Return the first record boundary at or after an offset.
+
+        Only the quotes between the start of the offset's chunk and the offset are
+        counted. The search itself scans windows that double in size from the
+        offset, since a boundary is usually a few bytes away.
+
+        Args:
+            data (pyarrow.Buffer): The bytes of the whole file.
+            offset (int): Byte offset to search from.
+            inside_quotes (bool): Whether the chunk holding the offset starts
+                inside a quoted field.
+
+        Returns:
+            int: The offset just past a record-ending newline, or the file size.
+        """
+        # a boundary at the offset itself ends in the byte before it
+        position = max(offset - 1, 0)
+        chunk_start = position - position % self.CHUNK_SIZE
+        if position > chunk_start:
+            prefix = self._to_byte_array(data.slice(chunk_start, position - chunk_start))
+            if (pc.sum(pc.equal(prefix, self._quote_byte)).as_py() or 0) % 2:
+                inside_quotes = not inside_quotes
+        window = self.BOUNDARY_SEARCH_BYTES
+        while position < self.size_in_bytes:
+            length = min(window, self.size_in_bytes - position)
+            byte_array = self._to_byte_array(data.slice(position, length))
+            record_ends = pc.equal(byte_array, self.NEWLINE)
+            quotes = pc.equal(byte_array, self._quote_byte)
+            quote_count = pc.sum(quotes).as_py() or 0
+            if quote_count:
+                parity = pc.bit_wise_and(pc.cumulative_sum(pc.cast(quotes, pa.int32())), 1)
+                outside = pc.equal(parity, 1 if inside_quotes else 0)
+                record_ends = pc.and_(record_ends, outside)
+            if quote_count or not inside_quotes:
+                index = pc.index(record_ends, True).as_py()
+                if index >= 0:
+                    return position + index + 1
+            if quote_count % 2:
+                inside_quotes = not inside_quotes
+            position += length
+            window = min(window * 2, self.CHUNK_SIZE)
+        return self.size_in_bytes
+
+    def header_end(self):
+        """Return the byte offset just past the header record."""
+        self._check_byte_offsets()
+        if self.size_in_bytes == 0:
+            return 0
+        with pa.memory_map(str(self.filepath), 'r') as source:
+            return self._next_record_start(source.read_buffer(), 1)
+
+    def split(self, n_chunks=None, target_bytes=None):
+        """Split the records after the header into byte ranges on record boundaries.
+
+        Every range starts just after a record-ending newline, which may not sit
+        inside a quoted field, so each range holds whole records and the ranges
+        together hold every record exactly once.
+
+        Args:
+            n_chunks (int, optional): Number of ranges of about equal size.
+            target_bytes (int, optional): Approximate size of each range in bytes.
+                Used when n_chunks is omitted.
+
+        Returns:
+            list: One (start, end) byte offset tuple per range, in file order.
+        """
+        self._check_byte_offsets()
+        data_start = self.header_end()
+        data_bytes = self.size_in_bytes - data_start
+        if data_bytes <= 0:
+            return []
+        if n_chunks:
+            target_bytes = math.ceil(data_bytes / n_chunks)
+        if not target_bytes or target_bytes <= 0:
+            raise ValueError(self.SPLIT_SIZE_MESSAGE)
+        chunk_states = self._chunk_quote_states()
+        boundaries = [data_start]
+        with pa.memory_map(str(self.filepath), 'r') as source:
+            data = source.read_buffer()
+            # cut on a fixed grid so ranges do not drift when records are long
+            for cut in range(data_start + target_bytes, self.size_in_bytes, target_bytes):
+                if cut <= boundaries[-1]:
+                    continue
+                chunk_index = (cut - 1) // self.CHUNK_SIZE
+                boundary = self._next_record_start(data, cut, chunk_states[chunk_index])
+                if boundary >= self.size_in_bytes:
+                    break
+                boundaries.append(boundary)
+        boundaries.append(self.size_in_bytes)
+        return list(zip(boundaries[:-1], boundaries[1:]))
+
+    def read_range(self, start, end):
+        """Return the header followed by the records in a byte range.
+
+        Args:
+            start (int): Byte offset of a record boundary.
+            end (int): Byte offset of a later record boundary.
+
+        Returns:
+            bytes: A CSV document with the header and the records of the range.
+        """
+        self._check_byte_offsets()
+        header_end = self.header_end() if start > 0 else 0
+        with open(self.filepath, 'rb') as csv_file:
+            header = csv_file.read(header_end)
+            csv_file.seek(start)
+            return header + csv_file.read(end - start)
+
+    @contextmanager
+    def range_file(self, start, end, header=None):
+        """Context manager copying the header and a byte range to a temporary CSV file.
+
+        Args:
+            start (int): Byte offset of a record boundary.
+            end (int): Byte offset of a later record boundary.
+            header (bytes, optional): The header record. Read from the file when omitted.
+
+        Yields:
+            str: Path of the temporary CSV file, removed on exit, or of the file
+            itself when the range covers all of it.
+        """
+        self._check_byte_offsets()
+        if start == 0 and end == self.size_in_bytes:
+            yield str(self.filepath)
+            return
+        if header is None and start > 0:
+            with open(self.filepath, 'rb') as csv_file:
+                header = csv_file.read(self.header_end())
+        with tempfile.TemporaryDirectory() as temp_dir:
+            range_path = os.path.join(temp_dir, Path(self.filepath).name)
+            with open(self.filepath, 'rb') as source, open(range_path, 'wb') as target:
+                if start > 0:
+                    target.write(header)
+                source.seek(start)
+                remaining = end - start
+                while remaining > 0:
+                    chunk = source.read(min(self.COPY_BUFFER_BYTES, remaining))
+                    if not chunk:
+                        break
+                    target.write(chunk)
+                    remaining -= len(chunk)
+            yield range_path
+
+    def _record_end_positions(self, buffer):
+        """Return the positions of the record-ending newlines of a buffer starting
+        outside a quoted field."""
+        byte_array = self._to_byte_array(buffer)
+        record_ends = pc.equal(byte_array, self.NEWLINE)
+        quotes = pc.equal(byte_array, self._quote_byte)
+        if pc.any(quotes).as_py():
+            parity = pc.bit_wise_and(pc.cumulative_sum(pc.cast(quotes, pa.int32())), 1)
+            record_ends = pc.and_(record_ends, pc.equal(parity, 0))
+        return pc.indices_nonzero(record_ends)
+
+    def iter_record_blocks(self, block_bytes=None):
+        """Stream the file, decompressed and transcoded to UTF-8, as CSV documents of
+        whole records.
+
+        Args:
+            block_bytes (int, optional): Number of bytes to read at a time.
+                Defaults to CHUNK_SIZE.
+
+        Yields:
+            bytes: The header followed by the whole records of each block.
+        """
+        block_bytes = block_bytes or self.CHUNK_SIZE
+        header = None
+        pending = b''
+        with Encoding.open(self.filepath, self.encoding, self.compression) as stream:
+            chunk = stream.read(block_bytes)
+            while chunk:
+                # pending always starts on a record boundary, outside quotes
+                data = pending + chunk
+                positions = self._record_end_positions(pa.py_buffer(data))
+                if len(positions):
+                    end = positions[-1].as_py() + 1
+                    records, pending = data[:end], data[end:]
+                    if header is None:
+                        header_end = positions[0].as_py() + 1
+                        header, records = records[:header_end], records[header_end:]
+                    if records:
+                        yield header + records
+                else:
+                    pending = data
+                chunk = stream.read(block_bytes)
+        if header is not None and pending:
+            yield header + pending
+
+    def _count_streamed_records(self):
+        """Count records by scanning the decompressed UTF-8 stream chunk by chunk."""
+        records = 0
+        inside_quotes = False
+        last_byte = b''
+        with Encoding.open(self.filepath, self.encoding, self.compression) as stream:
+            chunk = stream.read(self.CHUNK_SIZE)
+            while chunk:
+                quote_count, if_outside, if_inside = self._scan_chunk(pa.py_buffer(chunk))
+                records += if_inside if inside_quotes else if_outside
+                if quote_count % 2:
+                    inside_quotes = not inside_quotes
+                last_byte = chunk[-1:]
+                chunk = stream.read(self.CHUNK_SIZE)
+        if last_byte and last_byte != b'\n':
+            records += 1
+        return records
+
+    def _count_records(self):
+        """Count records by stitching the per-chunk scans together."""
+        if self.size_in_bytes == 0:
+            return 0
+        if self.is_streamed:
+            return self._count_streamed_records()
+        records = 0
+        inside_quotes = False
+        for _, _, quote_count, if_outside, if_inside in self.scan_chunks():
+            records += if_inside if inside_quotes else if_outside
+            if quote_count % 2:
+                inside_quotes = not inside_quotes
+        if not self._ends_with_newline():
+            records += 1
+        return records
+
+    def count_records(self, fingerprint=None):
+        """Count the records in the file, including the header.
+
+        Args:
+            fingerprint (tuple, optional): File fingerprint to cache the result under.
+
+        Returns:
+            int: The number of records.
+        """
+        cache_key = (fingerprint, self.quotechar) if fingerprint else None
+        if cache_key:
+            with self._cache_lock:
+                if cache_key in self._cache:
+                    self._cache.move_to_end(cache_key)
+                    return self._cache[cache_key]
+        records = self._count_records()
+        if cache_key:
+            with self._cache_lock:
+                self._cache[cache_key] = records
+                self._cache.move_to_end(cache_key)
+                while len(self._cache) > self.CACHE_MAX_ENTRIES:
+                    self._cache.popitem(last=False)
+        return records
+
+    def complete_records_end(self, start=0):
+        """Find the end of the last newline-terminated record after a record boundary.
+
+        Chunks are scanned in order from start, carrying the quote state across
+        chunk boundaries. A record still being appended, without its newline, is
+        left out.
+
+        Args:
+            start (int): Byte offset of a record boundary to scan from.
+
+        Returns:
+            tuple: The byte offset just past the last complete record, or start if
+            there is none, and the number of complete records after start.
+        """
+        self._check_byte_offsets()
+        end, records = start, 0
+        if start >= self.size_in_bytes:
+            return end, records
+        inside_quotes = False
+        with pa.memory_map(str(self.filepath), 'r') as source:
+            data = source.read_buffer()
+            for chunk_start in range(start, self.size_in_bytes, self.CHUNK_SIZE):
+                length = min(self.CHUNK_SIZE, self.size_in_bytes - chunk_start)
+                byte_array = self._to_byte_array(data.slice(chunk_start, length))
+                record_ends = pc.equal(byte_array, self.NEWLINE)
+                quotes = pc.equal(byte_array, self._quote_byte)
+                quote_count = pc.sum(quotes).as_py() or 0
+                if quote_count:
+                    parity = pc.bit_wise_and(pc.cumulative_sum(pc.cast(quotes, pa.int32())), 1)
+                    outside = pc.equal(parity, 1 if inside_quotes else 0)
+                    record_ends = pc.and_(record_ends, outside)
+                elif inside_quotes:
+                    continue
+                positions = pc.indices_nonzero(record_ends)
+                if len(positions):
+                    end = chunk_start + positions[-1].as_py() + 1
+                    records += len(positions)
+                if quote_count % 2:
+                    inside_quotes = not inside_quotes
+        return end, records
+
+    def _decode_prefix(self, prefix):
+        """Return the decompressed UTF-8 bytes of a prefix of the file, up to where
+        decoding stops at the end of the prefix."""
+        chunks = []
+        with Encoding.open(io.BytesIO(prefix), self.encoding, self.compression) as stream:
+            try:
+                for chunk in iter(lambda: stream.read(self.DECODE_READ_BYTES), b''):
+                    chunks.append(chunk)
+            except (EOFError, OSError, ValueError):
+                pass  # the prefix ends in the middle of the stream
+        return b''.join(chunks)
+
+    def _estimate_streamed_records(self):
+        """Estimate the records in a compressed or transcoded file from a sample of its
+        decompressed UTF-8 stream, scaled by the share of the file it came from.
+
+        Prefixes of the file are decoded in memory, growing until they yield a full
+        sample, so the ratio of decoded to file bytes is exact and the sample stays
+        bounded however well the file compresses.
+        """
+        prefix_bytes = self.ESTIMATE_SAMPLE_BYTES // self.ESTIMATE_PREFIX_GROWTH ** 2
+        with open(self.filepath, 'rb') as raw_file:
+            while True:
+                raw_file.seek(0)
+                prefix = raw_file.read(prefix_bytes)
+                sample = self._decode_prefix(prefix)
+                if len(sample) >= self.ESTIMATE_SAMPLE_BYTES or len(prefix) == self.size_in_bytes:
+                    break
+                prefix_bytes *= self.ESTIMATE_PREFIX_GROWTH
+        _, sample_records, _ = self._scan_chunk(pa.py_buffer(sample))
+        if len(prefix) == self.size_in_bytes:
+            return sample_records + (1 if sample and not sample.endswith(b'\n') else 0)
+        if sample_records == 0:
+            return 1
+        sample_bytes = sample.rfind(b'\n') + 1
+        return round(self.size_in_bytes / len(prefix) * len(sample)
+                     * sample_records / sample_bytes)
+
+    def estimate_records(self):
+        """Estimate the records in the file from the bytes per record of a sample.
+
+        Compressed and transcoded files are sampled from their decompressed UTF-8
+        stream, so the estimate never reads the whole file either.
+
+        Returns:
+            int: The estimated number of records, including the header.
+        """
+        if self.size_in_bytes == 0:
+            return 0
+        if self.is_streamed:
+            return self._estimate_streamed_records()
+        if self.size_in_bytes <= self.ESTIMATE_SAMPLE_BYTES:
+            return self.count_records()
+        with open(self.filepath, 'rb') as csv_file:
+            sample = csv_file.read(self.ESTIMATE_SAMPLE_BYTES)
+        _, sample_records, _ = self._scan_chunk(pa.py_buffer(sample))
+        if sample_records == 0:
+            return 1
+        sample_bytes = sample.rfind(b'\n') + 1
+        return round(self.size_in_bytes * sample_records / sample_bytes)
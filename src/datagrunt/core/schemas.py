@@ -0,0 +1,255 @@
+"""Module for inferring typed CSV schemas shared by the reader and writer engines."""
+
+# standard library
+from contextlib import contextmanager
+import os
+from pathlib import Path
+import tempfile
+
+# third party libraries
+import polars as pl
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# local libraries
+from .compression import Compression
+from .databases import DuckDBSession
+from .encoding import Encoding
+from .records import RecordScanner
+
+class SchemaInference:
+    """Class to infer column types from a sample of a CSV file.
+
+    Types are sniffed once by DuckDB from a bounded row sample and expressed as
+    DuckDB type names, which every engine understands: DuckDB uses them directly
+    and Polars and PyArrow map them onto their own data types. Polars and PyArrow
+    only parse ISO 8601 dates and timestamps themselves, so they read DATE and
+    TIMESTAMP columns as text and parse them with the format DuckDB sniffed.
+    """
+
+    DEFAULT_SAMPLE_SIZE = 20_480
+    STREAMED_SAMPLE_BYTES = 16 * 1024 * 1024
+    POLARS_TYPES = {
+        'BOOLEAN': pl.Boolean,
+        'TINYINT': pl.Int8,
+        'SMALLINT': pl.Int16,
+        'INTEGER': pl.Int32,
+        'BIGINT': pl.Int64,
+        'UTINYINT': pl.UInt8,
+        'USMALLINT': pl.UInt16,
+        'UINTEGER': pl.UInt32,
+        'UBIGINT': pl.UInt64,
+        'FLOAT': pl.Float32,
+        'DOUBLE': pl.Float64,
+        'DECIMAL': pl.Float64,
+        'DATE': pl.Date,
+        'TIME': pl.Time,
+        'TIMESTAMP': pl.Datetime('us'),
+        'TIMESTAMP WITH TIME ZONE': pl.Datetime('us', 'UTC'),
+        'VARCHAR': pl.Utf8,
+    }
+    TEMPORAL_TYPES = ['DATE', 'TIMESTAMP']
+    TEMPORAL_FORMAT_COLUMNS = ['DateFormat', 'TimestampFormat']
+    UNSUPPORTED_TYPE_MESSAGE = "Column '{column}' has type '{dtype}', which has no Polars equivalent."
+    UNKNOWN_COLUMN_MESSAGE = "Type overrides reference columns not in the CSV file: {columns}."
+
+    def __init__(self, filepath, delimiter, sample_size=DEFAULT_SAMPLE_SIZE, compression=None,
+                 encoding=None):
+        """
+        Initialize the SchemaInference class.
+
+        Args:
+            filepath (str): Path to the CSV file.
+            delimiter (str): The delimiter of the CSV file.
+            sample_size (int): Number of rows to sample when sniffing types.
+            compression (str, optional): Compression of the file.
+            encoding (str, optional): Character encoding of the file. UTF-8 when omitted.
+        """
+        self.filepath = filepath
+        self.delimiter = delimiter
+        self.sample_size = sample_size
+        self.compression = compression
+        self.encoding = encoding
+
+    @contextmanager
+    def _streamed_sample(self):
+        """Context manager writing the whole records of a decompressed UTF-8 sample to a
+        temporary file."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            sample_path = os.path.join(temp_dir, Path(self.filepath).stem)
+            with Encoding.open(self.filepath, self.encoding, self.compression) as source:
+                sample = source.read(self.STREAMED_SAMPLE_BYTES)
+            with open(sample_path, 'wb') as target:
+                target.write(sample)
+            end, _ = RecordScanner(sample_path).complete_records_end()
+            if 0 < end < len(sample):
+                os.truncate(sample_path, end)
+            yield sample_path
+
+    def _read_sample(self, filepath, compression=None):
+        """Return a DuckDB relation sniffing the types of a CSV file."""
+        options = {'compression': compression} if compression else {}
+        return DuckDBSession.connect().read_csv(str(filepath),
+                                                delimiter=self.delimiter,
+                                                header=True,
+                                                null_padding=True,
+                                                sample_size=self.sample_size,
+                                                **options
+                                                )
+
+    def _sniff_formats(self, filepath, compression=None):
+        """Return the date and timestamp formats DuckDB sniffs from a CSV file."""
+        option = f", compression='{compression}'" if compression else ''
+        query = f"""
+            SELECT {', '.join(self.TEMPORAL_FORMAT_COLUMNS)}
+            FROM sniff_csv(?, delim=?, header=true, null_padding=true, sample_size=?{option})
+            """
+        row = DuckDBSession.connect().execute(query, [str(filepath), self.delimiter,
+                                                      self.sample_size]).fetchone()
+        return dict(zip(self.TEMPORAL_TYPES, row))
+
+    def _is_streamed(self):
+        """Check if DuckDB sniffs a decompressed UTF-8 sample instead of the file."""
+        return ((self.compression and self.compression not in Compression.NATIVE_COMPRESSIONS)
+                or not Encoding.is_native(self.encoding))
+
+    def infer_formats(self):
+        """Infer the formats of date and timestamp columns from a sample of the file.
+
+        Returns:
+            dict: 'DATE' and 'TIMESTAMP' mapped to the strptime format DuckDB
+            detected for them, or None when it detected none.
+        """
+        if self._is_streamed():
+            with self._streamed_sample() as sample_path:
+                return self._sniff_formats(sample_path)
+        return self._sniff_formats(self.filepath, self.compression)
+
+    def infer(self):
+        """Infer the column types from a sample of the file.
+
+        DuckDB decompresses gzip and zstd files itself. Other compressed files, and
+        files not encoded in UTF-8, are sniffed from a decompressed UTF-8 sample of
+        their first records.
+
+        Returns:
+            dict: Column names mapped to DuckDB type names.
+        """
+        if self._is_streamed():
+            with self._streamed_sample() as sample_path:
+                relation = self._read_sample(sample_path)
+                return {column: str(dtype)
+                        for column, dtype in zip(relation.columns, relation.types)}
+        relation = self._read_sample(self.filepath, self.compression)
+        return {column: str(dtype) for column, dtype in zip(relation.columns, relation.types)}
+
+    @classmethod
+    def apply_overrides(cls, schema, overrides=None):
+        """Apply per-column type overrides to a schema.
+
+        Args:
+            schema (dict): Column names mapped to DuckDB type names.
+            overrides (dict, optional): Column names mapped to DuckDB type names.
+
+        Returns:
+            dict: The schema with the overrides applied, in column order.
+        """
+        overrides = {column: dtype.upper() for column, dtype in (overrides or {}).items()}
+        unknown_columns = [column for column in overrides if column not in schema]
+        if unknown_columns:
+            raise ValueError(cls.UNKNOWN_COLUMN_MESSAGE.format(columns=unknown_columns))
+        return {column: overrides.get(column, dtype) for column, dtype in schema.items()}
+
+    @classmethod
+    def to_polars_schema(cls, schema):
+        """Map a schema of DuckDB type names onto Polars data types.
+
+        Args:
+            schema (dict): Column names mapped to DuckDB type names.
+
+        Returns:
+            dict: Column names mapped to Polars data types.
+        """
+        polars_schema = {}
+        for column, dtype in schema.items():
+            base_type = dtype.split('(')[0].strip()
+            if base_type not in cls.POLARS_TYPES:
+                raise ValueError(cls.UNSUPPORTED_TYPE_MESSAGE.format(column=column, dtype=dtype))
+            polars_schema[column] = cls.POLARS_TYPES[base_type]
+        return polars_schema
+
+    @classmethod
+    def to_arrow_schema(cls, schema):
+        """Map a schema of DuckDB type names onto PyArrow data types.
+
+        Args:
+            schema (dict): Column names mapped to DuckDB type names.
+
+        Returns:
+            dict: Column names mapped to PyArrow data types.
+        """
+        arrow_schema = pl.DataFrame(schema=cls.to_polars_schema(schema)).to_arrow().schema
+        return dict(zip(arrow_schema.names, arrow_schema.types))
+
+    @classmethod
+    def has_temporal_columns(cls, schema):
+        """Check if a schema has DATE or TIMESTAMP columns."""
+        return any(dtype.split('(')[0].strip() in cls.TEMPORAL_TYPES
+                   for dtype in (schema or {}).values())
+
+    @classmethod
+    def formatted_columns(cls, schema, formats):
+        """Return the DATE and TIMESTAMP columns of a schema that have a sniffed format.
+
+        Args:
+            schema (dict): Column names mapped to DuckDB type names.
+            formats (dict): 'DATE' and 'TIMESTAMP' mapped to strptime formats or None,
+                as returned by infer_formats.
+
+        Returns:
+            dict: Column names mapped to a (DuckDB type name, strptime format) tuple.
+        """
+        formats = formats or {}
+        formatted = {}
+        for column, dtype in (schema or {}).items():
+            base_type = dtype.split('(')[0].strip()
+            if formats.get(base_type):
+                formatted[column] = (base_type, formats[base_type])
+        return formatted
+
+    @classmethod
+    def to_polars_expressions(cls, formatted_columns):
+        """Return Polars expressions parsing text columns with their sniffed formats.
+
+        Args:
+            formatted_columns (dict): As returned by formatted_columns.
+
+        Returns:
+            list: One Polars expression per column.
+        """
+        return [pl.col(column).str.to_date(date_format) if base_type == 'DATE'
+                else pl.col(column).str.strptime(cls.POLARS_TYPES[base_type], date_format)
+                for column, (base_type, date_format) in formatted_columns.items()]
+
+    @classmethod
+    def parse_arrow_columns(cls, data, formatted_columns):
+        """Parse the text columns of a PyArrow table or record batch with their sniffed
+        formats.
+
+        Args:
+            data: A PyArrow Table or RecordBatch.
+            formatted_columns (dict): As returned by formatted_columns.
+
+        Returns:
+            The table or record batch with the columns parsed to dates and timestamps.
+        """
+        if not formatted_columns:
+            return data
+        columns = list(data.columns)
+        for column, (base_type, date_format) in formatted_columns.items():
+            index = data.schema.get_field_index(column)
+            if index < 0:
+                continue
+            parsed = pc.strptime(columns[index], format=date_format, unit='us')
+            columns[index] = parsed.cast(pa.date32()) if base_type == 'DATE' else parsed
+        return type(data).from_arrays(columns, names=data.schema.names)
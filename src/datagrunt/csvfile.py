@@ -1,48 +1,183 @@
 """Module for reading CSV files and converting CSV files to different standard file formats."""
 
 # standard library
+import os
+from pathlib import Path
 
 # third party libraries
-import duckdb
+import pyarrow as pa
 
 # local libraries
-from .core.fileproperties import CSVProperties
-from .core.engines import CSVReaderDuckDBEngine, CSVReaderPolarsEngine
-from .core.engines import CSVWriterDuckDBEngine, CSVWriterPolarsEngine
+from .core.databases import DuckDBSession
+from .core.encoding import Encoding
+from .core.fileproperties import CSVProperties, FileProperties
+from .core.engines import CSVReaderDuckDBEngine, CSVReaderPolarsEngine, CSVReaderPyArrowEngine
+from .core.engines import CSVWriterDuckDBEngine, CSVWriterPolarsEngine, CSVWriterPyArrowEngine
+from .core.filesets import CSVFileSet
+from .core.filesets import CSVFileSetReaderDuckDBEngine, CSVFileSetReaderPolarsEngine
+from .core.filesets import CSVFileSetWriterDuckDBEngine, CSVFileSetWriterPolarsEngine
+from .core.incremental import IncrementalState
+from .core.instrumentation import Instrumentation
+from .core.logger import show_engine_choice
+from .core.planner import EnginePlanner
 from .core.queries import DuckDBQueries
+from .core.records import RecordScanner
+from .core.schemas import SchemaInference
 
-class CSVReader(CSVProperties):
-    """Class to unify the interface for reading CSV files."""
+class CSVFile(CSVProperties):
+    """Base class of CSVReader and CSVWriter.
 
-    READER_ENGINES = ['duckdb', 'polars']
-    VALUE_ERROR_MESSAGE = """Reader engine '{engine}' is not 'duckdb' or 'polars'. Pass either 'duckdb' or 'polars' as valid engine params."""
+    Resolves a single file or a file set, validates the engine, infers the typed
+    schema and chooses the engine per operation when the engine is 'auto'.
+    """
 
-    def __init__(self, filepath, engine='polars'):
-        """Initialize the CSV Reader class.
+    ENGINES = ['duckdb', 'polars', 'pyarrow', 'auto']
+    VALUE_ERROR_MESSAGE = """Engine '{engine}' is not 'duckdb', 'polars', 'pyarrow' or 'auto'. Pass 'duckdb', 'polars', 'pyarrow' or 'auto' as valid engine params."""
+    PYARROW_FILE_SET_MESSAGE = "The 'pyarrow' engine reads a single file, not a file set."
+
+    def __init__(self, filepath, engine, typed=False, dtypes=None):
+        """Initialize the CSVFile class.
 
         Args:
-            filepath (str): Path to the file to read.
-            engine (str, default 'polars'): Determines which reader engine class to instantiate.
+            filepath (str or list): Path to the file, or a glob pattern or list of paths
+                to handle several files as one dataset. File properties then
+                describe the first file.
+            engine (str): One of ENGINES.
+            typed (bool, default False): Infer native column types from a sample
+                instead of reading every column as text.
+            dtypes (dict, optional): Column names mapped to DuckDB type names that
+                override the inferred types. Implies typed.
         """
+        self.filepaths = None
+        if CSVFileSet.is_file_set(filepath):
+            self.filepaths = CSVFileSet.expand_filepaths(filepath)
+            filepath = self.filepaths[0]
         super().__init__(filepath)
         self.db_table = DuckDBQueries(self.filepath).database_table_name
         self.engine = engine.lower().replace(' ', '')
-        if self.engine not in self.READER_ENGINES:
+        if self.engine not in self.ENGINES:
             raise ValueError(self.VALUE_ERROR_MESSAGE.format(engine=self.engine))
+        if self.engine == 'pyarrow' and self.is_file_set:
+            raise ValueError(self.PYARROW_FILE_SET_MESSAGE)
+        self.typed = typed or bool(dtypes)
+        self.dtypes = dtypes
+        self._schema = None
+        self.engine_choice = None
+
+    @property
+    def schema(self):
+        """Return the typed schema shared by the engines.
+
+        The schema is inferred once per instance. None when not in typed mode.
+        """
+        if self.typed and self._schema is None:
+            self._schema = SchemaInference.apply_overrides(self.inferred_schema, self.dtypes)
+        return self._schema
+
+    @property
+    def is_file_set(self):
+        """Check if several files are handled as one dataset."""
+        return self.filepaths is not None
+
+    def _input_size_in_bytes(self):
+        """Return the combined size of the input files in bytes."""
+        files = self.filepaths or [self.filepath]
+        return sum(os.path.getsize(filepath) for filepath in files)
+
+    def _choose_engine(self, operation=None):
+        """Return the engine for an operation, choosing one when the engine is 'auto'.
+
+        Args:
+            operation (str, optional): Name of the method the engine runs.
+        """
+        if self.engine != 'auto':
+            return self.engine
+        planner = EnginePlanner(self._input_size_in_bytes(), self.column_count,
+                                compression=self.compression)
+        self.engine_choice = planner.choose(operation)
+        show_engine_choice(self.engine_choice)
+        return self.engine_choice['engine']
+
+class CSVReader(CSVFile):
+    """Class to unify the interface for reading CSV files."""
+
+    READER_ENGINES = CSVFile.ENGINES
+    VALUE_ERROR_MESSAGE = """Reader engine '{engine}' is not 'duckdb', 'polars', 'pyarrow' or 'auto'. Pass 'duckdb', 'polars', 'pyarrow' or 'auto' as valid engine params."""
+    INCREMENTAL_FILE_SET_MESSAGE = 'Incremental reads take a single file, not a file set.'
+    SPLIT_FILE_SET_MESSAGE = 'Byte ranges split a single file, not a file set.'
+
+    def __init__(self, filepath, engine='polars', typed=False, dtypes=None):
+        """Initialize the CSV Reader class.
+
+        Args:
+            filepath (str or list): Path to the file to read, or a glob pattern or list
+                of paths to read several files as one dataset. File properties then
+                describe the first file.
+            engine (str, default 'polars'): Determines which reader engine class to instantiate.
+                'auto' chooses the engine per operation from the file size, column
+                count, available memory and the operation, and reports the choice.
+            typed (bool, default False): Infer native column types from a sample
+                instead of reading every column as text.
+            dtypes (dict, optional): Column names mapped to DuckDB type names that
+                override the inferred types. Implies typed.
+        """
+        super().__init__(filepath, engine, typed, dtypes)
 
-    def _set_reader_engine(self):
-        """Sets the CSV reader engine as either DuckDB or Polars.
+    def _set_reader_engine(self, engine_name=None, operation=None):
+        """Sets the CSV reader engine as DuckDB, Polars or PyArrow.
            Default engine is Polars.
+
+        Args:
+            engine_name (str, optional): Engine to use instead of the reader's engine.
+            operation (str, optional): Name of the method the engine runs.
         """
-        if self.engine != 'polars':
-            engine = CSVReaderDuckDBEngine(self.filepath)
+        engine_name = engine_name or self._choose_engine(operation)
+        if self.is_file_set:
+            if engine_name != 'polars':
+                engine = CSVFileSetReaderDuckDBEngine(self.filepaths, self.schema)
+            else:
+                engine = CSVFileSetReaderPolarsEngine(self.filepaths, self.schema)
+        elif engine_name == 'pyarrow':
+            engine = CSVReaderPyArrowEngine(self.filepath, self.schema)
+        elif engine_name != 'polars':
+            engine = CSVReaderDuckDBEngine(self.filepath, self.schema)
         else:
-            engine = CSVReaderPolarsEngine(self.filepath)
+            engine = CSVReaderPolarsEngine(self.filepath, self.schema)
         return engine
 
+    def _read(self, operation):
+        """Run a reader engine method inside an instrumented read stage.
+
+        Args:
+            operation (str): Name of the engine method, such as 'to_dataframe'.
+
+        Returns:
+            The result of the engine method.
+        """
+        engine = self._set_reader_engine(operation=operation)
+        with Instrumentation.stage('read', filepath=self.filepath, engine=engine.ENGINE_NAME,
+                                   operation=operation) as event:
+            result = getattr(engine, operation)()
+            if Instrumentation.is_enabled():
+                event['bytes_read'] = self._input_size_in_bytes()
+                event['rows'] = len(result)
+        return result
+
+    def _instrumented_batches(self, engine_name, batches, operation='iter_batches'):
+        """Yield batches inside a read stage that ends with the last batch."""
+        with Instrumentation.stage('read', filepath=self.filepath, engine=engine_name,
+                                   operation=operation) as event:
+            rows = 0
+            for batch in batches:
+                rows += len(batch)
+                yield batch
+            if Instrumentation.is_enabled():
+                event['bytes_read'] = self._input_size_in_bytes()
+                event['rows'] = rows
+
     def get_sample(self):
         """Return a sample of the CSV file."""
-        self._set_reader_engine().get_sample()
+        self._set_reader_engine(operation='get_sample').get_sample()
 
     def to_dataframe(self):
         """Converts CSV to a Polars dataframe.
@@ -50,7 +185,7 @@ class CSVReader(CSVProperties):
         Returns:
             A Polars dataframe.
         """
-        return self._set_reader_engine().to_dataframe()
+        return self._read('to_dataframe')
 
     def to_arrow_table(self):
         """Converts CSV to a Polars dataframe.
@@ -58,7 +193,7 @@ class CSVReader(CSVProperties):
         Returns:
             A PyArrow table.
         """
-        return self._set_reader_engine().to_arrow_table()
+        return self._read('to_arrow_table')
 
     def to_dicts(self):
         """Converts CSV to a Polars dataframe.
@@ -66,13 +201,178 @@ class CSVReader(CSVProperties):
         Returns:
             A list of dictionaries.
         """
-        return self._set_reader_engine().to_dicts()
+        return self._read('to_dicts')
+
+    def to_lazyframe(self):
+        """Converts CSV to a Polars lazyframe using the Polars engine.
+
+        Selects and filters are pushed down into the CSV scan on collect.
+
+        Returns:
+            A Polars lazyframe.
+        """
+        return self._set_reader_engine('polars').to_lazyframe()
 
-    def query_data(self, sql_query):
+    def to_relation(self):
+        """Converts CSV to an unmaterialized DuckDB relation using the DuckDB engine.
+
+        Projections and filters are pushed down into the CSV scan on execution.
+
+        Returns:
+            A DuckDB DuckDBPyRelation.
+        """
+        return self._set_reader_engine('duckdb').to_relation()
+
+    def iter_batches(self, batch_size=None):
+        """Streams the CSV in batches of bounded size instead of loading it whole.
+
+        Args:
+            batch_size (int, optional): Maximum number of rows per batch.
+
+        Yields:
+            Polars dataframes with the Polars engine or PyArrow record batches
+            with the DuckDB engine. With engine 'auto', engine_choice records which.
+            The instrumented read stage spans the whole iteration.
+        """
+        engine = self._set_reader_engine(operation='iter_batches')
+        return self._instrumented_batches(engine.ENGINE_NAME, engine.iter_batches(batch_size))
+
+    def to_record_batch_reader(self, batch_size=None):
+        """Streams the CSV as a PyArrow RecordBatchReader instead of one materialized table.
+
+        Consumers that speak Arrow, such as DuckDB, Polars, pandas and Flight
+        servers, pull the batches as they need them without copying them.
+
+        Args:
+            batch_size (int, optional): Maximum number of rows per batch.
+
+        Returns:
+            A PyArrow RecordBatchReader. It can be consumed once.
+        """
+        engine = self._set_reader_engine(operation='to_record_batch_reader')
+        reader = engine.to_record_batch_reader(batch_size)
+        if not Instrumentation.is_enabled():
+            return reader
+        batches = self._instrumented_batches(engine.ENGINE_NAME, reader,
+                                             operation='to_record_batch_reader')
+        return pa.RecordBatchReader.from_batches(reader.schema, batches)
+
+    def __arrow_c_stream__(self, requested_schema=None):
+        """Export the CSV as an Arrow C stream, per the Arrow PyCapsule interface.
+
+        Lets Arrow consumers read the reader directly, such as
+        pyarrow.RecordBatchReader.from_stream(reader) or a DuckDB query selecting
+        from a variable holding the reader.
+
+        Args:
+            requested_schema (PyCapsule, optional): Schema the consumer asks for.
+
+        Returns:
+            PyCapsule: The Arrow C stream of a new record batch reader.
+        """
+        return self.to_record_batch_reader().__arrow_c_stream__(requested_schema)
+
+    def _is_transcoded(self):
+        """Check if DuckDB reads any input file from a transcoding stream."""
+        if self.is_file_set:
+            return self._set_reader_engine('duckdb').is_transcoded
+        return not Encoding.is_native(self.encoding)
+
+    def _register_table(self, queries, materialize=True):
+        """Load the CSV into the session's DuckDB table unless it already holds it.
+
+        The table is reused until the size or modification time of a file changes,
+        or the delimiter, schema or materialization changes.
+
+        Args:
+            queries (DuckDBQueries): Queries for the table.
+            materialize (bool): Create a table instead of a view.
+
+        Returns:
+            bool: True if the table or view was created, False if it was reused.
+        """
+        if self.is_file_set:
+            engine = self._set_reader_engine('duckdb')
+            source_query = engine.source_query()
+        else:
+            source_query = queries.read_csv_query(self.delimiter, self.schema)
+        files = self.filepaths or [self.filepath]
+        version = (tuple(FileProperties(filepath).fingerprint for filepath in files),
+                   source_query, materialize)
+        connection = queries.database_connection
+        existing = connection.sql(queries.relation_type_query()).fetchone()
+        relation_type = existing[0] if existing else None
+        expected_type = 'BASE TABLE' if materialize else 'VIEW'
+        if (relation_type == expected_type
+                and DuckDBSession.catalog_entry(self.db_table) == version):
+            return False
+        if relation_type not in (None, expected_type):
+            connection.sql(queries.drop_relation_query(relation_type))
+        if self.is_file_set:
+            engine.register_sources()
+        else:
+            queries.register_source(self.delimiter, self.quotechar)
+        if materialize:
+            connection.sql(queries.create_table_query(source_query))
+        else:
+            connection.sql(queries.create_view_query(source_query))
+        DuckDBSession.set_catalog_entry(self.db_table, version)
+        return True
+
+    def split(self, n_chunks=None, target_bytes=None):
+        """Split the rows of the CSV into byte ranges that start and end on record boundaries.
+
+        Newlines inside quoted fields never split a record, so the ranges can be
+        read independently with read_range, in other processes or on other
+        machines, without rewriting the file into shards.
+
+        Args:
+            n_chunks (int, optional): Number of ranges of about equal size.
+            target_bytes (int, optional): Approximate size of each range in bytes.
+                Used when n_chunks is omitted.
+
+        Returns:
+            list: One (start, end) byte offset tuple per range, in file order.
+        """
+        if self.is_file_set:
+            raise ValueError(self.SPLIT_FILE_SET_MESSAGE)
+        scanner = RecordScanner(self.filepath, self.quotechar, encoding=self.encoding)
+        return scanner.split(n_chunks, target_bytes)
+
+    def read_range(self, start, end):
+        """Reads the rows in one byte range returned by split.
+
+        Args:
+            start (int): Start byte offset of the range.
+            end (int): End byte offset of the range.
+
+        Returns:
+            A Polars dataframe. Columns are text unless in typed mode, so every
+            range of the file has the same column types.
+        """
+        if self.is_file_set:
+            raise ValueError(self.SPLIT_FILE_SET_MESSAGE)
+        engine = self._set_reader_engine(operation='read_range')
+        with Instrumentation.stage('read', filepath=self.filepath, engine=engine.ENGINE_NAME,
+                                   operation='read_range') as event:
+            dataframe = engine.read_range(start, end)
+            event['bytes_read'] = end - start
+            event['rows'] = len(dataframe)
+        return dataframe
+
+    def query_data(self, sql_query, materialize=True):
         """Queries as CSV file after importing into DuckDB.
 
+        The file is imported once per session and later queries reuse the table
+        until the file's size or modification time changes.
+
         Args:
             sql_query (str): Query to run against DuckDB.
+            materialize (bool, default True): Import the file into a DuckDB table.
+                When False the file is registered as a view instead, which costs
+                nothing up front but scans the file on every query. Files not encoded
+                in UTF-8 are always imported, since their transcoded streams can only
+                be scanned once.
 
         Returns:
             A DuckDB DuckDBPyRelation with the query results.
@@ -83,74 +383,276 @@ class CSVReader(CSVProperties):
             dg.query_csv_data(query)
         """
         queries = DuckDBQueries(self.filepath)
-        duckdb.sql(queries.import_csv_query(self.delimiter))
-        return duckdb.sql(sql_query)
+        connection = queries.database_connection
+        if self._is_transcoded():
+            materialize = True
+        with Instrumentation.stage('execute', filepath=self.filepath, engine='duckdb',
+                                   operation='query_data') as event:
+            loaded = self._register_table(queries, materialize)
+            result = connection.sql(sql_query)
+            if Instrumentation.is_enabled():
+                # a reused table reads nothing from the files, a view scans them again
+                scanned = loaded or not materialize
+                event['bytes_read'] = self._input_size_in_bytes() if scanned else 0
+        return result
+
+    def _incremental_state(self, state_file):
+        """Return the incremental state of the file kept in a state file."""
+        if self.is_file_set:
+            raise ValueError(self.INCREMENTAL_FILE_SET_MESSAGE)
+        return IncrementalState(self.filepath, state_file, self.quotechar, self.encoding)
+
+    def read_new_rows(self, state_file):
+        """Read only the rows appended to the CSV since the last call with the state file.
+
+        The first call reads the whole file. Later calls read the records appended
+        since, up to the last complete line, and the whole file again if it was
+        replaced instead of appended to. Rows are read with DuckDB, as text unless
+        in typed mode, so every call returns the same column types.
+
+        Args:
+            state_file (str): Path to the JSON file keeping the read progress.
+
+        Returns:
+            A Polars dataframe of the new rows.
+        """
+        state = self._incremental_state(state_file)
+        start, end, rows = state.pending()
+        with Instrumentation.stage('read', filepath=self.filepath, engine='duckdb',
+                                   operation='read_new_rows') as event:
+            with state.new_rows_file(start, end) as new_rows_path:
+                new_rows_queries = DuckDBQueries(new_rows_path, self.encoding)
+                new_rows_queries.register_source(self.delimiter, self.quotechar)
+                source_query = new_rows_queries.read_csv_query(self.delimiter, self.schema)
+                dataframe = DuckDBQueries(self.filepath).database_connection.sql(source_query).pl()
+            event['bytes_read'] = end - start
+            event['rows'] = rows
+        state.advance(start, end, rows)
+        return dataframe
+
+    def append_new_rows(self, state_file):
+        """Append the rows added to the CSV since the last call to its DuckDB table.
+
+        The first call, or any call after the table was dropped or the file was
+        replaced, loads the whole file into the table instead.
+
+        Args:
+            state_file (str): Path to the JSON file keeping the append progress.
 
-class CSVWriter(CSVProperties):
+        Returns:
+            int: The number of rows appended.
+        """
+        state = self._incremental_state(state_file)
+        queries = DuckDBQueries(self.filepath)
+        connection = queries.database_connection
+        existing = connection.sql(queries.relation_type_query()).fetchone()
+        if not existing or existing[0] != 'BASE TABLE':
+            state.reset()
+        start, end, rows = state.pending()
+        with Instrumentation.stage('execute', filepath=self.filepath, engine='duckdb',
+                                   operation='append_new_rows') as event:
+            with state.new_rows_file(start, end) as new_rows_path:
+                new_rows_queries = DuckDBQueries(new_rows_path, self.encoding)
+                new_rows_queries.register_source(self.delimiter, self.quotechar)
+                source_query = new_rows_queries.read_csv_query(self.delimiter, self.schema)
+                if start == 0:
+                    connection.sql(queries.create_table_query(source_query))
+                else:
+                    connection.sql(queries.append_table_query(source_query))
+            event['bytes_read'] = end - start
+            event['rows'] = rows
+        # the table no longer holds a version query_data can reuse
+        DuckDBSession.set_catalog_entry(self.db_table, None)
+        state.advance(start, end, rows)
+        return rows
+
+class CSVWriter(CSVFile):
     """Class to unify the interface for converting CSV files to various other supported file types."""
 
-    WRITER_ENGINES = ['duckdb', 'polars']
-    VALUE_ERROR_MESSAGE = """Writer engine '{engine}' is not 'duckdb' or 'polars'. Pass either 'duckdb' or 'polars' as valid engine params."""
+    WRITER_ENGINES = CSVFile.ENGINES
+    VALUE_ERROR_MESSAGE = """Writer engine '{engine}' is not 'duckdb', 'polars', 'pyarrow' or 'auto'. Pass 'duckdb', 'polars', 'pyarrow' or 'auto' as valid engine params."""
+    INCREMENTAL_FILE_SET_MESSAGE = 'Incremental writes take a single file, not a file set.'
+    INCREMENTAL_STATE_FILENAME = '_datagrunt_state.json'
+    PARQUET_PART_TEMPLATE = 'part-{part:05d}.parquet'
+    PARQUET_PART_PATTERN = 'part-*.parquet'
 
-    def __init__(self, filepath, engine='duckdb'):
+    def __init__(self, filepath, engine='duckdb', typed=False, dtypes=None):
         """Initialize the CSV Writer class.
 
         Args:
-            filepath (str): Path to the file to write.
+            filepath (str or list): Path to the file to write, or a glob pattern or list
+                of paths to write several files as one dataset. File properties then
+                describe the first file.
             engine (str, default 'duckdb'): Determines which writer engine class to instantiate.
+                'auto' chooses the engine per output from the file size, column
+                count, available memory and the output format, and reports the choice.
+            typed (bool, default False): Infer native column types from a sample
+                instead of reading every column as text.
+            dtypes (dict, optional): Column names mapped to DuckDB type names that
+                override the inferred types. Implies typed.
         """
-        super().__init__(filepath)
-        self.db_table = DuckDBQueries(self.filepath).database_table_name
-        self.engine = engine.lower().replace(' ', '')
-        if self.engine not in self.WRITER_ENGINES:
-            raise ValueError(self.VALUE_ERROR_MESSAGE.format(engine=self.engine))
+        super().__init__(filepath, engine, typed, dtypes)
 
-    def _set_writer_engine(self):
-        """Sets the CSV reader engine as either DuckDB or Polars.
-           Default engine is Polars.
+    def _set_writer_engine(self, operation=None):
+        """Sets the CSV writer engine as DuckDB, Polars or PyArrow.
+           Default engine is DuckDB.
+
+        Args:
+            operation (str, optional): Name of the method the engine runs.
         """
-        if self.engine != 'polars':
-            engine = CSVWriterDuckDBEngine(self.filepath)
+        engine_name = self._choose_engine(operation)
+        if self.is_file_set:
+            if engine_name != 'polars':
+                engine = CSVFileSetWriterDuckDBEngine(self.filepaths, self.schema)
+            else:
+                engine = CSVFileSetWriterPolarsEngine(self.filepaths, self.schema)
+        elif engine_name == 'pyarrow':
+            engine = CSVWriterPyArrowEngine(self.filepath, self.schema)
+        elif engine_name != 'polars':
+            engine = CSVWriterDuckDBEngine(self.filepath, self.schema)
         else:
-            engine = CSVWriterPolarsEngine(self.filepath)
+            engine = CSVWriterPolarsEngine(self.filepath, self.schema)
         return engine
 
+    def _row_count(self, engine):
+        """Return the number of records written from the input, excluding headers."""
+        if self.is_file_set:
+            return sum(csv_file.row_count_without_header for csv_file in engine.files)
+        return self.row_count_without_header
+
+    def _write(self, operation, out_filename, default_filename, *args):
+        """Run a writer engine method inside an instrumented write stage.
+
+        Args:
+            operation (str): Name of the engine method, such as 'write_csv'.
+            out_filename (str): The name of the output file, or None for the default.
+            default_filename (str): The name the engine writes to without out_filename.
+            *args: Further arguments of the engine method.
+
+        Returns:
+            int: The number of rows written, as reported by the engine, or None when
+            the engine does not report it.
+        """
+        engine = self._set_writer_engine(operation)
+        with Instrumentation.stage('write', filepath=self.filepath, engine=engine.ENGINE_NAME,
+                                   operation=operation) as event:
+            rows = getattr(engine, operation)(out_filename, *args)
+            if Instrumentation.is_enabled():
+                with Instrumentation.untimed(event):
+                    # the size on disk, which the engine reads once, compressed or not
+                    event['bytes_read'] = self._input_size_in_bytes()
+                    event['bytes_written'] = Instrumentation.path_size_in_bytes(
+                        out_filename or default_filename)
+                    event['rows'] = self._row_count(engine) if rows is None else rows
+        return rows
+
     def write_csv(self, out_filename=None):
         """Query to export a DuckDB table to a CSV file.
 
-            Args:
-                out_filename str: The name of the output file.
-            """
-        return self._set_writer_engine().write_csv(out_filename)
+        Args:
+            out_filename str: The name of the output file.
+
+        Returns:
+            int: The number of rows written, or None when the engine does not report it.
+        """
+        return self._write('write_csv', out_filename, self.CSV_OUT_FILENAME)
 
     def write_excel(self, out_filename=None):
         """Query to export a DuckDB table to an Excel file.
 
         Args:
             out_filename str: The name of the output file.
+
+        Returns:
+            int: The number of rows written, or None when the engine does not report it.
         """
-        return self._set_writer_engine().write_excel(out_filename)
+        return self._write('write_excel', out_filename, self.EXCEL_OUT_FILENAME)
 
     def write_json(self, out_filename=None):
         """Query to export a DuckDB table to a JSON file.
 
         Args:
             out_filename str: The name of the output file.
+
+        Returns:
+            int: The number of rows written, or None when the engine does not report it.
         """
-        return self._set_writer_engine().write_json(out_filename)
+        return self._write('write_json', out_filename, self.JSON_OUT_FILENAME)
 
     def write_json_newline_delimited(self, out_filename=None):
         """Query to export a DuckDB table to a JSON newline delimited file.
 
         Args:
             out_filename str: The name of the output file.
+
+        Returns:
+            int: The number of rows written, or None when the engine does not report it.
         """
-        return self._set_writer_engine().write_json_newline_delimited(out_filename)
+        return self._write('write_json_newline_delimited', out_filename,
+                           self.JSON_NEWLINE_OUT_FILENAME)
 
-    def write_parquet(self, out_filename=None):
-        """Query to export a DuckDB table to a Parquet file.
+    def write_parquet(self, out_filename=None, partition_by=None, row_group_size=None,
+                      compression=None, compression_level=None, max_file_size=None):
+        """Query to export a DuckDB table to a Parquet file or a Hive-partitioned directory.
 
         Args:
-            out_filename str: The name of the output file.
+            out_filename str: The name of the output file, or the output directory
+                when partitioning or capping the file size.
+            partition_by (str or list, optional): Columns to partition the output by.
+            row_group_size (int, optional): Number of rows per row group.
+            compression (str, optional): Compression codec, such as 'zstd' or 'snappy'.
+            compression_level (int, optional): Compression level of the codec.
+            max_file_size (int, optional): Target maximum size of each file in bytes.
+
+        Returns:
+            int: The number of rows written, or None when the engine does not report it.
+        """
+        return self._write('write_parquet', out_filename, self.PARQUET_OUT_FILENAME,
+                           partition_by, row_group_size, compression, compression_level,
+                           max_file_size)
+
+    def write_parquet_increment(self, out_dir, state_file=None):
+        """Write the rows appended to the CSV since the last call as a new Parquet part.
+
+        Parts are numbered in order in out_dir, so the directory reads as one
+        dataset. The first call writes the whole file as the first part. When the
+        file was replaced instead of appended to, the parts are rewritten from the
+        start. Rows are written as text unless in typed mode, so every part has
+        the same schema.
+
+        Args:
+            out_dir (str): Directory of the Parquet parts.
+            state_file (str, optional): Path to the JSON file keeping the write
+                progress. Defaults to INCREMENTAL_STATE_FILENAME in out_dir.
+
+        Returns:
+            str: Path of the new part, or None when no rows were appended.
         """
-        return self._set_writer_engine().write_parquet(out_filename)
+        if self.is_file_set:
+            raise ValueError(self.INCREMENTAL_FILE_SET_MESSAGE)
+        state_file = state_file or os.path.join(out_dir, self.INCREMENTAL_STATE_FILENAME)
+        state = IncrementalState(self.filepath, state_file, self.quotechar, self.encoding)
+        start, end, rows = state.pending()
+        if rows == 0:
+            return None
+        os.makedirs(out_dir, exist_ok=True)
+        part = state.state.get('parts', 0) if start else 0
+        if start == 0:
+            for stale_part in Path(out_dir).glob(self.PARQUET_PART_PATTERN):
+                stale_part.unlink()
+        out_filename = os.path.join(out_dir, self.PARQUET_PART_TEMPLATE.format(part=part))
+        with Instrumentation.stage('write', filepath=self.filepath, engine='duckdb',
+                                   operation='write_parquet_increment') as event:
+            with state.new_rows_file(start, end) as new_rows_path:
+                new_rows_queries = DuckDBQueries(new_rows_path, self.encoding)
+                new_rows_queries.register_source(self.delimiter, self.quotechar)
+                source_query = new_rows_queries.read_csv_query(self.delimiter, self.schema)
+                queries = DuckDBQueries(self.filepath)
+                queries.database_connection.sql(
+                    queries.export_parquet_query(out_filename, source_query))
+            event['bytes_read'] = end - start
+            event['rows'] = rows
+            if Instrumentation.is_enabled():
+                event['bytes_written'] = Instrumentation.path_size_in_bytes(out_filename)
+        state.advance(start, end, rows, parts=part + 1)
+        return out_filename
@@ -0,0 +1,136 @@
+"""Unit tests for AsyncCSVReader and AsyncCSVWriter."""
+
+import asyncio
+import threading
+import time
+import polars as pl
+import pytest
+from src.datagrunt.aio import AsyncCSVFile, AsyncCSVReader, AsyncCSVWriter
+from src.datagrunt.core.databases import DuckDBSession
+
+@pytest.fixture
+def csv_file(tmp_path):
+    """A CSV file large enough to take several batches."""
+    filepath = tmp_path / 'data.csv'
+    filepath.write_text('id,name\n' + ''.join(f'{i},name {i}\n' for i in range(10_000)),
+                        encoding='utf-8')
+    return str(filepath)
+
+@pytest.mark.parametrize('engine', ['duckdb', 'polars'])
+def test_reader_methods(csv_file, engine):
+    """Test if the async reader returns what the reader does."""
+    async def read():
+        reader = AsyncCSVReader(csv_file, engine=engine)
+        csv_reader = await reader.get_csv_file()
+        assert csv_reader.columns == ['id', 'name']
+        return await asyncio.gather(reader.to_dataframe(), reader.to_arrow_table())
+
+    dataframe, arrow_table = asyncio.run(read())
+    assert len(dataframe) == arrow_table.num_rows == 10_000
+
+@pytest.mark.parametrize('engine', ['duckdb', 'polars'])
+def test_iter_batches(csv_file, engine):
+    """Test if async iteration yields every row in bounded batches."""
+    async def count():
+        sizes = []
+        async for batch in AsyncCSVReader(csv_file, engine=engine).iter_batches(batch_size=3_000):
+            sizes.append(len(batch))
+        return sizes
+
+    sizes = asyncio.run(count())
+    assert sum(sizes) == 10_000
+    assert max(sizes) <= 3_000
+
+def test_iter_batches_stops_early(csv_file):
+    """Test if leaving the loop early stops the worker reading ahead."""
+    async def first_batch():
+        async for batch in AsyncCSVReader(csv_file, engine='duckdb').iter_batches(batch_size=100):
+            return len(batch)
+
+    assert asyncio.run(first_batch()) == 100
+
+def test_iter_batches_raises_reader_errors(tmp_path):
+    """Test if errors of the worker are raised in the consuming task."""
+    filepath = tmp_path / 'broken.csv'
+    filepath.write_text('id,value\n1,2\n', encoding='utf-8')
+
+    async def consume():
+        reader = AsyncCSVReader(str(filepath), engine='duckdb', dtypes={'value': 'DATE'})
+        async for _ in reader.iter_batches():
+            pass
+
+    with pytest.raises(Exception, match='DATE|date|Conversion'):
+        asyncio.run(consume())
+
+def test_query_data(csv_file):
+    """Test if async queries return their results as a Polars dataframe."""
+    async def query():
+        reader = AsyncCSVReader(csv_file)
+        csv_reader = await reader.get_csv_file()
+        return await reader.query_data(f'SELECT count(*) AS rows FROM {csv_reader.db_table}')
+
+    assert asyncio.run(query())['rows'][0] == 10_000
+
+@pytest.mark.parametrize('engine', ['duckdb', 'polars'])
+def test_writers_run_concurrently(csv_file, tmp_path, engine):
+    """Test if several conversions run side by side."""
+    out_files = [str(tmp_path / f'out_{i}.parquet') for i in range(3)]
+
+    async def convert():
+        writer = AsyncCSVWriter(csv_file, engine=engine)
+        await asyncio.gather(*(writer.write_parquet(out_file) for out_file in out_files))
+
+    asyncio.run(convert())
+    assert all(len(pl.read_parquet(out_file)) == 10_000 for out_file in out_files)
+
+def test_cancel_interrupts_duckdb():
+    """Test if cancelling a call interrupts the DuckDB query running in the pool."""
+    def slow_query():
+        DuckDBSession.connect().sql('SELECT count(*) FROM range(100000000000)').fetchall()
+
+    async def cancel():
+        task = asyncio.create_task(AsyncCSVFile.run(slow_query))
+        await asyncio.sleep(0.3)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        start = time.perf_counter()
+        # the single worker is free again once the query was interrupted
+        await AsyncCSVFile.run(threading.get_ident)
+        return time.perf_counter() - start
+
+    AsyncCSVFile.set_max_workers(1)
+    try:
+        assert asyncio.run(cancel()) < 5
+    finally:
+        AsyncCSVFile.set_max_workers()
+
+def test_cancel_does_not_interrupt_next_call(monkeypatch):
+    """Test if a cancellation racing with the end of a call spares the next call on its thread."""
+    release = threading.Event()
+    next_call_started = threading.Event()
+    interrupted_next_call = []
+
+    def interrupt(thread_id, database=None):
+        # the cancelled call ends while its interrupt is being delivered
+        release.set()
+        time.sleep(0.2)
+        interrupted_next_call.append(next_call_started.is_set())
+
+    monkeypatch.setattr(DuckDBSession, 'interrupt', interrupt)
+
+    async def cancel():
+        task = asyncio.create_task(AsyncCSVFile.run(release.wait))
+        next_call = asyncio.create_task(AsyncCSVFile.run(next_call_started.set))
+        await asyncio.sleep(0.1)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await next_call
+
+    AsyncCSVFile.set_max_workers(1)
+    try:
+        asyncio.run(cancel())
+    finally:
+        AsyncCSVFile.set_max_workers()
+    assert interrupted_next_call == [False]
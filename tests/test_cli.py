@@ -0,0 +1,144 @@
+"""Unit tests for the datagrunt command line interface."""
+
+import gzip
+import os
+import pytest
+import polars as pl
+from src.datagrunt.cli import BatchConverter, convert_file, main
+
+@pytest.fixture
+def csv_dir(tmp_path):
+    """Fixture to create a directory of CSV files."""
+    source = tmp_path / 'source'
+    source.mkdir()
+    for i in range(3):
+        (source / f'file_{i}.csv').write_text('Name,Age\nAlice,25\nBob,30\n')
+    (source / 'readme.txt').write_text('not a CSV file\n')
+    return source
+
+def test_expand_source_directory(csv_dir):
+    """Test if a directory expands to the CSV files it contains."""
+    filepaths = BatchConverter.expand_source(str(csv_dir))
+    assert [path.split('/')[-1] for path in filepaths] == ['file_0.csv', 'file_1.csv', 'file_2.csv']
+
+def test_out_filename(csv_dir, tmp_path):
+    """Test if outputs are placed beside the input or in the output directory."""
+    filepath = str(csv_dir / 'file_0.csv')
+    assert BatchConverter(filepath).out_filename(filepath) == str(csv_dir / 'file_0.parquet')
+    converter = BatchConverter(filepath, 'jsonl', output_dir=str(tmp_path / 'out'))
+    assert converter.out_filename(filepath) == str(tmp_path / 'out' / 'file_0.jsonl')
+
+def test_out_filename_same_file(csv_dir):
+    """Test if converting a CSV file onto itself raises a ValueError."""
+    filepath = str(csv_dir / 'file_0.csv')
+    with pytest.raises(ValueError):
+        BatchConverter(filepath, 'csv').out_filename(filepath)
+
+def test_unknown_format(csv_dir):
+    """Test if an unknown output format raises a ValueError."""
+    with pytest.raises(ValueError):
+        BatchConverter(str(csv_dir), 'avro')
+
+@pytest.mark.parametrize('engine', ['duckdb', 'polars', 'pyarrow'])
+def test_convert_file(csv_dir, tmp_path, engine):
+    """Test if a single conversion reports its rows and throughput."""
+    out_filename = str(tmp_path / 'out.parquet')
+    result = convert_file(str(csv_dir / 'file_0.csv'), out_filename, 'parquet', engine)
+    assert result['rows'] == 2
+    assert result['rows_per_second'] > 0
+    assert pl.read_parquet(out_filename).height == 2
+
+def test_summarize():
+    """Test if per-file results are aggregated."""
+    results = [{'rows': 10, 'size_in_bytes': 1024 ** 2},
+               {'rows': 30, 'size_in_bytes': 1024 ** 2}]
+    summary = BatchConverter.summarize(results, 2.0)
+    assert summary['rows'] == 40
+    assert summary['rows_per_second'] == 20
+    assert summary['mb_per_second'] == 1
+
+def test_main_convert(csv_dir, tmp_path, capsys):
+    """Test if the convert command converts every file on the worker pool."""
+    out_dir = tmp_path / 'out'
+    exit_code = main(['convert', str(csv_dir), '--to', 'parquet', '--jobs', '2',
+                      '--output-dir', str(out_dir)])
+    assert exit_code == 0
+    assert sorted(path.name for path in out_dir.iterdir()) == [
+        'file_0.parquet', 'file_1.parquet', 'file_2.parquet']
+    output = capsys.readouterr().out
+    assert 'total (3 files, 2 jobs): 6 rows' in output
+    assert 'rows/s' in output and 'MB/s' in output
+
+def test_main_no_files(tmp_path, capsys):
+    """Test if a source without CSV files exits with an error."""
+    assert main(['convert', str(tmp_path / '*.csv')]) == 1
+    assert 'No CSV files match' in capsys.readouterr().err
+
+@pytest.mark.parametrize('size, expected', [('8GB', 8 * 1000 ** 3), ('512MiB', 512 * 1024 ** 2),
+                                            ('1.5 kb', 1500), (2048, 2048)])
+def test_parse_size(size, expected):
+    """Test if memory sizes are converted to bytes."""
+    assert BatchConverter.parse_size(size) == expected
+
+def test_parse_size_invalid():
+    """Test if an unknown size unit raises a ValueError."""
+    with pytest.raises(ValueError):
+        BatchConverter.parse_size('8 parsecs')
+
+def test_memory_limit_split_between_jobs(csv_dir):
+    """Test if the memory budget is shared equally by the workers."""
+    converter = BatchConverter(str(csv_dir), jobs=2, memory_limit='1GB')
+    assert converter.memory_limit_per_job == f'{1000 ** 3 // 2}B'
+
+def test_main_convert_memory_limit(csv_dir, tmp_path, capsys):
+    """Test if the convert command runs the workers out of core."""
+    out_dir = tmp_path / 'out'
+    exit_code = main(['convert', str(csv_dir), '--to', 'json', '--jobs', '2',
+                      '--engine', 'polars', '--memory-limit', '512MB',
+                      '--temp-dir', str(tmp_path / 'spill'), '--output-dir', str(out_dir)])
+    assert exit_code == 0
+    assert pl.read_json(out_dir / 'file_0.json').height == 2
+
+def test_expand_source_compressed(csv_dir):
+    """Test if a directory expands to its compressed CSV files too."""
+    (csv_dir / 'file_3.csv.gz').write_bytes(gzip.compress(b'Name,Age\nCarol,35\n'))
+    filepaths = BatchConverter.expand_source(str(csv_dir))
+    assert [path.split('/')[-1] for path in filepaths] == [
+        'file_0.csv', 'file_1.csv', 'file_2.csv', 'file_3.csv.gz']
+
+def test_out_filename_compressed(csv_dir):
+    """Test if the compression and CSV suffixes are both replaced."""
+    filepath = str(csv_dir / 'file_0.csv')
+    assert (BatchConverter(filepath).out_filename(str(csv_dir / 'x.csv.gz'))
+            == str(csv_dir / 'x.parquet'))
+
+def test_out_filenames_collision(tmp_path):
+    """Test if same-named inputs written to one output directory raise a ValueError."""
+    for directory in ['a', 'b']:
+        (tmp_path / directory).mkdir()
+        (tmp_path / directory / 'data.csv').write_text('Name,Age\nAlice,25\n')
+    converter = BatchConverter(str(tmp_path / '*' / 'data.csv'),
+                               output_dir=str(tmp_path / 'out'))
+    with pytest.raises(ValueError, match='would both be written'):
+        converter.out_filenames()
+
+def test_main_convert_reports_failures(csv_dir, tmp_path, capsys):
+    """Test if a failing file is reported while the others are still converted."""
+    # a truncated gzip stream cannot be decompressed
+    (csv_dir / 'file_3.csv.gz').write_bytes(gzip.compress(b'Name,Age\nCarol,35\n' * 100)[:20])
+    out_dir = tmp_path / 'out'
+    exit_code = main(['convert', str(csv_dir), '--to', 'parquet', '--jobs', '2',
+                      '--output-dir', str(out_dir)])
+    assert exit_code == 1
+    assert {'file_0.parquet', 'file_1.parquet', 'file_2.parquet'} <= {
+        path.name for path in out_dir.iterdir()}
+    captured = capsys.readouterr()
+    assert 'file_3.csv.gz' in captured.err
+    assert '1 of 4 files failed' in captured.err
+    assert 'total (4 files, 2 jobs): 6 rows' in captured.out
+
+def test_run_leaves_environment_unchanged(csv_dir, tmp_path, monkeypatch):
+    """Test if the worker thread limit is not set in the calling process."""
+    monkeypatch.delenv('POLARS_MAX_THREADS', raising=False)
+    BatchConverter(str(csv_dir), output_dir=str(tmp_path / 'out'), jobs=1).run()
+    assert 'POLARS_MAX_THREADS' not in os.environ
@@ -0,0 +1,110 @@
+"""Unit tests for Compression."""
+
+import bz2
+import gzip
+import lzma
+import pyarrow as pa
+import polars as pl
+import pytest
+from unittest.mock import patch
+from src.datagrunt.core.compression import Compression
+from src.datagrunt.core.records import RecordScanner
+from src.datagrunt.csvfile import CSVReader, CSVWriter
+
+CSV_DATA = b'id,name\n' + b''.join(f'{i},name {i}\n'.encode() for i in range(1000))
+
+def write_zstd(filepath, data):
+    """Write zstd compressed bytes with PyArrow."""
+    with pa.output_stream(str(filepath), compression='zstd') as stream:
+        stream.write(data)
+
+COMPRESSORS = {
+    'gzip': lambda filepath, data: filepath.write_bytes(gzip.compress(data)),
+    'zstd': write_zstd,
+    'bz2': lambda filepath, data: filepath.write_bytes(bz2.compress(data)),
+    'xz': lambda filepath, data: filepath.write_bytes(lzma.compress(data)),
+}
+
+@pytest.fixture(params=list(COMPRESSORS))
+def compressed_csv(request, tmp_path):
+    """A CSV file compressed with each supported compression, named without a hint."""
+    filepath = tmp_path / f'data_{request.param}.csv'
+    COMPRESSORS[request.param](filepath, CSV_DATA)
+    return request.param, str(filepath)
+
+def test_detect_from_magic_bytes(compressed_csv, tmp_path):
+    """Test if the compression is detected from the content, not the file name."""
+    compression, filepath = compressed_csv
+    assert Compression.detect(filepath) == compression
+    plain = tmp_path / 'plain.csv.gz'
+    plain.write_bytes(CSV_DATA)
+    assert Compression.detect(str(plain)) is None
+
+def test_open_streams_decompressed_lines(compressed_csv):
+    """Test if compressed files read back as their original bytes."""
+    compression, filepath = compressed_csv
+    with Compression.open(filepath, compression) as file:
+        assert file.readline() == b'id,name\n'
+    assert Compression.read(filepath, compression) == CSV_DATA
+
+@pytest.mark.parametrize('filename, suffix', [('data.csv.gz', '.csv'),
+                                              ('data.tsv.zst', '.tsv'),
+                                              ('data.csv', '.csv')])
+def test_inner_suffix(filename, suffix):
+    """Test if the compression suffix is dropped from the file extension."""
+    assert Compression.inner_suffix(filename) == suffix
+
+def test_duckdb_compression():
+    """Test if DuckDB gets native compressions and refuses bz2 and xz."""
+    assert Compression.duckdb_compression('zstd') == 'zstd'
+    assert Compression.duckdb_compression(None) is None
+    with pytest.raises(ValueError):
+        Compression.duckdb_compression('xz')
+
+def test_reader_polars(compressed_csv):
+    """Test if Polars reads, counts and batches every compression."""
+    _, filepath = compressed_csv
+    reader = CSVReader(filepath, engine='polars')
+    assert reader.columns == ['id', 'name']
+    assert reader.row_count_without_header == 1000
+    assert len(reader.to_dataframe()) == 1000
+    batches = list(reader.iter_batches(batch_size=300))
+    assert sum(len(batch) for batch in batches) == 1000
+
+def test_reader_duckdb(compressed_csv):
+    """Test if DuckDB reads gzip and zstd, and explains why it cannot read the rest."""
+    compression, filepath = compressed_csv
+    reader = CSVReader(filepath, engine='duckdb')
+    if compression in Compression.NATIVE_COMPRESSIONS:
+        assert len(reader.to_dataframe()) == 1000
+    else:
+        with pytest.raises(ValueError, match=compression):
+            reader.to_dataframe()
+
+def test_writer_polars(compressed_csv, tmp_path):
+    """Test if Polars converts every compression to Parquet."""
+    _, filepath = compressed_csv
+    out_filename = str(tmp_path / 'out.parquet')
+    CSVWriter(filepath, engine='polars').write_parquet(out_filename)
+    assert len(pl.read_parquet(out_filename)) == 1000
+
+def test_split_refuses_compressed(compressed_csv):
+    """Test if byte ranges are refused on compressed files."""
+    _, filepath = compressed_csv
+    with pytest.raises(ValueError):
+        CSVReader(filepath).split(2)
+
+def test_estimate_records_from_sample(tmp_path):
+    """Test if compressed files are estimated from a decompressed sample, not counted."""
+    data = b'id,name\n' + b''.join(f'{i},name {i * 7919 % 100003}\n'.encode()
+                                   for i in range(400_000))
+    for compression, compress in COMPRESSORS.items():
+        filepath = tmp_path / f'large_{compression}.csv'
+        compress(filepath, data)
+        scanner = RecordScanner(str(filepath))
+        with patch.object(RecordScanner, 'count_records', side_effect=AssertionError):
+            estimate = scanner.estimate_records()
+        assert abs(estimate - 400_001) / 400_001 < 0.35
+    small = tmp_path / 'small.csv'
+    COMPRESSORS['gzip'](small, CSV_DATA)
+    assert RecordScanner(str(small)).estimate_records() == 1001
@@ -0,0 +1,130 @@
+"""Unit tests for reading and converting sets of CSV files."""
+
+import os
+import pytest
+import polars as pl
+from src.datagrunt.core.filesets import CSVFileSet
+from src.datagrunt.core.filesets import CSVFileSetReaderDuckDBEngine, CSVFileSetReaderPolarsEngine
+from src.datagrunt.core.filesets import CSVFileSetWriterDuckDBEngine, CSVFileSetWriterPolarsEngine
+
+@pytest.fixture
+def shard_dir(tmp_path):
+    """Fixture to create shard files with different delimiters and columns."""
+    shards = tmp_path / 'shards'
+    shards.mkdir()
+    (shards / 'part_1.csv').write_text('Name,Age\nAlice,25\nBob,30\n')
+    (shards / 'part_2.csv').write_text('Name;Age;City\nCharlie;28;Paris\n')
+    (shards / 'part_3.csv').write_text('Name,Age\nDavid,35\n')
+    (shards / 'notes.txt').write_text('not a shard\n')
+    return shards
+
+@pytest.fixture
+def shard_glob(shard_dir):
+    """Fixture for a glob matching every shard."""
+    return str(shard_dir / 'part_*.csv')
+
+def test_expand_filepaths(shard_dir, shard_glob):
+    """Test if globs expand to sorted paths and lists keep their order."""
+    expanded = CSVFileSet.expand_filepaths(shard_glob)
+    assert [os.path.basename(path) for path in expanded] == ['part_1.csv', 'part_2.csv', 'part_3.csv']
+    explicit = [shard_dir / 'part_3.csv', shard_dir / 'part_1.csv']
+    assert CSVFileSet.expand_filepaths(explicit) == [str(path) for path in explicit]
+
+def test_expand_filepaths_no_match(tmp_path):
+    """Test if a glob without matches raises FileNotFoundError."""
+    with pytest.raises(FileNotFoundError):
+        CSVFileSet.expand_filepaths(str(tmp_path / '*.csv'))
+
+def test_is_file_set(shard_glob):
+    """Test if lists and globs are recognized as file sets."""
+    assert CSVFileSet.is_file_set(shard_glob)
+    assert CSVFileSet.is_file_set(['a.csv'])
+    assert not CSVFileSet.is_file_set('a.csv')
+
+def test_per_file_delimiters(shard_glob):
+    """Test if the delimiter is detected per file."""
+    file_set = CSVFileSet(shard_glob)
+    groups = file_set.files_by_delimiter()
+    assert sorted(groups) == [',', ';']
+    assert len(groups[',']) == 2
+
+@pytest.mark.parametrize('engine_class', [CSVFileSetReaderDuckDBEngine,
+                                          CSVFileSetReaderPolarsEngine])
+def test_to_dataframe(shard_glob, engine_class):
+    """Test if every shard is read into one dataframe with provenance."""
+    df = engine_class(shard_glob).to_dataframe()
+    assert sorted(df['Name'].to_list()) == ['Alice', 'Bob', 'Charlie', 'David']
+    assert set(df.columns) == {'Name', 'Age', 'City', 'filename'}
+    charlie = df.filter(pl.col('Name') == 'Charlie')
+    assert charlie['filename'][0].endswith('part_2.csv')
+    assert charlie['City'][0] == 'Paris'
+
+@pytest.mark.parametrize('engine_class', [CSVFileSetReaderDuckDBEngine,
+                                          CSVFileSetReaderPolarsEngine])
+def test_to_arrow_table(shard_glob, engine_class):
+    """Test if every shard is read into one PyArrow table."""
+    assert engine_class(shard_glob).to_arrow_table().num_rows == 4
+
+@pytest.mark.parametrize('engine_class', [CSVFileSetReaderDuckDBEngine,
+                                          CSVFileSetReaderPolarsEngine])
+def test_iter_batches(shard_glob, engine_class):
+    """Test if every shard is streamed in bounded batches."""
+    batches = list(engine_class(shard_glob).iter_batches(batch_size=1))
+    assert sum(len(batch) for batch in batches) == 4
+
+@pytest.mark.parametrize('engine_class', [CSVFileSetReaderDuckDBEngine,
+                                          CSVFileSetReaderPolarsEngine])
+def test_to_record_batch_reader(shard_glob, engine_class):
+    """Test if shards with different columns stream as batches of one schema."""
+    reader = engine_class(shard_glob).to_record_batch_reader(batch_size=1)
+    assert set(reader.schema.names) == {'Name', 'Age', 'City', 'filename'}
+    assert reader.read_all().num_rows == 4
+
+def test_to_lazyframe(shard_glob):
+    """Test if the shards are combined into one lazyframe."""
+    lazyframe = CSVFileSetReaderPolarsEngine(shard_glob).to_lazyframe()
+    assert lazyframe.filter(pl.col('Age') > 29).collect().height == 2
+
+@pytest.mark.parametrize('engine_class', [CSVFileSetWriterDuckDBEngine,
+                                          CSVFileSetWriterPolarsEngine])
+def test_write_parquet(shard_glob, tmp_path, engine_class):
+    """Test if every shard is converted into one Parquet file."""
+    out_filename = tmp_path / 'combined.parquet'
+    engine_class(shard_glob).write_parquet(out_filename)
+    df = pl.read_parquet(out_filename)
+    assert df.height == 4
+    assert 'filename' in df.columns
+
+@pytest.mark.parametrize('engine_class', [CSVFileSetWriterDuckDBEngine,
+                                          CSVFileSetWriterPolarsEngine])
+def test_write_csv(shard_glob, tmp_path, engine_class):
+    """Test if every shard is converted into one CSV file."""
+    out_filename = tmp_path / 'combined.csv'
+    engine_class(shard_glob).write_csv(out_filename)
+    assert pl.read_csv(out_filename).height == 4
+
+@pytest.mark.parametrize('engine_class', [CSVFileSetWriterDuckDBEngine,
+                                          CSVFileSetWriterPolarsEngine])
+def test_write_parquet_partitioned(shard_glob, tmp_path, engine_class):
+    """Test if the shards are written as one dataset partitioned by source file."""
+    out_dir = tmp_path / 'partitioned'
+    engine_class(shard_glob).write_parquet(out_dir, partition_by='filename')
+    assert len(list(out_dir.iterdir())) == 3
+    df = pl.read_parquet(out_dir / '**' / '*.parquet', hive_partitioning=False)
+    assert df.height == 4
+    assert 'City' in df.columns
+
+def test_transcoded_shards(tmp_path):
+    """Test if DuckDB reads and converts shards in mixed encodings."""
+    (tmp_path / 'part_1.csv').write_bytes('Name,City\nAnaïs,Zürich\n'.encode('cp1252'))
+    (tmp_path / 'part_2.csv').write_text('Name,City\nBjörn,Malmö\n', encoding='utf-8')
+    (tmp_path / 'part_3.csv').write_text('Name;City\nChloé;Genève\n', encoding='utf-16')
+    shard_glob = str(tmp_path / 'part_*.csv')
+    reader = CSVFileSetReaderDuckDBEngine(shard_glob)
+    assert reader.is_transcoded
+    df = reader.to_dataframe().sort('Name')
+    assert df['City'].to_list() == ['Zürich', 'Malmö', 'Genève']
+    assert df['filename'][0].endswith('part_1.csv')
+    out_filename = tmp_path / 'out.parquet'
+    CSVFileSetWriterDuckDBEngine(shard_glob).write_parquet(str(out_filename))
+    assert pl.read_parquet(out_filename).height == 3
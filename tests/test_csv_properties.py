@@ -1,5 +1,8 @@
 """Unit tests for CSVProperties."""
+import csv
 import pytest
+from unittest.mock import patch
+from src.datagrunt.core.databases import DuckDBSession
 from src.datagrunt.core.fileproperties import CSVProperties
 
 @pytest.fixture
@@ -53,3 +56,63 @@ def test_invalid_csv(sample_csv_files):
     """Test if a ValueError is raised for a non-CSV file."""
     with pytest.raises(ValueError):
         CSVProperties(sample_csv_files['text_file'])
+
+def test_metadata_computed_once(sample_csv_files):
+    """Test if dialect metadata is sniffed once and reused by every property."""
+    props = CSVProperties(sample_csv_files['comma_file'])
+    with patch('src.datagrunt.core.fileproperties.csv.Sniffer') as mock_sniffer:
+        mock_sniffer.return_value.sniff.return_value = csv.excel
+        assert props.columns == ['Name', 'Age', 'City']
+        assert props.column_count == 3
+        assert props.quotechar == '"'
+        assert props.columns_byte_string == b'Name, Age, City'
+        mock_sniffer.return_value.sniff.assert_called_once()
+
+def test_metadata_sidecar_cache(sample_csv_files, tmp_path):
+    """Test if metadata is served from the sidecar cache until the file changes."""
+    CSVProperties.set_metadata_cache(tmp_path / 'cache')
+    try:
+        CSVProperties(sample_csv_files['pipe_file']).metadata
+        with patch.object(CSVProperties, '_get_first_row_from_file') as mock_first_row:
+            cached = CSVProperties(sample_csv_files['pipe_file'])
+            assert cached.delimiter == '|'
+            assert cached.columns == ['Name', 'Age', 'City']
+            mock_first_row.assert_not_called()
+        sample_csv_files['pipe_file'].write_text('Id|Score\n1|99\n')
+        assert CSVProperties(sample_csv_files['pipe_file']).columns == ['Id', 'Score']
+    finally:
+        CSVProperties.set_metadata_cache(None)
+
+def test_row_counting_quoted_newlines(tmp_path):
+    """Test if newlines inside quoted fields do not count as rows."""
+    filepath = tmp_path / 'quoted.csv'
+    filepath.write_text('Name,Note\nAlice,"multi\nline"\nBob,single\n')
+    props = CSVProperties(filepath)
+    assert props.row_count_with_header == 3
+    assert props.row_count_without_header == 2
+    assert props.estimated_row_count == 3
+
+def test_quoted_header_delimiter(tmp_path):
+    """Test if a quoted header containing commas is split on the real delimiter."""
+    filepath = tmp_path / 'quoted_header.csv'
+    filepath.write_text('"a,b";"c"\n1;2\n3;4\n')
+    props = CSVProperties(filepath)
+    assert props.delimiter == ';'
+    assert props.delimiter_confidence == 1.0
+    assert props.columns == ['a,b', 'c']
+    assert props.newline_delimiter == '\n'
+
+def test_set_out_of_core(sample_csv_files, tmp_path):
+    """Test if out-of-core mode bounds DuckDB memory and spills to the temp directory."""
+    spill_directory = str(tmp_path / 'spill')
+    CSVProperties.set_out_of_core('100MB', spill_directory)
+    try:
+        assert CSVProperties(sample_csv_files['comma_file']).out_of_core
+        connection = DuckDBSession.connect()
+        settings = connection.sql("SELECT current_setting('memory_limit'), "
+                                  "current_setting('temp_directory')").fetchone()
+        assert settings[0].startswith('95.3')
+        assert settings[1] == spill_directory
+    finally:
+        CSVProperties.set_out_of_core()
+    assert not CSVProperties.out_of_core
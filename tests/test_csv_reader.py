@@ -1,8 +1,13 @@
 """Unit tests for CSVReader."""
 
+from datetime import date
+import os
+import pyarrow as pa
 import pytest
 from unittest.mock import patch
 from src.datagrunt.csvfile import CSVReader
+from src.datagrunt.core.engines import CSVReaderPyArrowEngine
+from src.datagrunt.core.queries import DuckDBQueries
 
 @pytest.fixture
 def sample_csv_file(tmp_path):
@@ -19,7 +24,7 @@ def test_invalid_engine(sample_csv_file):
     """Test that an error is raised for an invalid reader engine."""
     with pytest.raises(ValueError) as exc_info:
         CSVReader(sample_csv_file, engine='invalid')
-    assert str(exc_info.value) == """Reader engine 'invalid' is not 'duckdb' or 'polars'. Pass either 'duckdb' or 'polars' as valid engine params."""
+    assert str(exc_info.value) == """Reader engine 'invalid' is not 'duckdb', 'polars', 'pyarrow' or 'auto'. Pass 'duckdb', 'polars', 'pyarrow' or 'auto' as valid engine params."""
 
 @patch('src.datagrunt.csvfile.CSVReaderPolarsEngine.get_sample')
 def test_get_sample_polars(mock_get_sample, sample_csv_file):
@@ -77,10 +82,216 @@ def test_to_dicts_duckdb(mock_to_dicts, sample_csv_file):
     reader.to_dicts()
     mock_to_dicts.assert_called_once()
 
-@patch('src.datagrunt.csvfile.duckdb.sql')
-def test_query_data(mock_sql, sample_csv_file):
-    """Test that the query_data method calls DuckDB SQL with the correct query."""
+@patch('src.datagrunt.csvfile.CSVReaderPolarsEngine.to_lazyframe')
+def test_to_lazyframe(mock_to_lazyframe, sample_csv_file):
+    """Test that the to_lazyframe method calls the Polars engine."""
+    reader = CSVReader(sample_csv_file, engine='duckdb')
+    reader.to_lazyframe()
+    mock_to_lazyframe.assert_called_once()
+
+@patch('src.datagrunt.csvfile.CSVReaderDuckDBEngine.to_relation')
+def test_to_relation(mock_to_relation, sample_csv_file):
+    """Test that the to_relation method calls the DuckDB engine."""
+    reader = CSVReader(sample_csv_file)
+    reader.to_relation()
+    mock_to_relation.assert_called_once()
+
+@patch('src.datagrunt.csvfile.CSVReaderPolarsEngine.iter_batches')
+def test_iter_batches_polars(mock_iter_batches, sample_csv_file):
+    """Test that the iter_batches method calls the Polars engine."""
+    reader = CSVReader(sample_csv_file)
+    reader.iter_batches(batch_size=2)
+    mock_iter_batches.assert_called_once_with(2)
+
+@patch('src.datagrunt.csvfile.CSVReaderDuckDBEngine.iter_batches')
+def test_iter_batches_duckdb(mock_iter_batches, sample_csv_file):
+    """Test that the iter_batches method calls the DuckDB engine."""
+    reader = CSVReader(sample_csv_file, engine='duckdb')
+    reader.iter_batches(batch_size=2)
+    mock_iter_batches.assert_called_once_with(2)
+
+def test_query_data(sample_csv_file):
+    """Test that the query_data method runs the query against the imported CSV."""
     reader = CSVReader(sample_csv_file)
-    query = "SELECT * FROM {reader.db_table}"
-    reader.query_data(query)
-    mock_sql.assert_called_with(query)
+    query = f"SELECT Name FROM {reader.db_table} WHERE City = 'Paris'"
+    assert reader.query_data(query).fetchall() == [('Charlie',)]
+
+@pytest.mark.parametrize('engine', ['duckdb', 'polars', 'pyarrow'])
+def test_typed_to_arrow_table(sample_csv_file, engine):
+    """Test that typed mode reads native types with either engine."""
+    reader = CSVReader(sample_csv_file, engine=engine, typed=True)
+    table = reader.to_arrow_table()
+    assert str(table.schema.field('Age').type) == 'int64'
+    assert str(table.schema.field('Name').type) in ('string', 'large_string')
+
+@pytest.mark.parametrize('engine', ['duckdb', 'polars', 'pyarrow'])
+def test_dtypes_override(sample_csv_file, engine):
+    """Test that dtypes override individual inferred column types."""
+    reader = CSVReader(sample_csv_file, engine=engine, dtypes={'Age': 'DOUBLE'})
+    assert reader.typed
+    assert reader.schema == {'Name': 'VARCHAR', 'Age': 'DOUBLE', 'City': 'VARCHAR'}
+    assert str(reader.to_arrow_table().schema.field('Age').type) == 'double'
+
+@pytest.mark.parametrize('engine', ['duckdb', 'polars', 'pyarrow'])
+def test_typed_non_iso_dates(tmp_path, engine):
+    """Test that typed mode parses dates in the sniffed non-ISO format with every engine."""
+    filepath = tmp_path / 'dates.csv'
+    filepath.write_text('id,day\n1,01/02/2024\n2,12/31/2023\n')
+    reader = CSVReader(filepath, engine=engine, typed=True)
+    expected = [date(2024, 1, 2), date(2023, 12, 31)]
+    assert reader.to_dataframe()['day'].to_list() == expected
+    assert reader.to_arrow_table().column('day').to_pylist() == expected
+    assert reader.to_record_batch_reader().read_all().column('day').to_pylist() == expected
+
+def test_untyped_reads_text(sample_csv_file):
+    """Test that the DuckDB engine reads every column as text without typed mode."""
+    reader = CSVReader(sample_csv_file, engine='duckdb')
+    assert reader.schema is None
+    assert str(reader.to_arrow_table().schema.field('Age').type) == 'string'
+
+@pytest.mark.parametrize('engine', ['duckdb', 'polars'])
+def test_file_set(tmp_path, engine):
+    """Test that a glob of shards is read as one dataset."""
+    for i in range(3):
+        (tmp_path / f'shard_{i}.csv').write_text(f'Name,Age\nPerson{i},{20 + i}\n')
+    reader = CSVReader(str(tmp_path / 'shard_*.csv'), engine=engine)
+    assert reader.is_file_set
+    assert reader.to_arrow_table().num_rows == 3
+    query = f"SELECT COUNT(DISTINCT filename) FROM {reader.db_table}"
+    assert reader.query_data(query).fetchone()[0] == 3
+
+def test_bracketed_filename_is_not_a_file_set(tmp_path):
+    """Test that an existing file whose name has glob characters is read as one file."""
+    filepath = tmp_path / 'data[1].csv'
+    filepath.write_text('Name,Age\nAlice,25\n')
+    reader = CSVReader(str(filepath), engine='pyarrow')
+    assert not reader.is_file_set
+    assert reader.to_arrow_table().num_rows == 1
+
+def test_pyarrow_file_set(tmp_path):
+    """Test that the pyarrow engine rejects file sets."""
+    for i in range(2):
+        (tmp_path / f'shard_{i}.csv').write_text(f'Name,Age\nPerson{i},{20 + i}\n')
+    with pytest.raises(ValueError, match='single file'):
+        CSVReader(str(tmp_path / 'shard_*.csv'), engine='pyarrow')
+
+def test_pyarrow_record_batch_reader_closes_file(sample_csv_file):
+    """Test that the pyarrow engine closes the memory map once the reader is exhausted."""
+    source = pa.memory_map(str(sample_csv_file))
+    reader = CSVReader(sample_csv_file, engine='pyarrow')
+    with patch.object(CSVReaderPyArrowEngine, '_source', return_value=source):
+        batches = reader.to_record_batch_reader()
+        assert not source.closed
+        assert batches.read_all().num_rows == 3
+    assert source.closed
+
+def test_pyarrow_dialect(tmp_path):
+    """Test that the pyarrow engine honors the detected delimiter and quoting."""
+    filepath = tmp_path / 'dialect.csv'
+    filepath.write_text('id;note\n1;"two\nlines; quoted"\n2;"say ""hi"""\n3;\n', encoding='utf-8')
+    reader = CSVReader(str(filepath), engine='pyarrow')
+    assert reader.to_dicts() == [{'id': '1', 'note': 'two\nlines; quoted'},
+                                 {'id': '2', 'note': 'say "hi"'},
+                                 {'id': '3', 'note': None}]
+
+def test_auto_engine(sample_csv_file):
+    """Test that the auto engine chooses and reports an engine per operation."""
+    reader = CSVReader(sample_csv_file, engine='auto')
+    assert len(reader.to_dicts()) == 3
+    assert reader.engine_choice['operation'] == 'to_dicts'
+    assert reader.engine_choice['engine'] == 'polars'
+
+def test_query_data_reuses_table(tmp_path):
+    """Test that repeated queries reuse the imported table until the file changes."""
+    filepath = tmp_path / 'reused.csv'
+    filepath.write_text('id,name\n1,a\n2,b\n', encoding='utf-8')
+    reader = CSVReader(str(filepath))
+    query = f"SELECT COUNT(*) FROM {reader.db_table}"
+    assert reader.query_data(query).fetchone()[0] == 2
+    assert not reader._register_table(DuckDBQueries(reader.filepath))
+    filepath.write_text('id,name\n1,a\n2,b\n3,c\n', encoding='utf-8')
+    os.utime(filepath, ns=(0, 10 ** 18))
+    assert reader.query_data(query).fetchone()[0] == 3
+
+def test_query_data_view(tmp_path):
+    """Test that query_data can register the file as a view instead of a table."""
+    filepath = tmp_path / 'viewed.csv'
+    filepath.write_text('id,name\n1,a\n2,b\n', encoding='utf-8')
+    reader = CSVReader(str(filepath))
+    query = f"SELECT COUNT(*) FROM {reader.db_table}"
+    assert reader.query_data(query).fetchone()[0] == 2
+    assert reader.query_data(query, materialize=False).fetchone()[0] == 2
+    table_type = reader.query_data(
+        f"SELECT table_type FROM information_schema.tables "
+        f"WHERE table_name = '{reader.db_table}'", materialize=False).fetchone()[0]
+    assert table_type == 'VIEW'
+
+def test_read_new_rows(tmp_path):
+    """Test that read_new_rows returns only the rows appended since the last call."""
+    filepath = tmp_path / 'events.csv'
+    filepath.write_text('id,name\n1,a\n2,b\n', encoding='utf-8')
+    state_file = str(tmp_path / 'events.json')
+    reader = CSVReader(str(filepath))
+    assert reader.read_new_rows(state_file)['id'].to_list() == ['1', '2']
+    with open(filepath, 'a', encoding='utf-8') as csv_file:
+        csv_file.write('3,c\n')
+    assert reader.read_new_rows(state_file)['id'].to_list() == ['3']
+    assert reader.read_new_rows(state_file).is_empty()
+
+def test_append_new_rows(tmp_path):
+    """Test that append_new_rows loads the file once and then appends new rows."""
+    filepath = tmp_path / 'appended.csv'
+    filepath.write_text('id,name\n1,a\n2,b\n', encoding='utf-8')
+    state_file = str(tmp_path / 'appended.json')
+    reader = CSVReader(str(filepath))
+    assert reader.append_new_rows(state_file) == 2
+    with open(filepath, 'a', encoding='utf-8') as csv_file:
+        csv_file.write('3,c\n')
+    assert reader.append_new_rows(state_file) == 1
+    connection = DuckDBQueries(reader.filepath).database_connection
+    assert connection.sql(f'SELECT COUNT(*) FROM {reader.db_table}').fetchone()[0] == 3
+
+@pytest.mark.parametrize('engine', ['duckdb', 'polars', 'pyarrow'])
+def test_split_and_read_range(tmp_path, engine):
+    """Test that the ranges of split read back every row exactly once."""
+    filepath = tmp_path / 'split.csv'
+    rows = ''.join(f'{i},"note\nwith, comma"\n' for i in range(200))
+    filepath.write_text('id,note\n' + rows, encoding='utf-8')
+    reader = CSVReader(str(filepath), engine=engine)
+    ranges = reader.split(n_chunks=4)
+    assert len(ranges) == 4
+    ids = []
+    for start, end in ranges:
+        dataframe = reader.read_range(start, end)
+        assert dataframe.columns == ['id', 'note']
+        ids.extend(dataframe['id'].to_list())
+    assert ids == [str(i) for i in range(200)]
+
+def test_split_requires_size(sample_csv_file):
+    """Test that split without a size names its own parameters in the error."""
+    with pytest.raises(ValueError, match='n_chunks or target_bytes'):
+        CSVReader(sample_csv_file).split()
+
+@pytest.mark.parametrize('engine', ['duckdb', 'polars', 'pyarrow'])
+def test_to_record_batch_reader(sample_csv_file, engine):
+    """Test if the reader streams bounded record batches through PyArrow."""
+    reader = CSVReader(sample_csv_file, engine=engine)
+    batches = list(reader.to_record_batch_reader(batch_size=2))
+    assert [batch.num_rows for batch in batches] == [2, 1]
+    assert batches[0].schema.names == ['Name', 'Age', 'City']
+
+@pytest.mark.parametrize('engine', ['duckdb', 'polars', 'pyarrow'])
+def test_arrow_c_stream(sample_csv_file, engine):
+    """Test if Arrow consumers import the reader through the PyCapsule stream protocol."""
+    reader = CSVReader(sample_csv_file, engine=engine)
+    table = pa.RecordBatchReader.from_stream(reader).read_all()
+    assert table.num_rows == 3
+    assert table.column('Name').to_pylist() == ['Alice', 'Bob', 'Charlie']
+
+def test_record_batch_reader_header_only(tmp_path):
+    """Test if a file without rows streams its columns and no rows."""
+    filepath = tmp_path / 'empty_rows.csv'
+    filepath.write_text('id,name\n', encoding='utf-8')
+    table = CSVReader(filepath, engine='polars').to_record_batch_reader().read_all()
+    assert table.schema.names == ['id', 'name']
+    assert table.num_rows == 0
@@ -2,6 +2,8 @@
 
 import pytest
 import polars as pl
+import pyarrow as pa
+import duckdb
 from unittest.mock import patch
 import sys
 import os
@@ -61,3 +63,18 @@ def test_to_dicts(csv_reader, sample_csv_file):
     for i, row in enumerate(dicts):
         for key in original_df.columns:
             assert row[key] == original_df[key][i]
+
+def test_iter_batches(csv_reader, sample_csv_file):
+    """Test if iter_batches streams the CSV file in bounded PyArrow record batches."""
+    _, original_df = sample_csv_file
+    batches = list(csv_reader.iter_batches(batch_size=2))
+    assert all(isinstance(batch, pa.RecordBatch) for batch in batches)
+    assert all(batch.num_rows <= 2 for batch in batches)
+    assert sum(batch.num_rows for batch in batches) == len(original_df)
+
+def test_to_relation(csv_reader):
+    """Test if to_relation returns an unmaterialized DuckDB relation."""
+    relation = csv_reader.to_relation()
+    assert isinstance(relation, duckdb.DuckDBPyRelation)
+    result = relation.filter("City = 'London'").project('Name').fetchall()
+    assert result == [('Bob',)]
@@ -51,3 +51,20 @@ def test_to_dicts(csv_reader, sample_csv_file):
     for i, row in enumerate(dicts):
         for key in original_df.columns:
             assert row[key] == original_df[key][i]
+
+def test_iter_batches(csv_reader, sample_csv_file):
+    """Test if iter_batches streams the CSV file in bounded Polars dataframes."""
+    _, original_df = sample_csv_file
+    batches = list(csv_reader.iter_batches(batch_size=2))
+    assert all(isinstance(batch, pl.DataFrame) for batch in batches)
+    assert all(len(batch) <= 2 for batch in batches)
+    assert sum(len(batch) for batch in batches) == len(original_df)
+
+def test_to_lazyframe(csv_reader, sample_csv_file):
+    """Test if to_lazyframe returns a Polars lazyframe with pushed down selects and filters."""
+    _, original_df = sample_csv_file
+    lazyframe = csv_reader.to_lazyframe()
+    assert isinstance(lazyframe, pl.LazyFrame)
+    df = lazyframe.select('Name', 'Age').filter(pl.col('Age') > 26).collect()
+    assert df.columns == ['Name', 'Age']
+    assert df['Name'].to_list() == ['Bob', 'Charlie']
@@ -1,7 +1,10 @@
 """Unit tests for CSVWriter."""
 
+from datetime import date
 import os
 import pytest
+import polars as pl
+import pyarrow.parquet as pq
 from src.datagrunt.csvfile import CSVWriter
 
 @pytest.fixture
@@ -30,7 +33,7 @@ def test_invalid_engine(sample_csv_file):
     """Test that an error is raised for an invalid writer engine."""
     with pytest.raises(ValueError) as exc_info:
         CSVWriter(sample_csv_file, engine='invalid')
-    assert str(exc_info.value) == """Writer engine 'invalid' is not 'duckdb' or 'polars'. Pass either 'duckdb' or 'polars' as valid engine params."""
+    assert str(exc_info.value) == """Writer engine 'invalid' is not 'duckdb', 'polars', 'pyarrow' or 'auto'. Pass 'duckdb', 'polars', 'pyarrow' or 'auto' as valid engine params."""
 
 def test_write_csv_polars(sample_csv_file, output_files):
     """Test that the write_csv method calls the Polars engine."""
@@ -91,3 +94,134 @@ def test_write_parquet_duckdb(sample_csv_file, output_files):
     writer = CSVWriter(sample_csv_file, engine='duckdb')
     writer.write_parquet(out_filename=output_files['parquet'])
     assert os.path.exists(output_files['parquet'])
+
+@pytest.mark.parametrize('engine', ['duckdb', 'polars', 'pyarrow'])
+def test_write_parquet_typed(sample_csv_file, output_files, engine):
+    """Test that typed mode writes native Parquet column types with either engine."""
+    writer = CSVWriter(sample_csv_file, engine=engine, typed=True)
+    writer.write_parquet(out_filename=output_files['parquet'])
+    assert pl.read_parquet_schema(output_files['parquet'])['Age'] == pl.Int64
+
+@pytest.mark.parametrize('engine', ['duckdb', 'polars'])
+def test_write_parquet_file_set(tmp_path, output_files, engine):
+    """Test that a list of shards is converted into one output file."""
+    shards = []
+    for i in range(3):
+        shard = tmp_path / f'shard_{i}.csv'
+        shard.write_text(f'Name,Age\nPerson{i},{20 + i}\n')
+        shards.append(shard)
+    writer = CSVWriter(shards, engine=engine)
+    writer.write_parquet(out_filename=output_files['parquet'])
+    assert pl.read_parquet(output_files['parquet']).height == 3
+
+@pytest.mark.parametrize('engine', ['duckdb', 'polars', 'pyarrow'])
+def test_write_parquet_partitioned(sample_csv_file, tmp_path, engine):
+    """Test that partition_by writes a Hive-partitioned directory."""
+    out_dir = tmp_path / 'partitioned'
+    writer = CSVWriter(sample_csv_file, engine=engine)
+    writer.write_parquet(out_filename=out_dir, partition_by='City')
+    assert sorted(path.name for path in out_dir.iterdir()) == [
+        'City=London', 'City=New%20York', 'City=Paris']
+    df = pl.read_parquet(out_dir / '**' / '*.parquet', hive_partitioning=True)
+    assert sorted(df['Name'].to_list()) == ['Alice', 'Bob', 'Charlie']
+
+@pytest.mark.parametrize('engine', ['duckdb', 'polars', 'pyarrow'])
+def test_write_parquet_tuned(tmp_path, output_files, engine):
+    """Test that row group size and compression are applied."""
+    filepath = tmp_path / 'large.csv'
+    with open(filepath, 'w') as f:
+        f.write('Name,Age\n')
+        for i in range(10_000):
+            f.write(f'Person{i},{i % 90}\n')
+    writer = CSVWriter(filepath, engine=engine)
+    writer.write_parquet(out_filename=output_files['parquet'], row_group_size=2048,
+                         compression='zstd', compression_level=9)
+    metadata = pq.ParquetFile(output_files['parquet']).metadata
+    assert metadata.num_row_groups == 5
+    assert metadata.row_group(0).column(0).compression == 'ZSTD'
+
+@pytest.mark.parametrize('engine', ['duckdb', 'polars', 'pyarrow'])
+@pytest.mark.parametrize('partition_by', [None, 'City'])
+def test_write_parquet_max_file_size(tmp_path, engine, partition_by):
+    """Test that max_file_size splits the output into several files."""
+    filepath = tmp_path / 'large.csv'
+    with open(filepath, 'w') as f:
+        f.write('Name,Age,City\n')
+        for i in range(20_000):
+            f.write(f'Person{i},{i % 90},City{i % 2}\n')
+    out_dir = tmp_path / 'capped'
+    writer = CSVWriter(filepath, engine=engine)
+    writer.write_parquet(out_filename=out_dir, partition_by=partition_by,
+                         max_file_size=64 * 1024)
+    files = list(out_dir.rglob('*.parquet'))
+    assert len(files) > 1
+    df = pl.read_parquet(out_dir / '**' / '*.parquet', hive_partitioning=bool(partition_by))
+    assert df.height == 20_000
+
+def test_write_parquet_auto(sample_csv_file, output_files):
+    """Test that the auto engine chooses and reports an engine per output."""
+    writer = CSVWriter(sample_csv_file, engine='auto')
+    writer.write_parquet(out_filename=output_files['parquet'])
+    assert pl.read_parquet(output_files['parquet']).height == 3
+    assert writer.engine_choice['operation'] == 'write_parquet'
+    assert writer.engine_choice['engine'] in ('duckdb', 'polars')
+
+def test_write_parquet_increment(tmp_path):
+    """Test that each increment writes only the appended rows as a new part."""
+    filepath = tmp_path / 'events.csv'
+    filepath.write_text('id,name\n1,a\n2,b\n')
+    out_dir = tmp_path / 'parts'
+    writer = CSVWriter(str(filepath))
+    first_part = writer.write_parquet_increment(str(out_dir))
+    assert writer.write_parquet_increment(str(out_dir)) is None
+    with open(filepath, 'a') as csv_file:
+        csv_file.write('3,c\n')
+    second_part = writer.write_parquet_increment(str(out_dir))
+    assert os.path.basename(first_part) == 'part-00000.parquet'
+    assert os.path.basename(second_part) == 'part-00001.parquet'
+    assert pq.read_table(second_part).column('id').to_pylist() == ['3']
+    assert pq.read_table(str(out_dir)).num_rows == 3
+
+def test_write_csv_same_output_across_engines(tmp_path):
+    """Test that every engine writes the same CSV, quoting only the fields that need it."""
+    filepath = tmp_path / 'quoted.csv'
+    filepath.write_text('Name,City,Note\nAlice,"New York, NY",\nBob,London,"say ""hi"""\n')
+    outputs = {}
+    for engine in ['duckdb', 'polars', 'pyarrow']:
+        out_filename = tmp_path / f'{engine}.csv'
+        CSVWriter(filepath, engine=engine).write_csv(out_filename=out_filename)
+        outputs[engine] = out_filename.read_text()
+    assert outputs['pyarrow'] == outputs['duckdb'] == outputs['polars']
+    assert outputs['pyarrow'].splitlines()[0] == 'Name,City,Note'
+
+@pytest.mark.parametrize('engine', ['duckdb', 'polars', 'pyarrow'])
+def test_write_parquet_row_group_size_larger_than_batches(tmp_path, output_files, engine):
+    """Test that row groups larger than the read batches are filled on every engine."""
+    filepath = tmp_path / 'large.csv'
+    with open(filepath, 'w') as f:
+        f.write('Name,Age\n')
+        for i in range(300_000):
+            f.write(f'Person{i},{i % 90}\n')
+    assert CSVWriter.DEFAULT_BATCH_SIZE < 250_000
+    writer = CSVWriter(filepath, engine=engine)
+    writer.write_parquet(out_filename=output_files['parquet'], row_group_size=250_000)
+    metadata = pq.ParquetFile(output_files['parquet']).metadata
+    row_groups = [metadata.row_group(i).num_rows for i in range(metadata.num_row_groups)]
+    assert sum(row_groups) == 300_000
+    if engine == 'duckdb':
+        # DuckDB rounds row groups up to whole vectors of 2048 rows
+        assert len(row_groups) == 2
+    else:
+        assert row_groups == [250_000, 50_000]
+
+@pytest.mark.parametrize('engine', ['duckdb', 'polars', 'pyarrow'])
+def test_write_typed_non_iso_dates(tmp_path, output_files, engine):
+    """Test that typed writes parse dates in the sniffed non-ISO format with every engine."""
+    filepath = tmp_path / 'dates.csv'
+    filepath.write_text('id,day\n1,01/02/2024\n2,12/31/2023\n')
+    writer = CSVWriter(filepath, engine=engine, typed=True)
+    writer.write_parquet(out_filename=output_files['parquet'])
+    assert pl.read_parquet(output_files['parquet'])['day'].to_list() == [date(2024, 1, 2),
+                                                                         date(2023, 12, 31)]
+    writer.write_excel(out_filename=output_files['excel'])
+    assert os.path.exists(output_files['excel'])
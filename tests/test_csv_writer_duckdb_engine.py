@@ -71,3 +71,14 @@ def test_write_parquet(csv_writer, output_files):
     """Test if write_parquet exports the correct Parquet file."""
     csv_writer.write_parquet(out_filename=output_files['parquet'])
     assert os.path.exists(output_files['parquet'])
+
+def test_write_parquet_single_pass(csv_writer, output_files):
+    """Test if write_parquet streams from the CSV without staging a DuckDB table."""
+    connection = csv_writer.queries.database_connection
+    connection.sql(f"DROP TABLE IF EXISTS {csv_writer.queries.database_table_name}")
+    csv_writer.write_parquet(out_filename=output_files['parquet'])
+    tables = connection.sql(
+        f"SELECT * FROM duckdb_tables() WHERE table_name = '{csv_writer.queries.database_table_name}'"
+    ).fetchall()
+    assert tables == []
+    assert connection.sql(f"SELECT COUNT(*) FROM '{output_files['parquet']}'").fetchone()[0] == 3
@@ -2,6 +2,8 @@
 
 import os
 import pytest
+import polars as pl
+from unittest.mock import patch
 from src.datagrunt.core.engines import CSVWriterPolarsEngine
 
 @pytest.fixture
@@ -71,3 +73,38 @@ def test_write_parquet(csv_writer, output_files):
     """Test if write_parquet exports the correct Parquet file."""
     csv_writer.write_parquet(out_filename=output_files['parquet'])
     assert os.path.exists(output_files['parquet'])
+
+def test_write_parquet_streams_without_dataframe(csv_writer, output_files):
+    """Test if write_parquet sinks the lazy scan instead of building an eager dataframe."""
+    with patch('src.datagrunt.core.engines.CSVReaderPolarsEngine.to_dataframe') as mock_to_dataframe:
+        csv_writer.write_parquet(out_filename=output_files['parquet'])
+        mock_to_dataframe.assert_not_called()
+    assert pl.read_parquet(output_files['parquet']).shape == (3, 3)
+
+def test_write_json_newline_delimited_streams(csv_writer, output_files):
+    """Test if write_json_newline_delimited writes one JSON object per row."""
+    csv_writer.write_json_newline_delimited(out_filename=output_files['ndjson'])
+    with open(output_files['ndjson']) as f:
+        assert len(f.readlines()) == 3
+
+@pytest.fixture
+def out_of_core():
+    """Fixture to enable out-of-core mode for one test."""
+    CSVWriterPolarsEngine.set_out_of_core('256MB')
+    yield
+    CSVWriterPolarsEngine.set_out_of_core()
+
+def test_write_json_batches(tmp_path):
+    """Test if JSON batches join into the same array an eager write produces."""
+    dataframes = [pl.DataFrame({'a': [1, 2]}), pl.DataFrame({'a': []}, schema={'a': pl.Int64}),
+                  pl.DataFrame({'a': [3]})]
+    filename = tmp_path / 'batches.json'
+    CSVWriterPolarsEngine.write_json_batches(filename, dataframes)
+    assert filename.read_text() == pl.concat(dataframes).write_json()
+
+def test_write_json_out_of_core(csv_writer, output_files, out_of_core):
+    """Test if write_json streams batches instead of building an eager dataframe."""
+    with patch('src.datagrunt.core.engines.CSVReaderPolarsEngine.to_dataframe') as mock_to_dataframe:
+        csv_writer.write_json(out_filename=output_files['json'])
+        mock_to_dataframe.assert_not_called()
+    assert pl.read_json(output_files['json']).shape == (3, 3)
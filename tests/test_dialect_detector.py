@@ -0,0 +1,60 @@
+"""Unit tests for DialectDetector."""
+
+import pytest
+from src.datagrunt.core.dialects import DialectDetector
+
+def test_detect_comma():
+    """Test if a comma delimiter is detected consistently across rows."""
+    detected = DialectDetector('Name,Age,City\nAlice,25,New York\nBob,30,London\n').detect()
+    assert detected['delimiter'] == ','
+    assert detected['quotechar'] == '"'
+    assert detected['confidence'] == 1.0
+
+def test_detect_ignores_delimiters_inside_quotes():
+    """Test if punctuation inside a quoted header does not win over the real delimiter."""
+    sample = '"a,b";"c,d,e";"f"\n1;2;3\n4;5;6\n'
+    detected = DialectDetector(sample).detect()
+    assert detected['delimiter'] == ';'
+    assert detected['confidence'] == 1.0
+
+def test_detect_quoted_newlines():
+    """Test if newlines inside quoted fields do not break row consistency."""
+    sample = 'id|note\n1|"line one\nline two"\n2|plain\n'
+    assert DialectDetector(sample).detect()['delimiter'] == '|'
+
+def test_detect_single_quotes():
+    """Test if a single quote character is detected when it wraps fields."""
+    sample = "id,name\n1,'Smith, John'\n2,'Doe, Jane'\n3,'Roe, Rick'\n"
+    detected = DialectDetector(sample).detect()
+    assert detected['delimiter'] == ','
+    assert detected['quotechar'] == "'"
+
+def test_detect_extra_candidate():
+    """Test if a delimiter outside the default candidates is picked up from the header."""
+    assert DialectDetector('a#b#c\n1#2#3\n').detect()['delimiter'] == '#'
+
+def test_detect_nothing():
+    """Test if a single column sample reports no delimiter."""
+    detected = DialectDetector('Name\nAlice\nBob\n').detect()
+    assert detected['delimiter'] is None
+    assert detected['confidence'] == 0.0
+
+def test_confidence_reflects_ragged_rows():
+    """Test if inconsistent rows lower the confidence."""
+    detected = DialectDetector('a,b,c\n1,2,3\n4,5\n6,7,8\n').detect()
+    assert detected['delimiter'] == ','
+    assert detected['confidence'] == 0.75
+
+def test_from_file_reads_bounded_sample(tmp_path):
+    """Test if only a bounded sample ending on a full row is read from the file."""
+    filepath = tmp_path / 'big.csv'
+    filepath.write_text('a,b\n' + '1,2\n' * 10_000)
+    detector = DialectDetector.from_file(filepath, sample_bytes=1001)
+    assert len(detector.sample) <= 1001
+    assert detector.sample.endswith('\n')
+    assert detector.detect()['delimiter'] == ','
+
+def test_detect_newline():
+    """Test if the newline sequence is detected."""
+    assert DialectDetector('a,b\r\n1,2\r\n').detect_newline() == '\r\n'
+    assert DialectDetector('a,b\n1,2\n').detect_newline() == '\n'
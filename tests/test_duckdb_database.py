@@ -1,21 +1,18 @@
-"""Unit tests for DuckDBDatabase."""
+"""Unit tests for DuckDBDatabase and DuckDBSession."""
 
+import gc
 import os
+import threading
 import pytest
 import duckdb
 
-from src.datagrunt.core.databases import DuckDBDatabase
+from src.datagrunt.core.databases import DuckDBDatabase, DuckDBSession
 
 @pytest.fixture
 def filepath():
     """Fixture to create a sample file path."""
     return 'path/to/--my_file.csv'
 
-@pytest.fixture
-def expected_db_filename():
-    """Fixture for expected database filename."""
-    return 'myfile.db'
-
 @pytest.fixture
 def expected_db_table():
     """Fixture for expected database table name."""
@@ -23,40 +20,99 @@ def expected_db_table():
 
 @pytest.fixture
 def db(filepath):
-    """Fixture to create and teardown a DuckDBDatabase instance."""
-    db_instance = DuckDBDatabase(filepath)
-    yield db_instance
-    db_filename = f'{filepath.replace("/", "_").replace(".", "_")}.db'
-    if os.path.exists(db_filename):
-        os.remove(db_filename)
-
-def test_init(db, filepath, expected_db_filename, expected_db_table):
+    """Fixture to create a DuckDBDatabase instance."""
+    return DuckDBDatabase(filepath)
+
+@pytest.fixture
+def database_file(tmp_path):
+    """Fixture for an explicitly placed database file that is closed after the test."""
+    database = str(tmp_path / 'session.duckdb')
+    yield database
+    DuckDBSession.close(database)
+
+def test_init(db, filepath, expected_db_table):
     """Test if the DuckDBDatabase class initializes correctly."""
     assert db.filepath == filepath
-    assert db.database_filename == expected_db_filename
     assert db.database_table_name == expected_db_table
     assert isinstance(db.database_connection, duckdb.DuckDBPyConnection)
 
-def test_del(filepath):
-    """Test if the database file is deleted when the object is destroyed."""
-    db = DuckDBDatabase(filepath)
-    db_filename = db.database_filename
-    assert os.path.exists(db_filename)
-    del db
-    assert not os.path.exists(db_filename)
+def test_init_creates_no_database_file(tmp_path, monkeypatch, filepath):
+    """Test if constructing a DuckDBDatabase does not create a .db file."""
+    monkeypatch.chdir(tmp_path)
+    DuckDBDatabase(filepath).database_connection
+    assert os.listdir(tmp_path) == []
 
 def test_format_filename_string(db, expected_db_table):
     """Test if the filename is formatted correctly."""
     assert db._format_filename_string() == expected_db_table
 
-def test_set_database_filename(db, expected_db_filename):
-    """Test if the database filename is set correctly."""
-    assert db._set_database_filename() == expected_db_filename
-
 def test_set_database_table_name(db, expected_db_table):
     """Test if the database table name is set correctly."""
     assert db._set_database_table_name() == expected_db_table
 
-def test_set_database_connection(db):
-    """Test if the database connection is established correctly."""
-    assert isinstance(db._set_database_connection(), duckdb.DuckDBPyConnection)
+def test_database_connection_is_shared(filepath):
+    """Test if every DuckDBDatabase shares one session connection per thread."""
+    first = DuckDBDatabase(filepath)
+    second = DuckDBDatabase('other.csv')
+    assert first.database_connection is second.database_connection
+
+def test_session_cursor_per_thread():
+    """Test if each thread gets its own cursor on the shared database."""
+    connection = DuckDBSession.connect()
+    connection.sql('CREATE OR REPLACE TABLE session_test AS SELECT 42 AS answer')
+    results = {}
+
+    def worker():
+        thread_connection = DuckDBSession.connect()
+        results['same'] = thread_connection is connection
+        results['answer'] = thread_connection.sql('SELECT answer FROM session_test').fetchone()[0]
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    thread.join()
+    assert results == {'same': False, 'answer': 42}
+    connection.sql('DROP TABLE session_test')
+
+def test_session_cursor_released_with_thread(database_file):
+    """Test if a thread's cursor is released once the thread is gone."""
+    DuckDBSession.connect(database_file)
+    thread = threading.Thread(target=DuckDBSession.connect, args=(database_file,))
+    thread.start()
+    thread.join()
+    assert len(DuckDBSession._cursors[database_file]) == 2
+    del thread
+    gc.collect()
+    assert len(DuckDBSession._cursors[database_file]) == 1
+
+def test_session_explicit_database(database_file, filepath):
+    """Test if a DuckDBDatabase can be placed in an explicit database file."""
+    db = DuckDBDatabase(filepath, database=database_file)
+    db.database_connection.sql('CREATE TABLE placed AS SELECT 1 AS x')
+    assert os.path.exists(database_file)
+    assert DuckDBSession.is_open(database_file)
+
+def test_session_close(database_file):
+    """Test if closing a session releases its connection."""
+    DuckDBSession.connect(database_file)
+    DuckDBSession.close(database_file)
+    assert not DuckDBSession.is_open(database_file)
+
+def test_session_scoped(database_file):
+    """Test if a scoped session closes its connection on exit."""
+    with DuckDBSession.scoped(database_file) as connection:
+        assert connection.sql('SELECT 1').fetchone()[0] == 1
+    assert not DuckDBSession.is_open(database_file)
+
+def test_session_configure(database_file):
+    """Test if settings apply to open connections and connections opened later."""
+    open_connection = DuckDBSession.connect()
+    DuckDBSession.configure(memory_limit='100MB')
+    try:
+        later_connection = DuckDBSession.connect(database_file)
+        for connection in (open_connection, later_connection):
+            limit = connection.sql("SELECT current_setting('memory_limit')").fetchone()[0]
+            assert limit.startswith('95.3')
+    finally:
+        DuckDBSession.configure(memory_limit=None)
+    limit = open_connection.sql("SELECT current_setting('memory_limit')").fetchone()[0]
+    assert not limit.startswith('95.3')
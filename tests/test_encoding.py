@@ -0,0 +1,95 @@
+"""Unit tests for Encoding."""
+
+import codecs
+import pytest
+from src.datagrunt.core.encoding import Encoding
+from src.datagrunt.csvfile import CSVReader, CSVWriter
+
+CSV_TEXT = 'id,name,note\n' + ''.join(f'{i},Café {i},"two\nlines"\n' for i in range(500))
+
+@pytest.fixture(params=['cp1252', 'utf-16', 'utf-16-le', 'utf-8-sig'])
+def encoded_csv(request, tmp_path):
+    """A CSV file with quoted newlines in each non-UTF-8 encoding."""
+    filepath = tmp_path / f'data_{request.param}.csv'
+    filepath.write_bytes(CSV_TEXT.encode(request.param))
+    return request.param, str(filepath)
+
+@pytest.mark.parametrize('sample, encoding', [
+    (codecs.BOM_UTF8 + b'a,b\n', 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE + 'a,b\n'.encode('utf-16-le'), 'utf-16'),
+    (codecs.BOM_UTF32_LE + 'a,b\n'.encode('utf-32-le'), 'utf-32'),
+    ('a,b\n1,é\n'.encode('utf-16-be'), 'utf-16-be'),
+    ('a,b\n1,café\n'.encode('utf-8'), 'utf-8'),
+    ('a,b\n1,caf'.encode('utf-8') + 'é'.encode('utf-8')[:1], 'utf-8'),
+    ('a,b\n1,€uro\n'.encode('cp1252'), 'cp1252'),
+    (b'a,b\n1,\x81\xe9\n', 'latin-1'),
+])
+def test_detect_bytes(sample, encoding):
+    """Test if byte order marks and byte statistics identify the encoding."""
+    assert Encoding.detect_bytes(sample) == encoding
+
+def test_open_transcodes_to_utf8(encoded_csv):
+    """Test if files stream back as UTF-8 without a byte order mark."""
+    encoding, filepath = encoded_csv
+    data = Encoding.read(filepath, encoding)
+    if encoding == 'utf-8-sig':
+        data = data[len(codecs.BOM_UTF8):]
+    assert data == CSV_TEXT.encode('utf-8')
+
+def test_ascii_compatible():
+    """Test if only single-byte punctuation encodings keep byte offsets usable."""
+    assert Encoding.is_ascii_compatible('cp1252')
+    assert Encoding.is_ascii_compatible('utf-8-sig')
+    assert not Encoding.is_ascii_compatible('utf-16')
+
+@pytest.mark.parametrize('engine', ['duckdb', 'polars', 'pyarrow'])
+def test_reader_decodes(encoded_csv, engine):
+    """Test if both engines read every encoding, counts included."""
+    encoding, filepath = encoded_csv
+    reader = CSVReader(filepath, engine=engine)
+    assert reader.encoding == encoding
+    assert reader.columns == ['id', 'name', 'note']
+    assert reader.row_count_without_header == 500
+    dataframe = reader.to_dataframe()
+    assert dataframe['name'][1] == 'Café 1'
+    assert dataframe['note'][0] == 'two\nlines'
+    assert sum(len(batch) for batch in reader.iter_batches(batch_size=120)) == 500
+
+def test_typed_reader_and_query(encoded_csv):
+    """Test if typed reads and query_data work on transcoded files."""
+    _, filepath = encoded_csv
+    reader = CSVReader(filepath, engine='duckdb', typed=True)
+    assert reader.to_dataframe()['id'].sum() == sum(range(500))
+    query = f'SELECT count(*) FROM {reader.db_table}'
+    assert reader.query_data(query, materialize=False).fetchone()[0] == 500
+    assert reader.query_data(query, materialize=False).fetchone()[0] == 500
+
+def test_split_by_encoding(encoded_csv):
+    """Test if single-byte encodings split into ranges and UTF-16 is refused."""
+    encoding, filepath = encoded_csv
+    reader = CSVReader(filepath)
+    if Encoding.is_ascii_compatible(encoding):
+        ranges = reader.split(n_chunks=3)
+        assert sum(len(reader.read_range(start, end)) for start, end in ranges) == 500
+    else:
+        with pytest.raises(ValueError, match='encoding'):
+            reader.split(n_chunks=3)
+
+def test_transcoded_values_and_ragged_rows(tmp_path):
+    """Test if DuckDB reads of transcoded files keep literal NA values, honor the quote
+    character and pad short rows like UTF-8 reads."""
+    filepath = tmp_path / 'ragged.csv'
+    filepath.write_bytes("id;name;note\n1;Café;NA\n2;'semi;colon';NULL\n3;Noël\n".encode('cp1252'))
+    reader = CSVReader(str(filepath), engine='duckdb')
+    assert reader.encoding == 'cp1252'
+    assert reader.to_dicts() == [{'id': '1', 'name': 'Café', 'note': 'NA'},
+                                 {'id': '2', 'name': 'semi;colon', 'note': 'NULL'},
+                                 {'id': '3', 'name': 'Noël', 'note': None}]
+
+def test_transcoded_writes_keep_values(tmp_path):
+    """Test if DuckDB writes of transcoded files keep literal NA values."""
+    filepath = tmp_path / 'notes.csv'
+    filepath.write_bytes('id,note\n1,NA\n2,\n3,Déjà\n'.encode('cp1252'))
+    out_filename = tmp_path / 'out.csv'
+    CSVWriter(str(filepath), engine='duckdb').write_csv(str(out_filename))
+    assert out_filename.read_text(encoding='utf-8') == 'id,note\n1,NA\n2,\n3,Déjà\n'
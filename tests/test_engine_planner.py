@@ -0,0 +1,51 @@
+"""Unit tests for EnginePlanner."""
+
+import pytest
+from src.datagrunt.core.planner import EnginePlanner
+
+GB = 1024 ** 3
+
+def test_small_file_uses_polars():
+    """Test if small files use Polars for every operation."""
+    planner = EnginePlanner(10 * 1024 ** 2, 5, cpu_count=32, available_memory=16 * GB)
+    for operation in ['to_dicts', 'iter_batches', 'write_parquet', 'write_json']:
+        assert planner.choose(operation)['engine'] == 'polars'
+
+def test_large_narrow_file_streams_with_duckdb():
+    """Test if large narrow files stream through DuckDB on many CPUs."""
+    planner = EnginePlanner(20 * GB, 5, cpu_count=32, available_memory=16 * GB)
+    choice = planner.choose('write_parquet')
+    assert choice['engine'] == 'duckdb'
+    assert '32 CPUs' in choice['reason']
+    assert planner.choose('to_dicts')['engine'] == 'polars'
+
+@pytest.mark.parametrize('cpu_count, column_count', [(2, 5), (32, 200)])
+def test_large_file_without_parallel_gain_uses_polars(cpu_count, column_count):
+    """Test if large files stay on Polars with few CPUs or many columns."""
+    planner = EnginePlanner(20 * GB, column_count, cpu_count=cpu_count,
+                            available_memory=128 * GB)
+    assert planner.choose('write_parquet')['engine'] == 'polars'
+
+def test_eager_output_over_memory_uses_duckdb():
+    """Test if an output Polars would materialize uses DuckDB when memory is short."""
+    planner = EnginePlanner(8 * GB, 5, cpu_count=2, available_memory=4 * GB)
+    choice = planner.choose('write_json')
+    assert choice['engine'] == 'duckdb'
+    assert '4.0 GB' in choice['reason']
+
+def test_unknown_memory_fits():
+    """Test if unknown available memory is treated as unlimited."""
+    planner = EnginePlanner(8 * GB, 5, cpu_count=2, available_memory=None)
+    planner.available_memory = None
+    assert planner.fits_in_memory
+
+def test_compression_duckdb_cannot_read_uses_polars():
+    """Test if bz2 and xz files stay on Polars, which DuckDB cannot decompress."""
+    planner = EnginePlanner(20 * GB, 5, cpu_count=32, available_memory=16 * GB,
+                            compression='bz2')
+    choice = planner.choose('write_parquet')
+    assert choice['engine'] == 'polars'
+    assert 'bz2' in choice['reason']
+    gzip_planner = EnginePlanner(20 * GB, 5, cpu_count=32, available_memory=16 * GB,
+                                 compression='gzip')
+    assert gzip_planner.choose('write_parquet')['engine'] == 'duckdb'
@@ -0,0 +1,53 @@
+"""Unit tests for ExcelWriter."""
+
+import re
+import zipfile
+import pyarrow as pa
+import polars as pl
+import pytest
+from src.datagrunt.core.excel import ExcelWriter
+
+def sheet_row_counts(filepath):
+    """Return the number of rows in each sheet of a workbook, in sheet order."""
+    with zipfile.ZipFile(filepath) as workbook:
+        names = sorted((name for name in workbook.namelist()
+                        if re.match(r'xl/worksheets/sheet\d+\.xml', name)),
+                       key=lambda name: int(re.findall(r'\d+', name)[0]))
+        return [len(re.findall(r'<row ', workbook.read(name).decode())) for name in names]
+
+@pytest.fixture
+def batches():
+    """Fixture for a stream of 10 rows in three record batches."""
+    table = pa.table({'Name': [f'Person{i}' for i in range(10)], 'Age': list(range(10))})
+    return pa.RecordBatchReader.from_batches(table.schema, table.to_batches(max_chunksize=4))
+
+def test_write_single_sheet(tmp_path, batches):
+    """Test if rows under the limit are written to one sheet with a header."""
+    writer = ExcelWriter(tmp_path / 'out.xlsx')
+    writer.write(batches)
+    assert writer.sheet_count == 1
+    assert writer.row_count == 10
+    assert sheet_row_counts(tmp_path / 'out.xlsx') == [11]
+
+def test_write_rolls_over_sheets(tmp_path, batches):
+    """Test if a new sheet with a header is started at the row limit."""
+    writer = ExcelWriter(tmp_path / 'out.xlsx', row_limit=4)
+    writer.write(batches)
+    assert writer.sheet_count == 4
+    assert sheet_row_counts(tmp_path / 'out.xlsx') == [4, 4, 4, 2]
+
+def test_write_dataframes(tmp_path):
+    """Test if Polars dataframes are streamed into the workbook."""
+    dataframes = [pl.DataFrame({'Name': ['Alice', 'Bob'], 'City': ['=1+1', 'Paris']}),
+                  pl.DataFrame({'Name': ['Charlie'], 'City': [None]})]
+    writer = ExcelWriter(tmp_path / 'out.xlsx')
+    writer.write_dataframes(dataframes)
+    assert writer.row_count == 3
+    with zipfile.ZipFile(tmp_path / 'out.xlsx') as workbook:
+        assert b'<f>' not in workbook.read('xl/worksheets/sheet1.xml')
+
+def test_write_empty(tmp_path):
+    """Test if an empty stream writes a sheet with only the header."""
+    writer = ExcelWriter(tmp_path / 'out.xlsx')
+    writer.write_dataframes([], columns=['Name', 'Age'])
+    assert sheet_row_counts(tmp_path / 'out.xlsx') == [1]
@@ -0,0 +1,54 @@
+"""Unit tests for IncrementalState."""
+
+import pytest
+from src.datagrunt.core.incremental import IncrementalState
+
+@pytest.fixture
+def log_file(tmp_path):
+    """Fixture to create an append-only CSV file."""
+    filepath = tmp_path / 'log.csv'
+    filepath.write_text('id,event\n1,start\n2,"multi\nline"\n')
+    return filepath
+
+@pytest.fixture
+def state_file(tmp_path):
+    """Fixture for the state file path."""
+    return tmp_path / 'state' / 'log.json'
+
+def test_first_read_covers_whole_file(log_file, state_file):
+    """Test if a file without saved state is read from the start."""
+    state = IncrementalState(log_file, state_file)
+    assert state.pending() == (0, log_file.stat().st_size, 2)
+
+def test_advance_then_append(log_file, state_file):
+    """Test if only appended complete records are pending after saving progress."""
+    state = IncrementalState(log_file, state_file)
+    state.advance(*state.pending())
+    size = log_file.stat().st_size
+    with open(log_file, 'a') as csv_file:
+        csv_file.write('3,stop\n4,partial')
+    state = IncrementalState(log_file, state_file)
+    assert state.rows == 2
+    start, end, rows = state.pending()
+    assert (start, end, rows) == (size, size + len('3,stop\n'), 1)
+    with state.new_rows_file(start, end) as new_rows_path:
+        with open(new_rows_path) as new_rows:
+            assert new_rows.read() == 'id,event\n3,stop\n'
+    state.advance(start, end, rows)
+    assert IncrementalState(log_file, state_file).rows == 3
+
+def test_replaced_file_starts_over(log_file, state_file):
+    """Test if a rewritten file is read from the start again."""
+    state = IncrementalState(log_file, state_file)
+    state.advance(*state.pending())
+    log_file.write_text('id,event\n9,other\n8,rewritten\n7,longer\n')
+    state = IncrementalState(log_file, state_file)
+    assert state.offset == 0
+    assert state.pending()[2] == 3
+
+def test_truncated_file_starts_over(log_file, state_file):
+    """Test if a file shorter than the saved offset is read from the start again."""
+    state = IncrementalState(log_file, state_file)
+    state.advance(*state.pending())
+    log_file.write_text('id,event\n')
+    assert IncrementalState(log_file, state_file).offset == 0
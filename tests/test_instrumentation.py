@@ -0,0 +1,136 @@
+"""Unit tests for Instrumentation hooks."""
+
+import os
+import time
+import pytest
+from src.datagrunt.core.instrumentation import Instrumentation
+from src.datagrunt.csvfile import CSVReader, CSVWriter
+
+@pytest.fixture
+def csv_file(tmp_path):
+    """A small CSV file unique to the test, so nothing is cached for it."""
+    filepath = tmp_path / f'{os.urandom(4).hex()}.csv'
+    filepath.write_text('id,name\n1,a\n2,b\n3,c\n', encoding='utf-8')
+    return str(filepath)
+
+@pytest.fixture(autouse=True)
+def no_hooks():
+    """Leave no hooks or profiling behind for other tests."""
+    yield
+    Instrumentation.clear_hooks()
+    Instrumentation.set_duckdb_profiling(False)
+
+def test_stage_without_hooks_emits_nothing():
+    """Test if stages skip timing when no hook is registered."""
+    assert not Instrumentation.is_enabled()
+    with Instrumentation.stage('read', engine='polars') as event:
+        pass
+    assert event['seconds'] is None
+
+def test_collect_records_stage_fields():
+    """Test if collected events carry the stage, timing and the fields set in the block."""
+    with Instrumentation.collect() as events:
+        with Instrumentation.stage('read', filepath='a.csv', engine='polars') as event:
+            event['rows'] = 3
+    assert len(events) == 1
+    assert events[0]['stage'] == 'read'
+    assert events[0]['rows'] == 3
+    assert events[0]['seconds'] >= 0
+    assert events[0]['error'] is None
+    assert not Instrumentation.is_enabled()
+
+def test_stage_records_error():
+    """Test if a failing stage reports its error and re-raises it."""
+    with Instrumentation.collect() as events:
+        with pytest.raises(ValueError):
+            with Instrumentation.stage('write'):
+                raise ValueError('boom')
+    assert events[0]['error'] == 'ValueError: boom'
+
+def test_failing_hook_does_not_break_stage():
+    """Test if a failing hook only warns and later hooks still run."""
+    def broken_hook(event):
+        raise RuntimeError('exporter down')
+
+    Instrumentation.add_hook(broken_hook)
+    with Instrumentation.collect() as events:
+        with Instrumentation.stage('read'):
+            pass
+    assert len(events) == 1
+
+def test_untimed_block_left_out_of_seconds():
+    """Test if time spent in an untimed block is not reported as stage time."""
+    with Instrumentation.collect() as events:
+        with Instrumentation.stage('write') as event:
+            with Instrumentation.untimed(event):
+                time.sleep(0.2)
+    assert events[0]['seconds'] < 0.1
+    assert Instrumentation.UNTIMED_FIELD not in events[0]
+
+def test_reader_and_dialect_detection_events(csv_file):
+    """Test if reading a file reports dialect detection and the read."""
+    with Instrumentation.collect() as events:
+        dataframe = CSVReader(csv_file, engine='polars').to_dataframe()
+    stages = {event['stage']: event for event in events}
+    assert stages['detect_dialect']['bytes_read'] > 0
+    read = stages['read']
+    assert read['engine'] == 'polars'
+    assert read['operation'] == 'to_dataframe'
+    assert read['rows'] == len(dataframe) == 3
+    assert read['bytes_read'] == os.path.getsize(csv_file)
+
+def test_iter_batches_event_counts_rows(csv_file):
+    """Test if the batch read stage ends with the last batch and counts its rows."""
+    reader = CSVReader(csv_file, engine='duckdb')
+    with Instrumentation.collect() as events:
+        batches = list(reader.iter_batches(batch_size=2))
+    assert sum(len(batch) for batch in batches) == 3
+    assert events[-1]['operation'] == 'iter_batches'
+    assert events[-1]['rows'] == 3
+
+@pytest.mark.parametrize('engine', ['duckdb', 'polars', 'pyarrow'])
+def test_writer_event(csv_file, tmp_path, engine):
+    """Test if writes report rows and bytes written."""
+    out_filename = str(tmp_path / 'out.parquet')
+    writer = CSVWriter(csv_file, engine=engine)
+    with Instrumentation.collect() as events:
+        writer.write_parquet(out_filename)
+    event = events[-1]
+    assert event['stage'] == 'write'
+    assert event['engine'] == engine
+    assert event['rows'] == 3
+    assert event['bytes_written'] == os.path.getsize(out_filename)
+
+@pytest.mark.parametrize('engine', ['duckdb', 'polars', 'pyarrow'])
+@pytest.mark.parametrize('operation,extension', [('write_csv', 'csv'), ('write_excel', 'xlsx'),
+                                                 ('write_json', 'json'),
+                                                 ('write_json_newline_delimited', 'jsonl')])
+def test_writer_reports_rows_without_rescanning(csv_file, tmp_path, engine, operation,
+                                                extension):
+    """Test if writes take the row count from the engine instead of rescanning the input."""
+    writer = CSVWriter(csv_file, engine=engine)
+    out_filename = str(tmp_path / f'out.{extension}')
+    with Instrumentation.collect() as events:
+        rows = getattr(writer, operation)(out_filename)
+    # only Polars' streaming sinks do not report how many rows they wrote
+    if rows is None:
+        assert engine == 'polars'
+    else:
+        assert rows == 3
+    assert events[-1]['rows'] == 3
+
+def test_duckdb_profile_captured(csv_file):
+    """Test if DuckDB stages carry DuckDB's JSON profile when profiling is enabled."""
+    reader = CSVReader(csv_file, engine='duckdb')
+    Instrumentation.set_duckdb_profiling()
+    with Instrumentation.collect() as events:
+        reader.to_arrow_table()
+    assert isinstance(events[-1]['profile'], dict)
+
+def test_record_batch_reader_event(csv_file):
+    """Test if the stage of a record batch reader ends when the reader is consumed."""
+    reader = CSVReader(csv_file, engine='polars')
+    with Instrumentation.collect() as events:
+        reader.to_record_batch_reader().read_all()
+    assert events[-1]['operation'] == 'to_record_batch_reader'
+    assert events[-1]['rows'] == 3
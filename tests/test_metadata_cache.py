@@ -0,0 +1,31 @@
+"""Unit tests for MetadataCache."""
+
+import pytest
+from src.datagrunt.core.cache import MetadataCache
+
+@pytest.fixture
+def cache(tmp_path):
+    """Fixture to create a MetadataCache in a temporary directory."""
+    return MetadataCache(tmp_path / 'cache')
+
+@pytest.fixture
+def fingerprint():
+    """Fixture for a sample file fingerprint."""
+    return ('/data/file.csv', 1024, 1_700_000_000_000_000_000)
+
+def test_get_missing(cache, fingerprint):
+    """Test if a missing entry returns None."""
+    assert cache.get(fingerprint) is None
+
+def test_update_and_get(cache, fingerprint):
+    """Test if stored metadata is returned and merged on update."""
+    cache.update(fingerprint, {'delimiter': ','})
+    cache.update(fingerprint, {'row_count_with_header': 10})
+    assert cache.get(fingerprint) == {'delimiter': ',', 'row_count_with_header': 10}
+
+def test_fingerprint_change_misses(cache, fingerprint):
+    """Test if a changed size or mtime does not return the old entry."""
+    cache.update(fingerprint, {'delimiter': ','})
+    path, size, mtime = fingerprint
+    assert cache.get((path, size + 1, mtime)) is None
+    assert cache.get((path, size, mtime + 1)) is None
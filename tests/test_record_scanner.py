@@ -0,0 +1,116 @@
+"""Unit tests for RecordScanner."""
+
+from collections import OrderedDict
+from unittest.mock import patch
+import pytest
+from src.datagrunt.core.compression import Compression
+from src.datagrunt.core.records import RecordScanner
+
+@pytest.fixture
+def quoted_csv_file(tmp_path):
+    """Fixture to create a CSV file with newlines inside quoted fields."""
+    filepath = tmp_path / 'quoted.csv'
+    rows = ['id,comment\n']
+    for i in range(500):
+        rows.append(f'{i},"line one\nline ""two""\nline three"\n')
+    filepath.write_text(''.join(rows))
+    return filepath
+
+def test_count_records_plain(tmp_path):
+    """Test if records are counted for a file without quotes."""
+    filepath = tmp_path / 'plain.csv'
+    filepath.write_text('a,b\n1,2\n3,4\n')
+    assert RecordScanner(filepath).count_records() == 3
+
+def test_count_records_without_trailing_newline(tmp_path):
+    """Test if a final record without a trailing newline is counted."""
+    filepath = tmp_path / 'plain.csv'
+    filepath.write_text('a,b\n1,2\n3,4')
+    assert RecordScanner(filepath).count_records() == 3
+
+def test_count_records_empty(tmp_path):
+    """Test if an empty file has no records."""
+    filepath = tmp_path / 'empty.csv'
+    filepath.touch()
+    assert RecordScanner(filepath).count_records() == 0
+
+def test_count_records_quoted_newlines(quoted_csv_file):
+    """Test if newlines inside quoted fields are not counted as records."""
+    assert RecordScanner(quoted_csv_file).count_records() == 501
+
+def test_count_records_across_chunks(quoted_csv_file, monkeypatch):
+    """Test if quote state is carried across chunk boundaries when scanning in parallel."""
+    monkeypatch.setattr(RecordScanner, 'CHUNK_SIZE', 7)
+    scanner = RecordScanner(quoted_csv_file, threads=4)
+    assert len(scanner.scan_chunks()) > 1
+    assert scanner.count_records() == 501
+
+def test_count_records_cached_by_fingerprint(quoted_csv_file, monkeypatch):
+    """Test if counts are cached per fingerprint."""
+    fingerprint = (str(quoted_csv_file), 1, 1)
+    assert RecordScanner(quoted_csv_file).count_records(fingerprint) == 501
+    monkeypatch.setattr(RecordScanner, '_count_records', lambda self: -1)
+    assert RecordScanner(quoted_csv_file).count_records(fingerprint) == 501
+
+def test_count_cache_bounded(tmp_path, monkeypatch):
+    """Test if the count cache evicts the least recently used file versions."""
+    monkeypatch.setattr(RecordScanner, 'CACHE_MAX_ENTRIES', 2)
+    monkeypatch.setattr(RecordScanner, '_cache', OrderedDict())
+    filepath = tmp_path / 'plain.csv'
+    filepath.write_text('a,b\n1,2\n')
+    scanner = RecordScanner(filepath)
+    for version in range(3):
+        scanner.count_records((str(filepath), 1, version))
+        if version == 1:
+            # reading the first version again keeps it over the second
+            scanner.count_records((str(filepath), 1, 0))
+    assert [key[0][2] for key in RecordScanner._cache] == [0, 2]
+
+def test_compression_detected_lazily(tmp_path):
+    """Test if the file is only opened to detect compression when it is needed."""
+    filepath = tmp_path / 'plain.csv'
+    filepath.write_text('a,b\n1,2\n')
+    with patch.object(Compression, 'detect', return_value=None) as detect:
+        scanner = RecordScanner(filepath)
+        detect.assert_not_called()
+        assert scanner.count_records() == 2
+        assert scanner.compression is None
+    detect.assert_called_once()
+
+def test_estimate_records(quoted_csv_file, monkeypatch):
+    """Test if the estimate extrapolates from a byte sample."""
+    monkeypatch.setattr(RecordScanner, 'ESTIMATE_SAMPLE_BYTES', 1024)
+    estimate = RecordScanner(quoted_csv_file).estimate_records()
+    assert abs(estimate - 501) / 501 < 0.1
+
+def test_complete_records_end_skips_partial_record(quoted_csv_file, monkeypatch):
+    """Test if the scan stops before a record still being appended, across chunks."""
+    monkeypatch.setattr(RecordScanner, 'CHUNK_SIZE', 64)
+    with open(quoted_csv_file, 'a') as csv_file:
+        csv_file.write('500,"unfinished\nrecord')
+    complete_size = quoted_csv_file.stat().st_size - len('500,"unfinished\nrecord')
+    header_size = len('id,comment\n')
+    scanner = RecordScanner(quoted_csv_file)
+    assert scanner.complete_records_end() == (complete_size, 501)
+    assert scanner.complete_records_end(header_size) == (complete_size, 500)
+    assert scanner.complete_records_end(complete_size) == (complete_size, 0)
+
+def test_split_on_record_boundaries(quoted_csv_file, monkeypatch):
+    """Test if ranges start on real record boundaries and cover every record once."""
+    monkeypatch.setattr(RecordScanner, 'CHUNK_SIZE', 100)
+    scanner = RecordScanner(quoted_csv_file)
+    ranges = scanner.split(n_chunks=7)
+    content = quoted_csv_file.read_bytes()
+    assert 1 < len(ranges) <= 7
+    assert ranges[0][0] == len(b'id,comment\n')
+    assert ranges[-1][1] == len(content)
+    for (_, end), (start, _) in zip(ranges, ranges[1:]):
+        assert end == start
+        assert content[start:].startswith(str(content[:start].count(b'three"\n')).encode())
+
+def test_split_by_target_bytes(quoted_csv_file):
+    """Test if target_bytes bounds the size of the ranges up to one record."""
+    ranges = RecordScanner(quoted_csv_file).split(target_bytes=1000)
+    assert all(end - start < 1000 + 50 for start, end in ranges)
+    with pytest.raises(ValueError):
+        RecordScanner(quoted_csv_file).split()
@@ -0,0 +1,63 @@
+"""Unit tests for SchemaInference."""
+
+from datetime import date, datetime
+import pytest
+import polars as pl
+from src.datagrunt.core.schemas import SchemaInference
+
+@pytest.fixture
+def typed_csv_file(tmp_path):
+    """Fixture to create a CSV file with numeric, date and text columns."""
+    filepath = tmp_path / 'typed.csv'
+    filepath.write_text('id,amount,day,name,zip\n'
+                        '1,2.5,2024-01-02,Alice,01234\n'
+                        '2,3.5,2024-02-03,Bob,02134\n')
+    return filepath
+
+def test_infer(typed_csv_file):
+    """Test if column types are inferred from a sample of the file."""
+    schema = SchemaInference(typed_csv_file, ',').infer()
+    assert schema == {'id': 'BIGINT', 'amount': 'DOUBLE', 'day': 'DATE',
+                      'name': 'VARCHAR', 'zip': 'VARCHAR'}
+
+def test_apply_overrides():
+    """Test if overrides replace individual column types."""
+    schema = {'id': 'BIGINT', 'name': 'VARCHAR'}
+    assert SchemaInference.apply_overrides(schema, {'id': 'varchar'}) == {'id': 'VARCHAR',
+                                                                          'name': 'VARCHAR'}
+
+def test_apply_overrides_unknown_column():
+    """Test if overriding a missing column raises a ValueError."""
+    with pytest.raises(ValueError):
+        SchemaInference.apply_overrides({'id': 'BIGINT'}, {'missing': 'VARCHAR'})
+
+def test_to_polars_schema():
+    """Test if DuckDB type names map onto Polars data types."""
+    schema = {'id': 'BIGINT', 'amount': 'DECIMAL(10,2)', 'day': 'DATE', 'name': 'VARCHAR'}
+    assert SchemaInference.to_polars_schema(schema) == {'id': pl.Int64, 'amount': pl.Float64,
+                                                         'day': pl.Date, 'name': pl.Utf8}
+
+def test_to_polars_schema_unsupported():
+    """Test if a type without a Polars equivalent raises a ValueError."""
+    with pytest.raises(ValueError):
+        SchemaInference.to_polars_schema({'blob': 'BLOB'})
+
+def test_infer_formats(tmp_path):
+    """Test if the format of non-ISO dates is sniffed along with the types."""
+    filepath = tmp_path / 'dates.csv'
+    filepath.write_text('id,day\n1,01/02/2024\n2,12/31/2023\n')
+    inference = SchemaInference(filepath, ',')
+    assert inference.infer()['day'] == 'DATE'
+    assert inference.infer_formats()['DATE'] == '%m/%d/%Y'
+
+def test_parse_formatted_columns():
+    """Test if text columns are parsed with their formats by Polars and PyArrow alike."""
+    schema = {'day': 'DATE', 'at': 'TIMESTAMP', 'name': 'VARCHAR'}
+    formatted = SchemaInference.formatted_columns(schema, {'DATE': '%m/%d/%Y',
+                                                           'TIMESTAMP': '%d.%m.%Y %H:%M'})
+    assert formatted == {'day': ('DATE', '%m/%d/%Y'), 'at': ('TIMESTAMP', '%d.%m.%Y %H:%M')}
+    text = pl.DataFrame({'day': ['12/31/2023'], 'at': ['31.12.2023 23:05'], 'name': ['a']})
+    expected = [{'day': date(2023, 12, 31), 'at': datetime(2023, 12, 31, 23, 5), 'name': 'a'}]
+    assert text.with_columns(SchemaInference.to_polars_expressions(formatted)).to_dicts() == expected
+    table = SchemaInference.parse_arrow_columns(text.to_arrow(), formatted)
+    assert table.to_pylist() == expected